@@ -0,0 +1,225 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import math
+import numpy as np
+from numpy.typing import NDArray
+from scipy import signal
+
+INT16_MAX: int = 32767
+INT16_MIN: int = -32768
+
+
+def to_int16_scale(audio_data: NDArray) -> NDArray[np.float64]:
+    """Converts audio samples of any dtype to floats on the int16 scale.
+
+    Args:
+        audio_data: Float audio in [-1, 1] or integer PCM audio.
+
+    Returns:
+        The samples as floats in [-32768, 32767].
+    """
+    if np.issubdtype(audio_data.dtype, np.floating):
+        return audio_data.astype(np.float64) * INT16_MAX
+    if audio_data.dtype == np.int32:
+        return audio_data.astype(np.float64) / 65536
+    if audio_data.dtype == np.uint8:
+        return (audio_data.astype(np.float64) - 128) * 256
+    return audio_data.astype(np.float64)
+
+
+def to_int16(audio_data: NDArray[np.float64]) -> NDArray[np.int16]:
+    """Rounds and clips int16 scaled floats to int16 samples.
+
+    Args:
+        audio_data: The samples on the int16 scale.
+
+    Returns:
+        The int16 samples.
+    """
+    return np.clip(np.rint(audio_data), INT16_MIN, INT16_MAX).astype(np.int16)
+
+
+class StreamingResampler:
+    """
+    Resamples an audio stream chunk by chunk with a polyphase FIR filter.
+
+    The filter is the one `scipy.signal.resample_poly` designs, and the input
+    samples the filter still needs are kept between chunks, so the chunks
+    resampled one after the other are the same as the whole stream resampled
+    at once, without artifacts at the chunk boundaries. Output samples are
+    returned as soon as all the input samples they depend on arrived, the
+    stream is delayed by half the filter length, e.g. 0.6 ms from 44.1kHz to
+    16kHz.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int) -> None:
+        """
+        Initializes the StreamingResampler.
+
+        Args:
+            from_rate: The sample rate of the input stream.
+            to_rate: The desired sample rate.
+        """
+        self.from_rate: int = from_rate
+        self.to_rate: int = to_rate
+        gcd: int = math.gcd(from_rate, to_rate)
+        self.up: int = to_rate // gcd
+        self.down: int = from_rate // gcd
+
+        # Same filter as `scipy.signal.resample_poly` with its default window,
+        # none is needed when the rates are the same
+        max_rate: int = max(self.up, self.down)
+        self.half_len: int = 10 * max_rate if max_rate > 1 else 0
+        self.filter: NDArray[np.float64] = (
+            signal.firwin(2 * self.half_len + 1, 1 / max_rate, window=("kaiser", 5.0))
+            * self.up
+            if max_rate > 1
+            else np.ones(1)
+        )
+
+        # Output sample m is centered on input sample m * down / up. The kept
+        # input always starts at an index whose output samples land exactly on
+        # the output grid, i.e. start * up = half_len (mod down), before the
+        # stream starts the input is silence.
+        self._grid_residue: int = (
+            0
+            if self.down == 1
+            else self.half_len * pow(self.up, -1, self.down) % self.down
+        )
+        self._buffer_start: int = (
+            self._grid_residue - self.down if self._grid_residue else 0
+        )
+        self._buffer: NDArray[np.float64] = np.zeros(-self._buffer_start)
+        self._input_length: int = 0
+        self._output_length: int = 0
+
+    def process(self, audio_data: NDArray) -> NDArray[np.int16]:
+        """Resamples the next chunk of the stream.
+
+        Args:
+            audio_data: The next mono samples, float audio in [-1, 1] or integer PCM.
+
+        Returns:
+            The resampled int16 samples which are complete so far.
+        """
+        if self.up == self.down:
+            return to_int16(to_int16_scale(audio_data))
+
+        self._buffer = np.concatenate([self._buffer, to_int16_scale(audio_data)])
+        self._input_length += len(audio_data)
+
+        # Output sample m needs the upsampled input up to m * down + half_len
+        output_length: int = max(
+            0, (self._input_length * self.up - 1 - self.half_len) // self.down + 1
+        )
+        if output_length <= self._output_length:
+            return np.zeros(0, dtype=np.int16)
+
+        resampled: NDArray[np.float64] = signal.upfirdn(
+            self.filter, self._buffer, self.up, self.down
+        )
+        first: int = (
+            self._output_length * self.down
+            + self.half_len
+            - self._buffer_start * self.up
+        ) // self.down
+        output: NDArray[np.int16] = to_int16(
+            resampled[first : first + output_length - self._output_length]
+        )
+        self._output_length = output_length
+        self._trim_buffer()
+        return output
+
+    def _trim_buffer(self) -> None:
+        """Drops the input samples no future output sample depends on."""
+        # Oldest upsampled input sample the next output sample depends on
+        needed_start: int = (
+            self._output_length * self.down + self.half_len - (len(self.filter) - 1)
+        ) // self.up
+        # Rounded down to the output grid
+        new_start: int = needed_start - (needed_start - self._grid_residue) % self.down
+        if new_start > self._buffer_start:
+            self._buffer = self._buffer[new_start - self._buffer_start :]
+            self._buffer_start = new_start
+
+
+class AudioRingBuffer:
+    """
+    Preallocated FIFO of int16 audio samples.
+
+    Reads return views of the buffer instead of copies, at most up to the end
+    of the buffer, so a read may return less than what is available. Clearing
+    only moves the read position. When a write does not fit, the oldest
+    samples are dropped.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initializes the AudioRingBuffer.
+
+        Args:
+            capacity: The maximum number of buffered samples.
+        """
+        self.capacity: int = capacity
+        self.dropped_samples: int = 0
+        self._buffer: NDArray[np.int16] = np.zeros(capacity, dtype=np.int16)
+        # Total samples read and written, their difference is what is buffered
+        self._read_count: int = 0
+        self._write_count: int = 0
+
+    @property
+    def available(self) -> int:
+        """The number of buffered samples."""
+        return self._write_count - self._read_count
+
+    def write(self, audio_data: NDArray[np.int16]) -> None:
+        """Appends samples, dropping the oldest ones when the buffer is full.
+
+        Args:
+            audio_data: The samples to append.
+        """
+        if len(audio_data) > self.capacity:
+            self.dropped_samples += len(audio_data) - self.capacity
+            audio_data = audio_data[-self.capacity :]
+        overflow: int = self.available + len(audio_data) - self.capacity
+        if overflow > 0:
+            self._read_count += overflow
+            self.dropped_samples += overflow
+
+        start: int = self._write_count % self.capacity
+        head_length: int = min(len(audio_data), self.capacity - start)
+        self._buffer[start : start + head_length] = audio_data[:head_length]
+        self._buffer[: len(audio_data) - head_length] = audio_data[head_length:]
+        self._write_count += len(audio_data)
+
+    def read(self, max_samples: int) -> NDArray[np.int16]:
+        """Consumes the oldest samples.
+
+        Args:
+            max_samples: The maximum number of samples to read.
+
+        Returns:
+            A view of the samples, valid until they are overwritten by later writes.
+        """
+        start: int = self._read_count % self.capacity
+        length: int = min(self.available, max_samples, self.capacity - start)
+        self._read_count += length
+        return self._buffer[start : start + length]
+
+    def clear(self) -> None:
+        """Drops all the buffered samples."""
+        self._read_count = self._write_count
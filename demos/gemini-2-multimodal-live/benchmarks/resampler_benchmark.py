@@ -0,0 +1,98 @@
+"""Benchmark of the microphone resampling to the 16kHz Gemini input rate.
+
+Resamples a few seconds of noise split into Gradio sized callbacks with the
+previous per callback `scipy.signal.resample` and with the StreamingResampler,
+and reports the CPU time per second of audio and the largest difference from
+the whole stream resampled at once, i.e. the artifacts at callback boundaries.
+
+Usage:
+    uv run benchmarks/resampler_benchmark.py
+    uv run benchmarks/resampler_benchmark.py --rates 44100,48000 --chunk-ms 100
+"""
+
+from pathlib import Path
+from typing import Callable
+import argparse
+import sys
+import time
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import signal
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from audio import StreamingResampler, to_int16  # noqa: E402
+
+TO_RATE: int = 16000
+
+
+def resample_per_callback(from_rate: int) -> Callable[[NDArray], NDArray[np.int16]]:
+    """The resampling done before the StreamingResampler, for comparison."""
+
+    def resample(audio_data: NDArray) -> NDArray[np.int16]:
+        new_length: int = int(len(audio_data) * TO_RATE / from_rate)
+        return signal.resample(audio_data.astype(np.int16), new_length).astype(np.int16)
+
+    return resample
+
+
+def run(
+    resample: Callable[[NDArray], NDArray[np.int16]], chunks: list[NDArray]
+) -> tuple[NDArray[np.int16], float]:
+    started_at: float = time.process_time()
+    output: NDArray[np.int16] = np.concatenate([resample(chunk) for chunk in chunks])
+    return output, time.process_time() - started_at
+
+
+def benchmark(from_rate: int, args: argparse.Namespace) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    audio: NDArray[np.int16] = (
+        rng.standard_normal(int(from_rate * args.seconds)) * 3000
+    ).astype(np.int16)
+    chunk_size: int = int(from_rate * args.chunk_ms / 1000)
+    chunks: list[NDArray] = [
+        audio[i : i + chunk_size] for i in range(0, len(audio), chunk_size)
+    ]
+    reference: NDArray[np.int16] = to_int16(
+        signal.resample_poly(audio.astype(np.float64), TO_RATE, from_rate)
+    )
+
+    resamplers: dict[str, Callable[[NDArray], NDArray[np.int16]]] = {
+        "resample": resample_per_callback(from_rate),
+        "streaming": StreamingResampler(from_rate, TO_RATE).process,
+    }
+    for name, resample in resamplers.items():
+        output, cpu_seconds = run(resample, chunks)
+        compared: int = min(len(output), len(reference))
+        max_error: int = int(
+            np.abs(
+                output[:compared].astype(np.int32)
+                - reference[:compared].astype(np.int32)
+            ).max()
+        )
+        print(
+            f"{from_rate:>6} -> {TO_RATE} {name:>10} "
+            f"{cpu_seconds / args.seconds * 1000:>10.3f} "
+            f"{args.seconds / cpu_seconds:>10.0f}x {max_error:>10}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", default="44100,48000")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    # Gradio streams the microphone every 0.5 seconds by default
+    parser.add_argument("--chunk-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'rates':>15} {'method':>10} {'cpu ms/s':>10} {'realtime':>11} "
+        f"{'max error':>10}"
+    )
+    for from_rate in args.rates.split(","):
+        benchmark(int(from_rate), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,16 +17,18 @@ limitations under the License.
 import gradio as gr
 from google import genai
 import asyncio
+import time
 import traceback
 import numpy as np
 from numpy.typing import NDArray
-from scipy import signal
 import typer
 import pyaudio
 from enum import Enum
-import cv2
+from collections import deque
 from typing import AsyncGenerator, Optional, Tuple, Dict, Any
 from settings import get_settings
+from audio import AudioRingBuffer, StreamingResampler
+from video import DEFAULT_TARGET_FPS, FrameSampler
 
 app = typer.Typer()
 
@@ -48,11 +50,21 @@ GEMINI_AUDIO_INPUT_SAMPLE_RATE: int = 16000
 GEMINI_AUDIO_INPUT_CHUNK_SIZE: int = 1024
 GEMINI_AUDIO_OUTPUT_SAMPLE_RATE: int = 24000
 GEMINI_AUDIO_OUTPUT_CHUNK_SIZE: int = 4800
-GRADIO_OUTPUT_CHUNKS_TO_COLLECT: int = 10
-# send to gradio component every 10 chunks, equal to +-2 seconds of audio -> 4800 * 10 = 48000 = 2 * SAMPLE RATE
+# Output audio waiting to be played, the oldest is dropped beyond it
+GEMINI_AUDIO_OUTPUT_BUFFER_SECONDS: int = 60
+# Audio buffered before a turn starts playing, absorbs network jitter
+DEFAULT_AUDIO_OUTPUT_JITTER_BUFFER_MS: int = 200
+# Longest audio segment sent to the gradio component at once
+GRADIO_OUTPUT_MAX_SAMPLES: int = GEMINI_AUDIO_OUTPUT_SAMPLE_RATE * 2
 PYA: pyaudio.PyAudio = pyaudio.PyAudio()
 PYA_FORMAT: int = pyaudio.paInt16
 PYA_OUTPUT_CHUNK_SIZE: int = 1024
+# Audio waiting to be sent, 32 chunks of 1024 samples at 16kHz = +-2 seconds
+AUDIO_SEND_QUEUE_SIZE: int = 32
+# Only the latest frame waits to be sent, older ones are stale
+VIDEO_SEND_QUEUE_SIZE: int = 1
+SEND_LATENCY_SAMPLES: int = 500
+SEND_STATS_INTERVAL_SECONDS: float = 30.0
 
 
 class AudioOutput(str, Enum):
@@ -62,60 +74,151 @@ class AudioOutput(str, Enum):
     GRADIO = "gradio"
 
 
-class MultimodalLoop:
+class SendLanes:
     """
-    A class that manages the multimodal interaction loop with Gemini.
-    It handles audio input/output and webcam input.
+    Outgoing realtime messages, with separate bounded lanes for audio and video.
+    Audio is always sent before video, so frames never delay speech, and
+    producers wait when their lane is full. The time each message waits before
+    being sent is recorded per lane.
     """
 
-    def __init__(self, audio_output: AudioOutput):
+    def __init__(self) -> None:
+        """Initializes the empty lanes."""
+        self.lanes: Dict[str, asyncio.Queue] = {
+            "audio": asyncio.Queue(maxsize=AUDIO_SEND_QUEUE_SIZE),
+            "video": asyncio.Queue(maxsize=VIDEO_SEND_QUEUE_SIZE),
+        }
+        self.latencies: Dict[str, deque[float]] = {
+            lane: deque(maxlen=SEND_LATENCY_SAMPLES) for lane in self.lanes
+        }
+        self._message_available: asyncio.Event = asyncio.Event()
+
+    async def put(self, lane: str, msg: Dict[str, Any]) -> None:
+        """Adds a message to a lane, waiting while the lane is full.
+
+        Args:
+            lane: The lane of the message, audio or video.
+            msg: The realtime input message.
         """
-        Initializes the MultimodalLoop.
+        await self.lanes[lane].put((time.perf_counter(), msg))
+        self._message_available.set()
+
+    def put_latest(self, lane: str, msg: Dict[str, Any]) -> bool:
+        """Adds a message to a lane, dropping the oldest one while the lane is full.
 
         Args:
-            audio_output: The desired audio output method (pyaudio or gradio).
+            lane: The lane of the message, audio or video.
+            msg: The realtime input message.
+
+        Returns:
+            Whether a stale message was dropped.
         """
-        self.audio_output: AudioOutput = audio_output
-        self.audio_in_queue: Optional[asyncio.Queue] = None
-        self.out_queue: Optional[asyncio.Queue] = None
-        self.session: Optional[genai.LiveSession] = None
-        self._task: Optional[asyncio.Task] = None
-        self.webcam_active: bool = False
+        queue: asyncio.Queue = self.lanes[lane]
+        is_dropped: bool = queue.full()
+        if is_dropped:
+            queue.get_nowait()
+        queue.put_nowait((time.perf_counter(), msg))
+        self._message_available.set()
+        return is_dropped
 
-    def resample_audio(
-        self, audio_data: NDArray[np.int16], from_rate: int, to_rate: int
-    ) -> NDArray[np.int16]:
-        """Resample audio data from one rate to another
+    async def get(self) -> Tuple[str, Dict[str, Any]]:
+        """Waits for the next message, audio first.
+
+        Returns:
+            The lane and the message.
+        """
+        while True:
+            for lane, queue in self.lanes.items():
+                if not queue.empty():
+                    enqueued_at: float
+                    msg: Dict[str, Any]
+                    enqueued_at, msg = queue.get_nowait()
+                    self.latencies[lane].append(time.perf_counter() - enqueued_at)
+                    return lane, msg
+            self._message_available.clear()
+            await self._message_available.wait()
+
+    def clear(self, lane: str) -> None:
+        """Drops the messages waiting in a lane.
 
         Args:
-            audio_data: The audio data to resample.
-            from_rate: The original sample rate.
-            to_rate: The desired sample rate.
+            lane: The lane to clear.
+        """
+        queue: asyncio.Queue = self.lanes[lane]
+        while not queue.empty():
+            queue.get_nowait()
+
+    def latency_summary(self) -> str:
+        """Summarizes the time messages waited before being sent.
 
         Returns:
-            The resampled audio data.
+            The p50, p95 and max wait of each lane in milliseconds.
         """
-        if from_rate == to_rate:
-            return audio_data
+        summaries: list[str] = []
+        for lane, latencies in self.latencies.items():
+            if not latencies:
+                continue
+            values: NDArray[np.float64] = np.array(latencies) * 1000
+            summaries.append(
+                f"{lane} p50={np.percentile(values, 50):.1f}ms "
+                f"p95={np.percentile(values, 95):.1f}ms max={values.max():.1f}ms"
+            )
+        return ", ".join(summaries)
 
-        # Calculate resampling ratio
-        ratio: float = to_rate / from_rate
 
-        # Calculate new length
-        new_length: int = int(len(audio_data) * ratio)
+class MultimodalLoop:
+    """
+    A class that manages the multimodal interaction loop with Gemini.
+    It handles audio input/output and webcam input.
+    """
+
+    def __init__(
+        self,
+        audio_output: AudioOutput,
+        jitter_buffer_ms: int = DEFAULT_AUDIO_OUTPUT_JITTER_BUFFER_MS,
+        video_fps: float = DEFAULT_TARGET_FPS,
+    ):
+        """
+        Initializes the MultimodalLoop.
 
-        # Resample using scipy.signal.resample
-        resampled: NDArray[np.float64] = signal.resample(audio_data, new_length)
-        return resampled.astype(np.int16)
+        Args:
+            audio_output: The desired audio output method (pyaudio or gradio).
+            jitter_buffer_ms: The output audio buffered before playback starts.
+            video_fps: The maximum number of webcam frames sent per second.
+        """
+        self.audio_output: AudioOutput = audio_output
+        self.audio_buffer: AudioRingBuffer = AudioRingBuffer(
+            GEMINI_AUDIO_OUTPUT_SAMPLE_RATE * GEMINI_AUDIO_OUTPUT_BUFFER_SECONDS
+        )
+        self.jitter_buffer_samples: int = max(
+            1, GEMINI_AUDIO_OUTPUT_SAMPLE_RATE * jitter_buffer_ms // 1000
+        )
+        self.audio_available: asyncio.Event = asyncio.Event()
+        self.turn_complete: bool = True
+        self.send_lanes: Optional[SendLanes] = None
+        self.session: Optional[genai.LiveSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self.webcam_active: bool = False
+        self.frame_sampler: FrameSampler = FrameSampler(target_fps=video_fps)
+        self._encoding_frame: bool = False
+        self.mic_resampler: Optional[StreamingResampler] = None
 
     async def send_realtime(self) -> None:
-        """Sends messages from the output queue to the Gemini session in real-time."""
+        """Sends messages from the send lanes to the Gemini session in real-time."""
+        stats_printed_at: float = time.perf_counter()
         while True:
+            # Waits without polling, an idle session does not use the CPU
+            lane: str
+            msg: Dict[str, Any]
+            lane, msg = await self.send_lanes.get()  # type: ignore
             try:
-                msg: Dict[str, Any] = self.out_queue.get_nowait()  # type: ignore
                 await self.session.send(input=msg)  # type: ignore
-            except Exception:
-                await asyncio.sleep(0.01)
+            except Exception as e:
+                print(f"Error sending {lane}: {e}")
+
+            if time.perf_counter() - stats_printed_at > SEND_STATS_INTERVAL_SECONDS:
+                stats_printed_at = time.perf_counter()
+                print(f"Send latency: {self.send_lanes.latency_summary()}")  # type: ignore
 
     async def process_mic_input(
         self, audio_data: Tuple[int, NDArray[np.float32]]
@@ -125,7 +228,7 @@ class MultimodalLoop:
         Args:
             audio_data: A tuple containing the sample rate and audio data from Gradio.
         """
-        if audio_data is not None and self.out_queue is not None:
+        if audio_data is not None and self.send_lanes is not None:
             # Gradio returns a tuple of (sample_rate, audio_data)
             sample_rate: int
             audio_array: NDArray[np.float32]
@@ -133,35 +236,31 @@ class MultimodalLoop:
 
             # Ensure audio is mono
             if len(audio_array.shape) > 1:
-                audio_array: NDArray[np.float32] = np.mean(audio_array, axis=1)
+                audio_array = np.mean(audio_array, axis=1).astype(audio_array.dtype)
 
-            # Resample from input rate to 16kHz
-            resampled_data: NDArray[np.int16] = self.resample_audio(
-                audio_array.astype(np.int16),
-                sample_rate,
-                GEMINI_AUDIO_INPUT_SAMPLE_RATE,
-            )
+            # Resample from input rate to 16kHz, keeping the filter state
+            # between callbacks so the stream has no gaps at their boundaries
+            if (
+                self.mic_resampler is None
+                or self.mic_resampler.from_rate != sample_rate
+            ):
+                self.mic_resampler = StreamingResampler(
+                    sample_rate, GEMINI_AUDIO_INPUT_SAMPLE_RATE
+                )
+            resampled_data: NDArray[np.int16] = self.mic_resampler.process(audio_array)
 
-            # Process audio in chunks
+            # Process audio in chunks, the last one may be shorter
             num_samples: int = len(resampled_data)
             for i in range(0, num_samples, GEMINI_AUDIO_INPUT_CHUNK_SIZE):
                 chunk: NDArray[np.int16] = resampled_data[
                     i : i + GEMINI_AUDIO_INPUT_CHUNK_SIZE
                 ]
 
-                # If the last chunk is smaller than CHUNK_SIZE, pad with zeros
-                if len(chunk) < GEMINI_AUDIO_INPUT_CHUNK_SIZE:
-                    chunk: NDArray[np.int16] = np.pad(
-                        chunk,
-                        (0, GEMINI_AUDIO_INPUT_CHUNK_SIZE - len(chunk)),
-                        "constant",
-                    ).astype(np.int16)
-
                 # Convert chunk to bytes
                 chunk_bytes: bytes = chunk.tobytes()
 
-                await self.out_queue.put(  # type: ignore
-                    {"data": chunk_bytes, "mime_type": "audio/pcm"}
+                await self.send_lanes.put(
+                    "audio", {"data": chunk_bytes, "mime_type": "audio/pcm"}
                 )
 
     async def process_webcam_frame(self, frame: NDArray[np.uint8]) -> None:
@@ -170,48 +269,74 @@ class MultimodalLoop:
         Args:
             frame: The webcam frame data from Gradio.
         """
-        if frame is not None and self.session is not None:
-            # Convert BGR to RGB format
-            frame_rgb: NDArray[np.uint8] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_rgb = cv2.resize(frame_rgb, (640, 480))
-
-            # Convert frame to bytes
-            _, img_encoded = cv2.imencode(".jpg", frame_rgb)
-            img_bytes: bytes = img_encoded.tobytes()
-
-            await asyncio.sleep(0.5)
+        if frame is None or self.session is None or self.send_lanes is None:
+            return
+        # Frames arriving while the previous one is encoded are skipped, as
+        # are the ones too close in time or too similar to the last one sent
+        if self._encoding_frame or not self.frame_sampler.sample(
+            frame, time.monotonic()
+        ):
+            return
+
+        self._encoding_frame = True
+        try:
+            # Encoded in a worker thread so the event loop keeps sending audio
+            img_bytes: bytes = await asyncio.to_thread(self.frame_sampler.encode, frame)
+        finally:
+            self._encoding_frame = False
 
-            # Send the frame to Gemini
-            await self.out_queue.put({"data": img_bytes, "mime_type": "image/jpeg"})  # type: ignore
+        # Send the frame to Gemini, replacing a frame still waiting to be sent
+        if self.send_lanes.put_latest(
+            "video", {"data": img_bytes, "mime_type": "image/jpeg"}
+        ):
+            self.frame_sampler.lower_quality()
 
     async def receive_audio(self) -> None:
-        """Background task to reads from the websocket and write pcm chunks to the output queue"""
+        """Background task to reads from the websocket and write pcm chunks to the audio buffer"""
         while True:
             try:
                 turn = self.session.receive()  # type: ignore
                 async for response in turn:
                     # print(response)
                     if data := response.data:
-                        if self.audio_output == AudioOutput.PYAUDIO:
-                            self.audio_in_queue.put_nowait(data)  # type: ignore
-                        elif self.audio_output == AudioOutput.GRADIO:
-                            self.audio_in_queue.put_nowait(  # type: ignore
-                                np.frombuffer(data, dtype=np.int16)
-                            )
+                        self.turn_complete = False
+                        self.audio_buffer.write(np.frombuffer(data, dtype=np.int16))
+                        self.audio_available.set()
                         continue
+                    if response.server_content and response.server_content.interrupted:
+                        # For interruptions to work, we need to stop playback.
+                        # So empty out the audio buffer because it may have loaded
+                        # much more audio than has played yet.
+                        self.audio_buffer.clear()
                     if text := response.text:
                         print(text, end="")
 
-                # If you interrupt the model, it sends a turn_complete.
-                # For interruptions to work, we need to stop playback.
-                # So empty out the audio queue because it may have loaded
-                # much more audio than has played yet.
-                while not self.audio_in_queue.empty():  # type: ignore
-                    self.audio_in_queue.get_nowait()  # type: ignore
+                # Play the end of the turn even when shorter than the jitter buffer
+                self.turn_complete = True
+                self.audio_available.set()
             except Exception as e:
                 print(e)
                 await asyncio.sleep(0.1)
 
+    async def read_output_audio(
+        self, max_samples: int, min_samples: int
+    ) -> NDArray[np.int16]:
+        """Waits for output audio to play.
+
+        Args:
+            max_samples: The maximum number of samples to return.
+            min_samples: The samples to wait for, unless the turn is complete.
+
+        Returns:
+            A view of the next samples in the audio buffer.
+        """
+        while True:
+            available: int = self.audio_buffer.available
+            if available >= min_samples or (available and self.turn_complete):
+                return self.audio_buffer.read(max_samples)
+            self.audio_available.clear()
+            await self.audio_available.wait()
+
     async def play_audio_with_gradio(
         self,
     ) -> AsyncGenerator[Tuple[int, NDArray[np.int16]], None]:
@@ -221,30 +346,12 @@ class MultimodalLoop:
             A tuple containing the sample rate and audio data.
         """
         while True:
-            if self.audio_in_queue is None:
-                await asyncio.sleep(0.1)
-                continue
-
             try:
-                # Wait for at least one chunk
-                first_chunk: NDArray[np.int16] = await self.audio_in_queue.get()  # type: ignore
-                await asyncio.sleep(0.15)  # buffer to make output smoother
-                chunks: list[NDArray[np.int16]] = [first_chunk]
-
-                # Try to get more chunks without blocking
-                for _ in range(GRADIO_OUTPUT_CHUNKS_TO_COLLECT - 1):
-                    await asyncio.sleep(0.15)  # buffer to make output smoother
-
-                    try:
-                        chunk: NDArray[np.int16] = self.audio_in_queue.get_nowait()  # type: ignore
-                        chunks.append(chunk)
-                    except asyncio.QueueEmpty:
-                        break
-
-                # Concatenate available chunks
-                combined_audio: NDArray[np.int16] = np.concatenate(chunks)
-
-                yield (GEMINI_AUDIO_OUTPUT_SAMPLE_RATE, combined_audio)
+                # Segments of at least the jitter buffer play without gaps
+                audio_data: NDArray[np.int16] = await self.read_output_audio(
+                    GRADIO_OUTPUT_MAX_SAMPLES, self.jitter_buffer_samples
+                )
+                yield (GEMINI_AUDIO_OUTPUT_SAMPLE_RATE, audio_data)
 
             except Exception as e:
                 print(f"Error in play_audio: {e}")
@@ -260,10 +367,18 @@ class MultimodalLoop:
             frames_per_buffer=PYA_OUTPUT_CHUNK_SIZE,
             output=True,
         )
+        min_samples: int = self.jitter_buffer_samples
         while True:
             try:
-                bytestream: bytes = await self.audio_in_queue.get()  # type: ignore
-                await asyncio.to_thread(stream.write, bytestream)
+                audio_data: NDArray[np.int16] = await self.read_output_audio(
+                    PYA_OUTPUT_CHUNK_SIZE, min_samples
+                )
+                # Copied as the buffer keeps being written while the thread plays
+                await asyncio.to_thread(stream.write, audio_data.tobytes())
+                # Once playing, keep playing until the buffer runs dry
+                min_samples = (
+                    1 if self.audio_buffer.available else self.jitter_buffer_samples
+                )
             except Exception as e:
                 print(f"error in playing audio: {e}")
                 await asyncio.sleep(0.1)
@@ -276,8 +391,9 @@ class MultimodalLoop:
                 asyncio.TaskGroup() as tg,
             ):
                 self.session = session
-                self.audio_in_queue = asyncio.Queue()
-                self.out_queue = asyncio.Queue(maxsize=5)
+                self.audio_buffer.clear()
+                self.send_lanes = SendLanes()
+                self.mic_resampler = None
 
                 tg.create_task(self.send_realtime())
                 tg.create_task(self.receive_audio())
@@ -285,16 +401,20 @@ class MultimodalLoop:
                 if self.audio_output == AudioOutput.PYAUDIO:
                     tg.create_task(self.play_audio_with_pyaudio())
 
-                while True:
-                    await asyncio.sleep(0.01)
+                # The task group waits for its tasks until the session is stopped
 
         except ExceptionGroup as EG:
             traceback.print_exception(EG)
+        finally:
+            if self.send_lanes is not None:
+                print(f"Send latency: {self.send_lanes.latency_summary()}")
 
 
 @app.command()
 def main(
     audio_output: AudioOutput = AudioOutput.PYAUDIO,
+    jitter_buffer_ms: int = DEFAULT_AUDIO_OUTPUT_JITTER_BUFFER_MS,
+    video_fps: float = DEFAULT_TARGET_FPS,
 ) -> None:
     """
     Run the Gemini live API demo with Gradio interface.
@@ -302,7 +422,11 @@ def main(
     with gr.Blocks() as demo:
         gr.Markdown("# Gemini Live API Demo")
 
-        multimodal_loop: MultimodalLoop = MultimodalLoop(audio_output=audio_output)
+        multimodal_loop: MultimodalLoop = MultimodalLoop(
+            audio_output=audio_output,
+            jitter_buffer_ms=jitter_buffer_ms,
+            video_fps=video_fps,
+        )
 
         session_button: gr.Button = gr.Button("Start Session")
 
@@ -0,0 +1,130 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+DEFAULT_TARGET_FPS: float = 1.0
+# Mean absolute difference of the grayscale thumbnails, from 0 to 255
+DEFAULT_CHANGE_THRESHOLD: float = 4.0
+# An unchanged scene is still sent this often
+DEFAULT_KEYFRAME_INTERVAL_SECONDS: float = 10.0
+# Audio input is 32KB/s, video gets about the same
+DEFAULT_MAX_BYTES_PER_SECOND: int = 32_000
+FRAME_SIZE: Tuple[int, int] = (640, 480)
+THUMBNAIL_SIZE: Tuple[int, int] = (64, 48)
+MIN_JPEG_QUALITY: int = 30
+MAX_JPEG_QUALITY: int = 85
+
+
+class FrameSampler:
+    """
+    Selects the webcam frames worth sending to Gemini and encodes them to JPEG.
+
+    Frames are checked at most `target_fps` times per second, and sampled when
+    the scene changed since the last sampled frame, or when the last one is
+    older than `keyframe_interval_seconds`. The JPEG quality adapts so the
+    frames stay within `max_bytes_per_second`.
+    """
+
+    def __init__(
+        self,
+        target_fps: float = DEFAULT_TARGET_FPS,
+        change_threshold: float = DEFAULT_CHANGE_THRESHOLD,
+        keyframe_interval_seconds: float = DEFAULT_KEYFRAME_INTERVAL_SECONDS,
+        max_bytes_per_second: int = DEFAULT_MAX_BYTES_PER_SECOND,
+    ) -> None:
+        """
+        Initializes the FrameSampler.
+
+        Args:
+            target_fps: The maximum number of frames sampled per second.
+            change_threshold: The scene difference below which frames are skipped.
+            keyframe_interval_seconds: The longest time without a sampled frame.
+            max_bytes_per_second: The bandwidth budget of the encoded frames.
+        """
+        self.frame_interval_seconds: float = 1 / target_fps
+        self.change_threshold: float = change_threshold
+        self.keyframe_interval_seconds: float = keyframe_interval_seconds
+        self.max_frame_bytes: int = int(max_bytes_per_second / target_fps)
+        self.quality: int = MAX_JPEG_QUALITY
+        self._last_thumbnail: Optional[NDArray[np.int16]] = None
+        self._last_sampled_at: float = float("-inf")
+        self._last_checked_at: float = float("-inf")
+
+    def sample(self, frame: NDArray[np.uint8], now: float) -> bool:
+        """Decides whether the frame is sent, and if so remembers it.
+
+        Args:
+            frame: The RGB webcam frame.
+            now: The current monotonic time in seconds.
+
+        Returns:
+            Whether the frame should be encoded and sent.
+        """
+        # Unchanged scenes are also only compared at the target rate
+        if now - self._last_checked_at < self.frame_interval_seconds:
+            return False
+        self._last_checked_at = now
+        elapsed: float = now - self._last_sampled_at
+
+        thumbnail: NDArray[np.int16] = cv2.cvtColor(
+            cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_RGB2GRAY,
+        ).astype(np.int16)
+        if (
+            self._last_thumbnail is not None
+            and elapsed < self.keyframe_interval_seconds
+            and np.abs(thumbnail - self._last_thumbnail).mean() < self.change_threshold
+        ):
+            return False
+
+        self._last_thumbnail = thumbnail
+        self._last_sampled_at = now
+        return True
+
+    def encode(self, frame: NDArray[np.uint8]) -> bytes:
+        """Encodes the frame to JPEG and adapts the quality to the budget.
+
+        Blocking, meant to run in a worker thread, one frame at a time.
+
+        Args:
+            frame: The RGB webcam frame.
+
+        Returns:
+            The JPEG image.
+        """
+        # Resized first so the color conversion works on fewer pixels
+        frame_bgr: NDArray[np.uint8] = cv2.cvtColor(
+            cv2.resize(frame, FRAME_SIZE, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_RGB2BGR,
+        )
+        _, img_encoded = cv2.imencode(
+            ".jpg", frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        )
+        img_bytes: bytes = img_encoded.tobytes()
+
+        if len(img_bytes) > self.max_frame_bytes:
+            self.quality = max(MIN_JPEG_QUALITY, self.quality - 10)
+        elif len(img_bytes) < self.max_frame_bytes * 0.7:
+            self.quality = min(MAX_JPEG_QUALITY, self.quality + 5)
+        return img_bytes
+
+    def lower_quality(self) -> None:
+        """Lowers the quality of the next frames, e.g. when frames are dropped."""
+        self.quality = max(MIN_JPEG_QUALITY, self.quality - 10)
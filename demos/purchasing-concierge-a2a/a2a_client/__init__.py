@@ -1,4 +1,4 @@
 from .client import A2AClient
-from .card_resolver import A2ACardResolver
+from .card_resolver import A2ACardResolver, AgentCardCache, resolve_agent_cards
 
-__all__ = ["A2AClient", "A2ACardResolver"]
+__all__ = ["A2AClient", "A2ACardResolver", "AgentCardCache", "resolve_agent_cards"]
@@ -3,7 +3,62 @@ from a2a_types import (
     AgentCard,
     A2AClientJSONError,
 )
+from pathlib import Path
+import asyncio
+import hashlib
 import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AgentCardCache:
+    """Caches agent cards on disk, one JSON file per agent card URL.
+
+    Cards younger than `ttl_seconds` are used without a request. Older cards are
+    revalidated with their ETag, so an unchanged card costs an empty response.
+    """
+
+    def __init__(self, cache_dir: str | Path, ttl_seconds: float = 300):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.json"
+
+    def get(self, url: str) -> dict | None:
+        """Returns the cache entry with the `card`, `etag` and `fetched_at` keys."""
+        try:
+            entry = json.loads(self._path(url).read_text())
+            entry["card"] = AgentCard(**entry["card"])
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable agent card cache for {url}: {e}")
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    def put(self, url: str, card: AgentCard, etag: str | None):
+        entry = {
+            "url": url,
+            "etag": etag,
+            "fetched_at": time.time(),
+            "card": card.model_dump(mode="json", exclude_none=True),
+        }
+        path = self._path(url)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(entry))
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to cache agent card for {url}: {e}")
 
 
 class A2ACardResolver:
@@ -11,11 +66,71 @@ class A2ACardResolver:
         self.base_url = base_url.rstrip("/")
         self.agent_card_path = agent_card_path.lstrip("/")
 
+    @property
+    def agent_card_url(self) -> str:
+        return self.base_url + "/" + self.agent_card_path
+
     def get_agent_card(self) -> AgentCard:
         with httpx.Client() as client:
-            response = client.get(self.base_url + "/" + self.agent_card_path)
+            response = client.get(self.agent_card_url)
             response.raise_for_status()
             try:
                 return AgentCard(**response.json())
             except json.JSONDecodeError as e:
                 raise A2AClientJSONError(str(e)) from e
+
+    async def get_agent_card_async(
+        self, client: httpx.AsyncClient, cache: AgentCardCache | None = None
+    ) -> AgentCard:
+        url = self.agent_card_url
+        entry = cache.get(url) if cache else None
+        if entry and cache.is_fresh(entry):
+            return entry["card"]
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304 and entry:
+            cache.put(url, entry["card"], entry["etag"])
+            return entry["card"]
+
+        response.raise_for_status()
+        try:
+            card = AgentCard(**response.json())
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        if cache:
+            cache.put(url, card, response.headers.get("ETag"))
+        return card
+
+
+async def resolve_agent_cards(
+    base_urls: list[str],
+    cache: AgentCardCache | None = None,
+    timeout: float = 5,
+) -> dict[str, AgentCard]:
+    """Fetches the agent cards of all base URLs concurrently.
+
+    Returns the cards by base URL. Agents which fail or do not answer within
+    `timeout` seconds are left out, so one slow agent does not block the rest.
+    """
+
+    async def resolve(client: httpx.AsyncClient, base_url: str) -> AgentCard:
+        return await asyncio.wait_for(
+            A2ACardResolver(base_url).get_agent_card_async(client, cache), timeout
+        )
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        results = await asyncio.gather(
+            *(resolve(client, base_url) for base_url in base_urls),
+            return_exceptions=True,
+        )
+
+    cards = {}
+    for base_url, result in zip(base_urls, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Failed to get agent card from {base_url}: {result!r}")
+            continue
+        cards[base_url] = result
+    return cards
@@ -1,25 +1,52 @@
 import httpx
 import base64
-from typing import Any, AsyncIterable
+from typing import Any, AsyncIterable, TypeVar
+from pydantic import ValidationError
 from a2a_types import (
     AgentCard,
+    GetTaskRequest,
+    GetTaskResponse,
     SendTaskRequest,
     SendTaskResponse,
     JSONRPCRequest,
+    JSONRPCResponse,
     A2AClientHTTPError,
     A2AClientJSONError,
     SendTaskStreamingResponse,
+    TaskQueryParams,
+    TaskSendParams,
 )
+from a2a_client.endpoint_pool import Endpoint, EndpointPool
+from a2a_client.logging_utils import get_logger, log_payload
+import asyncio
 import json
 
+logger = get_logger(__name__)
+
+ResponseT = TypeVar("ResponseT", bound=JSONRPCResponse)
+
 
 class A2AClient:
-    def __init__(self, agent_card: AgentCard, auth: str, agent_url: str):
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        auth: str,
+        agent_url: str | list[str],
+        timeout: float = 30,
+        hedge_delay_seconds: float | None = 1,
+    ):
         # The URL accessed here should be the same as the one provided in the agent card
         # However, in this demo we are using the URL provided in the key arguments
-        self.url = agent_url
+        agent_urls = [agent_url] if isinstance(agent_url, str) else agent_url
+        self.url = agent_urls[0]
         # self.url = agent_card.url
+        # Replicas of the agent, requests go to the least busy available one
+        self.endpoints = EndpointPool(agent_urls)
+        self.timeout = timeout
+        # Idempotent requests slower than this are also sent to a second replica
+        self.hedge_delay_seconds = hedge_delay_seconds
         self.auth_header = None
+        self._client: httpx.AsyncClient | None = None
 
         if agent_card.authentication:
             if len(agent_card.authentication.schemes) > 1:
@@ -36,35 +63,200 @@ class A2AClient:
                 else:
                     raise ValueError("Unsupported authentication scheme")
 
-    async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client shared by all requests to reuse pooled connections."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+
+    # Payloads can be given as models, which are used as is instead of being
+    # dumped to a dict and validated again
+
+    async def send_task(
+        self, payload: TaskSendParams | dict[str, Any]
+    ) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return await self._send_request(request, SendTaskResponse)
+
+    async def get_task(
+        self, payload: TaskQueryParams | dict[str, Any]
+    ) -> GetTaskResponse:
+        request = GetTaskRequest(params=payload)
+        return await self._send_request(request, GetTaskResponse, is_idempotent=True)
+
+    async def send_tasks(
+        self, payloads: list[TaskSendParams | dict[str, Any]]
+    ) -> list[SendTaskResponse]:
+        """Sends several tasks in a single JSON-RPC batch request.
+
+        Responses are returned in the same order as the payloads.
+        """
+        requests = [SendTaskRequest(params=payload) for payload in payloads]
+        responses = await self.send_batch(requests)
+        return [SendTaskResponse.model_validate(response) for response in responses]
+
+    async def get_tasks(
+        self, payloads: list[TaskQueryParams | dict[str, Any]]
+    ) -> list[GetTaskResponse]:
+        """Gets several tasks in a single JSON-RPC batch request.
+
+        Responses are returned in the same order as the payloads.
+        """
+        requests = [GetTaskRequest(params=payload) for payload in payloads]
+        responses = await self.send_batch(requests, is_idempotent=True)
+        return [GetTaskResponse.model_validate(response) for response in responses]
 
     async def send_task_streaming(
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         raise NotImplementedError("Streaming is not supported for now")
 
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
+    async def send_batch(
+        self, requests: list[JSONRPCRequest], is_idempotent: bool = False
+    ) -> list[dict[str, Any]]:
+        """Sends the requests as one JSON-RPC batch.
+
+        The server may answer batch members in any order, so the responses are
+        matched back to the requests by their ID. Batches of idempotent requests
+        are hedged like single idempotent requests.
+        """
+        if not requests:
+            return []
+
+        logger.debug("A2A batch request url=%s size=%d", self.url, len(requests))
+        content = (
+            "["
+            + ",".join(
+                request.model_dump_json(exclude_none=True) for request in requests
+            )
+            + "]"
+        )
+        try:
+            response = json.loads(await self._post(content, is_idempotent))
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        if not isinstance(response, list):
+            # The whole batch was rejected, e.g. it exceeds the server batch size
+            raise A2AClientJSONError(f"Batch request rejected: {response}")
+
+        responses_by_id = {r.get("id"): r for r in response}
+        return [
+            responses_by_id.get(
+                request.id,
+                {"id": request.id, "error": {"code": -32603, "message": "No response"}},
+            )
+            for request in requests
+        ]
+
+    async def _send_request(
+        self,
+        request: JSONRPCRequest,
+        response_type: type[ResponseT],
+        is_idempotent: bool = False,
+    ) -> ResponseT:
+        content = request.model_dump_json(exclude_none=True)
+        log_payload(logger, "A2A request", content, url=self.url, method=request.method)
+        response = await self._post(content, is_idempotent)
+        log_payload(logger, "A2A response", response, url=self.url, id=request.id)
+        try:
+            # Validated straight from the response bytes, no intermediate dict
+            return response_type.model_validate_json(response)
+        except ValidationError as e:
+            raise A2AClientJSONError(str(e)) from e
+
+    async def _post(self, content: str | bytes, is_idempotent: bool = False) -> bytes:
+        """Posts to the least busy available replica.
+
+        Requests are retried on another replica only if the connection failed,
+        as the request has not reached the agent then. Idempotent requests are
+        hedged, if there is no response after `hedge_delay_seconds` the request
+        is also sent to a second replica and the first response wins.
+        """
+        excluded_endpoints = set()
+        while True:
+            endpoint = self.endpoints.acquire(exclude=excluded_endpoints)
+            if endpoint is None:
+                # Fail fast instead of waiting for a replica known to be down
+                raise A2AClientHTTPError(503, f"No available endpoint for {self.url}")
+            excluded_endpoints.add(endpoint)
+
             try:
-                # Image generation could take time, adding timeout
-                print(f"Send Remote Agent Task Request: {request.model_dump()}")
-                print("=" * 100)
-                request_kwargs = {
-                    "url": self.url,
-                    "json": request.model_dump(),
-                    "timeout": 30,
-                }
-                if self.auth_header:
-                    request_kwargs["headers"] = {"Authorization": self.auth_header}
-
-                response = await client.post(**request_kwargs)
-                response.raise_for_status()
-                print(f"Send Remote Agent Task Response: {response.json()}")
-                print("=" * 100)
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+                if is_idempotent and self.hedge_delay_seconds is not None:
+                    return await self._post_hedged(
+                        endpoint, content, excluded_endpoints
+                    )
+                return await self._post_to(endpoint, content)
+            except httpx.ConnectError as e:
+                logger.warning("Failed to connect to %s: %s", endpoint.url, e)
+                if len(excluded_endpoints) >= len(self.endpoints):
+                    raise
+
+    async def _post_hedged(
+        self,
+        endpoint: Endpoint,
+        content: str | bytes,
+        excluded_endpoints: set[Endpoint],
+    ) -> bytes:
+        tasks = {asyncio.create_task(self._post_to(endpoint, content))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay_seconds)
+            if not done:
+                hedge_endpoint = self.endpoints.acquire(exclude=excluded_endpoints)
+                if hedge_endpoint is not None:
+                    excluded_endpoints.add(hedge_endpoint)
+                    tasks.add(
+                        asyncio.create_task(self._post_to(hedge_endpoint, content))
+                    )
+
+            error = None
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    # The other replica may still answer
+                    error = e
+            raise error
+        finally:
+            # The losing request is cancelled
+            for task in tasks:
+                task.cancel()
+
+    async def _post_to(self, endpoint: Endpoint, content: str | bytes) -> bytes:
+        """Posts to an acquired endpoint and releases it with the outcome."""
+        is_success = None
+        try:
+            headers = {"Content-Type": "application/json"}
+            if self.auth_header:
+                headers["Authorization"] = self.auth_header
+
+            # Image generation could take time, adding timeout
+            response = await self.client.post(
+                endpoint.url, content=content, headers=headers, timeout=self.timeout
+            )
+            # Client errors are caused by the request, not by the replica
+            is_success = response.status_code < 500
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.TransportError:
+            is_success = False
+            raise
+        finally:
+            self.endpoints.release(endpoint, is_success)
+
+    async def aclose(self, grace_period_seconds: float = 0):
+        """Stops the health checks of the replicas and closes the connections.
+
+        Requests in progress get `grace_period_seconds` to finish first.
+        """
+        self.endpoints.close()
+        if self._client is not None:
+            if grace_period_seconds:
+                await asyncio.sleep(grace_period_seconds)
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,167 @@
+from a2a_client.logging_utils import get_logger
+import asyncio
+import httpx
+import random
+import time
+
+logger = get_logger(__name__)
+
+
+class CircuitBreaker:
+    """Stops sending requests to an endpoint after consecutive failures.
+
+    After `failure_threshold` consecutive failures the breaker opens and the
+    endpoint is skipped for `reset_timeout_seconds`. Then a single trial request
+    is let through, which closes the breaker again on success or reopens it on
+    failure.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.is_trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def is_available(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.is_trial_in_flight:
+            return False
+        return time.monotonic() - self.opened_at >= self.reset_timeout_seconds
+
+    def on_request(self):
+        if self.opened_at is not None:
+            self.is_trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.is_trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.is_trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.is_trial_in_flight = False
+
+
+class Endpoint:
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.outstanding_requests = 0
+        self.is_healthy = True
+
+    def is_available(self) -> bool:
+        return self.is_healthy and self.breaker.is_available()
+
+
+class EndpointPool:
+    """Replicas of one remote agent, balanced by least outstanding requests.
+
+    With more than one replica, the agent card endpoint of every replica is
+    probed every `health_check_interval_seconds` and replicas failing the probe
+    are skipped until they pass it again.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        agent_card_path: str = "/.well-known/agent.json",
+        failure_threshold: int = 3,
+        reset_timeout_seconds: float = 30,
+        health_check_interval_seconds: float = 10,
+        health_check_timeout_seconds: float = 2,
+    ):
+        self.endpoints = [
+            Endpoint(url, CircuitBreaker(failure_threshold, reset_timeout_seconds))
+            for url in urls
+        ]
+        self.agent_card_path = agent_card_path.lstrip("/")
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.health_check_timeout_seconds = health_check_timeout_seconds
+        self._health_check_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(self, exclude: set[Endpoint] = frozenset()) -> Endpoint | None:
+        """Picks the available endpoint with the least outstanding requests."""
+        self.start_health_checks()
+        candidates = [
+            endpoint
+            for endpoint in self.endpoints
+            if endpoint not in exclude and endpoint.is_available()
+        ]
+        if not candidates:
+            return None
+        # Shuffled so ties do not always go to the first replica
+        random.shuffle(candidates)
+        endpoint = min(candidates, key=lambda e: e.outstanding_requests)
+        endpoint.breaker.on_request()
+        endpoint.outstanding_requests += 1
+        return endpoint
+
+    def release(self, endpoint: Endpoint, is_success: bool | None):
+        """Returns an endpoint, `is_success` is None if the outcome is unknown."""
+        endpoint.outstanding_requests -= 1
+        if is_success is None:
+            # Cancelled, e.g. the losing request of a hedge
+            endpoint.breaker.is_trial_in_flight = False
+        elif is_success:
+            endpoint.breaker.record_success()
+        else:
+            endpoint.breaker.record_failure()
+            if endpoint.breaker.is_open:
+                logger.warning("Circuit breaker open for %s", endpoint.url)
+
+    def start_health_checks(self):
+        if len(self.endpoints) < 2 or self._health_check_task is not None:
+            return
+        try:
+            self._health_check_task = asyncio.get_running_loop().create_task(
+                self._check_health_periodically()
+            )
+        except RuntimeError:
+            # No running loop yet, started with the first request instead
+            pass
+
+    def close(self):
+        if self._health_check_task is not None:
+            self._health_check_task.cancel()
+            self._health_check_task = None
+
+    async def check_health(self):
+        async with httpx.AsyncClient(
+            timeout=self.health_check_timeout_seconds
+        ) as client:
+
+            async def probe(endpoint: Endpoint):
+                url = endpoint.url.rstrip("/") + "/" + self.agent_card_path
+                try:
+                    response = await client.get(url)
+                    is_healthy = response.is_success
+                except httpx.HTTPError:
+                    is_healthy = False
+                if is_healthy != endpoint.is_healthy:
+                    logger.warning(
+                        "Endpoint %s is %s",
+                        endpoint.url,
+                        "healthy" if is_healthy else "unhealthy",
+                    )
+                endpoint.is_healthy = is_healthy
+
+            await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+
+    async def _check_health_periodically(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval_seconds)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error("Error while checking endpoint health: %s", e)
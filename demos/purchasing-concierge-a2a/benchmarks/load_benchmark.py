@@ -0,0 +1,572 @@
+"""Load and soak benchmark for the A2A stack with a fake seller LLM.
+
+Starts the pizza and burger seller A2AServers in subprocesses, with the real
+task managers but a scripted fake agent instead of the LLM, then drives them at
+a fixed concurrency. Each scenario runs for `--duration` seconds:
+
+- raw: `tasks/send` followed by `tasks/get` through plain A2A clients
+- tool: the `send_task` tool of the PurchasingAgent, as called by the concierge
+- buyers: simultaneous buyers, each with its own concierge session from the
+  demo SessionStore, ordering in two turns ( inquiry, then confirmation ). A
+  buyer whose turns do not get its own script responses in order counts as an
+  `independence` error
+
+Reports throughput, latency percentiles, memory growth and event loop lag of
+the driver and of each seller. With `--seller-workers` above 1, each seller
+runs that many worker processes sharing a temporary SQLite task store, the
+seller memory and lag are then the ones of the worker answering the stats
+request. No Vertex AI access is needed, so it runs offline on a single Linux
+machine. Like the real agents, the fake agent blocks the seller event loop
+while it "thinks", set `--agent-latency-ms 0` to measure the A2A overhead only.
+
+Usage:
+    uv run benchmarks/load_benchmark.py --concurrency 50 --duration 30
+    uv run benchmarks/load_benchmark.py --scenarios raw --duration 600  # soak
+    uv run benchmarks/load_benchmark.py --scenarios raw --seller-workers 4
+    uv run benchmarks/load_benchmark.py --scenarios buyers --concurrency 100
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = Path(__file__).parent.parent
+
+DEFAULT_SCRIPT = [
+    {
+        "require_user_input": True,
+        "content": "2 Pepperoni Pizza (IDR 140K each), total IDR 280K. "
+        "Please confirm the order.",
+    },
+    {
+        "require_user_input": False,
+        "content": "Order 7f3c has been created: 2 Pepperoni Pizza, total IDR 280K.",
+    },
+]
+
+
+@dataclass(frozen=True)
+class Seller:
+    directory: str
+    agent_class: str
+    card_name: str
+    auth_scheme: str
+    # Credentials of the seller, also given to the concierge through `auth_env`
+    auth: str
+    auth_env: str
+    url_env: str
+    query: str
+
+
+SELLERS = {
+    "pizza": Seller(
+        "pizza_agent",
+        "PizzaSellerAgent",
+        "pizza_seller_agent",
+        "Bearer",
+        "benchmark-api-key",
+        "PIZZA_SELLER_AGENT_AUTH",
+        "PIZZA_SELLER_AGENT_URL",
+        "I want to order 2 pepperoni pizzas",
+    ),
+    "burger": Seller(
+        "burger_agent",
+        "BurgerSellerAgent",
+        "burger_seller_agent",
+        "Basic",
+        "benchmark:password",
+        "BURGER_SELLER_AGENT_AUTH",
+        "BURGER_SELLER_AGENT_URL",
+        "I want to order 2 classic cheeseburgers",
+    ),
+}
+
+
+class FakeSellerAgent:
+    """Stands in for the seller LLM agent, answering from a script in a loop.
+
+    Each session goes through the script on its own, the position of a session
+    is kept in the memory of the worker process answering it.
+    """
+
+    SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
+    script: list[dict] = DEFAULT_SCRIPT
+    latency_seconds = 0.0
+    jitter_seconds = 0.0
+
+    def __init__(self):
+        # Sessions at the start of the script are not kept
+        self.positions: dict[str, int] = {}
+
+    def invoke(self, query, sessionId) -> dict:
+        # Blocking, like the LangGraph and CrewAI invocations it replaces
+        time.sleep(self.latency_seconds + random.uniform(0, self.jitter_seconds))
+        position = self.positions.pop(sessionId, 0)
+        if position + 1 < len(self.script):
+            self.positions[sessionId] = position + 1
+        response = self.script[position]
+        return {
+            "is_task_complete": not response["require_user_input"],
+            "require_user_input": response["require_user_input"],
+            "content": response["content"],
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task sleeping `interval`."""
+
+    def __init__(self, interval_seconds: float = 0.01, max_samples: int = 100_000):
+        self.interval_seconds = interval_seconds
+        self.samples: deque[float] = deque(maxlen=max_samples)
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def collect(self) -> dict[str, float]:
+        """Returns the lag percentiles in ms since the last collection."""
+        samples = list(self.samples)
+        self.samples.clear()
+        return {
+            "p50": percentile(samples, 50) * 1000,
+            "p99": percentile(samples, 99) * 1000,
+            "max": max(samples, default=0.0) * 1000,
+        }
+
+    async def _run(self):
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            lag = time.perf_counter() - started_at - self.interval_seconds
+            self.samples.append(max(lag, 0.0))
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def get_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak instead of current RSS outside Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def find_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(args: argparse.Namespace):
+    """Runs one seller A2AServer with the fake agent, in its own process."""
+    seller = SELLERS[args.serve]
+    sys.path.insert(0, str(ROOT / "remote_seller_agents" / seller.directory))
+
+    FakeSellerAgent.latency_seconds = args.agent_latency_ms / 1000
+    FakeSellerAgent.jitter_seconds = args.agent_jitter_ms / 1000
+    if args.script:
+        FakeSellerAgent.script = json.loads(Path(args.script).read_text())
+    # The seller task manager imports its agent class from the `agent` module
+    fake_agent_module = ModuleType("agent")
+    setattr(fake_agent_module, seller.agent_class, FakeSellerAgent)
+    sys.modules["agent"] = fake_agent_module
+
+    import uvicorn
+    from starlette.responses import JSONResponse
+
+    from a2a_server.push_notification_auth import PushNotificationSenderAuth
+    from a2a_server.server import A2AServer
+    from a2a_server.workers import run_workers
+    from a2a_server.idempotency import SQLiteIdempotencyCache
+    from a2a_server.task_event_log import SQLiteTaskEventBroker
+    from a2a_server.task_store import SQLiteTaskStore
+    from a2a_types import AgentAuthentication, AgentCapabilities, AgentCard, AgentSkill
+    from task_manager import AgentTaskManager
+
+    agent_card = AgentCard(
+        name=seller.card_name,
+        description=f"Helps with creating {args.serve} orders",
+        url=f"http://127.0.0.1:{args.port}/",
+        version="1.0.0",
+        authentication=AgentAuthentication(schemes=[seller.auth_scheme]),
+        defaultInputModes=FakeSellerAgent.SUPPORTED_CONTENT_TYPES,
+        defaultOutputModes=FakeSellerAgent.SUPPORTED_CONTENT_TYPES,
+        capabilities=AgentCapabilities(pushNotifications=True),
+        skills=[
+            AgentSkill(
+                id=f"create_{args.serve}_order",
+                name=f"{args.serve.title()} Order Creation Tool",
+                description=f"Helps with creating {args.serve} orders",
+                tags=[f"{args.serve} order creation"],
+                examples=[seller.query],
+            )
+        ],
+    )
+    task_store = event_broker = idempotency_cache = None
+    if args.seller_workers > 1:
+        db_path = str(Path(tempfile.mkdtemp()) / "tasks.sqlite")
+        task_store = SQLiteTaskStore(db_path)
+        event_broker = SQLiteTaskEventBroker(db_path)
+        idempotency_cache = SQLiteIdempotencyCache(db_path)
+
+    username, _, password = seller.auth.partition(":")
+    server = A2AServer(
+        agent_card=agent_card,
+        task_manager=AgentTaskManager(
+            agent=FakeSellerAgent(),
+            notification_sender_auth=PushNotificationSenderAuth(),
+            task_store=task_store,
+            event_broker=event_broker,
+            idempotency_cache=idempotency_cache,
+        ),
+        host="127.0.0.1",
+        port=args.port,
+        api_key=seller.auth,
+        auth_username=username,
+        auth_password=password,
+    )
+
+    lag_monitor = LoopLagMonitor()
+
+    async def get_stats(request):
+        lag_monitor.start()
+        return JSONResponse({"rss_mb": get_rss_mb(), "lag_ms": lag_monitor.collect()})
+
+    server.app.add_route("/benchmark/stats", get_stats, methods=["GET"])
+    if args.seller_workers > 1:
+        run_workers(
+            server.app,
+            "127.0.0.1",
+            args.port,
+            args.seller_workers,
+            log_level="warning",
+        )
+    else:
+        uvicorn.run(server.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def measure(self, operation: str, awaitable):
+        started_at = time.perf_counter()
+        try:
+            result = await awaitable
+        except Exception:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+            return None
+        self.latencies.setdefault(operation, []).append(
+            time.perf_counter() - started_at
+        )
+        return result
+
+
+async def run_workers(concurrency: int, duration: float, run_once):
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        while time.perf_counter() < deadline:
+            await run_once(worker_id)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+
+async def run_raw_scenario(args, urls: dict[str, str], recorder: Recorder):
+    from a2a_client.card_resolver import resolve_agent_cards
+    from a2a_client.client import A2AClient
+    from a2a_types import Message, TaskQueryParams, TaskSendParams, TextPart
+
+    cards = await resolve_agent_cards(list(urls.values()))
+    clients = {
+        name: A2AClient(cards[url], auth=SELLERS[name].auth, agent_url=url)
+        for name, url in urls.items()
+    }
+    names = list(clients)
+
+    async def run_once(worker_id: int):
+        name = names[worker_id % len(names)]
+        client = clients[name]
+        params = TaskSendParams(
+            id=str(uuid.uuid4()),
+            sessionId=f"session-{random.randrange(args.sessions)}",
+            message=Message(
+                role="user",
+                parts=[TextPart(text=SELLERS[name].query)],
+                metadata={"message_id": str(uuid.uuid4())},
+            ),
+            acceptedOutputModes=["text", "text/plain"],
+        )
+        response = await recorder.measure("tasks/send", client.send_task(params))
+        if response is not None:
+            await recorder.measure(
+                "tasks/get",
+                client.get_task(TaskQueryParams(id=params.id, historyLength=1)),
+            )
+
+    try:
+        await run_workers(args.concurrency, args.duration, run_once)
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+
+async def run_tool_scenario(args, urls: dict[str, str], recorder: Recorder):
+    from purchasing_concierge.purchasing_agent import PurchasingAgent
+
+    purchasing_agent = PurchasingAgent(remote_agent_addresses=list(urls.values()))
+    agent_names = list(purchasing_agent.remote_agent_connections)
+
+    async def run_once(worker_id: int):
+        # The send_task tool only uses the state and actions of the ADK ToolContext
+        tool_context = SimpleNamespace(
+            state={"session_id": f"session-{random.randrange(args.sessions)}"},
+            actions=SimpleNamespace(escalate=False),
+        )
+        name = agent_names[worker_id % len(agent_names)]
+        query = SELLERS["pizza" if "pizza" in name else "burger"].query
+        await recorder.measure(
+            "send_task tool",
+            purchasing_agent.send_task(name, query, tool_context),
+        )
+
+    await run_workers(args.concurrency, args.duration, run_once)
+
+
+async def run_buyers_scenario(args, urls: dict[str, str], recorder: Recorder):
+    from google.adk.sessions import InMemorySessionService
+    from purchasing_concierge.purchasing_agent import PurchasingAgent
+    from purchasing_concierge.session_store import SessionStore
+
+    purchasing_agent = PurchasingAgent(remote_agent_addresses=list(urls.values()))
+    agent_names = list(purchasing_agent.remote_agent_connections)
+    session_store = SessionStore(
+        InMemorySessionService(), "load_benchmark", max_sessions=args.sessions
+    )
+    buyer_ids = itertools.count()
+    script = FakeSellerAgent.script
+
+    async def run_once(worker_id: int):
+        buyer_id = f"buyer-{next(buyer_ids)}"
+        name = agent_names[worker_id % len(agent_names)]
+        query = SELLERS["pizza" if "pizza" in name else "burger"].query
+        async with session_store.acquire(buyer_id, buyer_id) as session:
+            # The send_task tool only uses the state and actions of the ADK ToolContext
+            tool_context = SimpleNamespace(
+                state={"session_id": session.id},
+                actions=SimpleNamespace(escalate=False),
+            )
+            for turn, task in enumerate([query, "Yes, please confirm the order"]):
+                tool_context.actions.escalate = False
+                response = await recorder.measure(
+                    f"buyer turn {turn + 1}",
+                    purchasing_agent.send_task(name, task, tool_context),
+                )
+                if response is None:
+                    return
+                expected = script[turn % len(script)]
+                if (
+                    response != [expected["content"]]
+                    or tool_context.actions.escalate != expected["require_user_input"]
+                ):
+                    recorder.errors["independence"] = (
+                        recorder.errors.get("independence", 0) + 1
+                    )
+                    return
+
+    await run_workers(args.concurrency, args.duration, run_once)
+    print(f"buyers: {next(buyer_ids)} started, {len(session_store)} sessions kept")
+
+
+async def get_seller_stats(urls: dict[str, str]) -> dict[str, dict]:
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        responses = await asyncio.gather(
+            *(client.get(url + "benchmark/stats") for url in urls.values())
+        )
+    return {name: r.json() for name, r in zip(urls, responses)}
+
+
+async def wait_until_ready(url: str, timeout: float = 30):
+    import httpx
+
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url + ".well-known/agent.json")).is_success:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Seller at {url} did not start")
+            await asyncio.sleep(0.1)
+
+
+def print_report(
+    scenario: str,
+    duration: float,
+    recorder: Recorder,
+    driver: dict,
+    sellers_before: dict,
+    sellers_after: dict,
+):
+    print(f"\n== {scenario} ({duration:.1f}s)")
+    print(
+        f"{'operation':>16} {'ops':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'errors':>7}"
+    )
+    for operation in sorted(set(recorder.latencies) | set(recorder.errors)):
+        latencies = recorder.latencies.get(operation, [])
+        print(
+            f"{operation:>16} {len(latencies):>7} {len(latencies) / duration:>8.1f} "
+            + " ".join(f"{percentile(latencies, p) * 1000:>8.1f}" for p in (50, 95, 99))
+            + f" {max(latencies, default=0) * 1000:>8.1f}"
+            + f" {recorder.errors.get(operation, 0):>7}"
+        )
+
+    print(
+        f"{'process':>16} {'rss MB':>8} {'growth':>8} "
+        f"{'lag p50':>8} {'lag p99':>8} {'lag max':>8}"
+    )
+    rows = [("driver", driver)] + [
+        (
+            name,
+            {
+                "rss_mb": stats["rss_mb"],
+                "rss_growth_mb": stats["rss_mb"] - sellers_before[name]["rss_mb"],
+                "lag_ms": stats["lag_ms"],
+            },
+        )
+        for name, stats in sellers_after.items()
+    ]
+    for name, stats in rows:
+        lag = stats["lag_ms"]
+        print(
+            f"{name:>16} {stats['rss_mb']:>8.1f} {stats['rss_growth_mb']:>+8.1f} "
+            f"{lag['p50']:>8.2f} {lag['p99']:>8.2f} {lag['max']:>8.2f}"
+        )
+
+
+async def benchmark(args: argparse.Namespace):
+    sys.path.insert(0, str(ROOT))
+    urls = {name: f"http://127.0.0.1:{find_free_port()}/" for name in SELLERS}
+    for name, seller in SELLERS.items():
+        # Read by the concierge, environment variables take precedence over .env
+        os.environ[seller.auth_env] = seller.auth
+        os.environ[seller.url_env] = urls[name]
+
+    processes = []
+    for name, url in urls.items():
+        command = [
+            sys.executable,
+            __file__,
+            "--serve",
+            name,
+            "--port",
+            url.rsplit(":", 1)[1].rstrip("/"),
+            "--agent-latency-ms",
+            str(args.agent_latency_ms),
+            "--agent-jitter-ms",
+            str(args.agent_jitter_ms),
+            "--seller-workers",
+            str(args.seller_workers),
+        ]
+        if args.script:
+            command += ["--script", args.script]
+        processes.append(await asyncio.create_subprocess_exec(*command))
+
+    scenarios = {
+        "raw": run_raw_scenario,
+        "tool": run_tool_scenario,
+        "buyers": run_buyers_scenario,
+    }
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    try:
+        await asyncio.gather(*(wait_until_ready(url) for url in urls.values()))
+        for scenario in args.scenarios.split(","):
+            sellers_before = await get_seller_stats(urls)
+            driver_rss_before = get_rss_mb()
+            lag_monitor.collect()
+            recorder = Recorder()
+
+            started_at = time.perf_counter()
+            await scenarios[scenario](args, urls, recorder)
+            duration = time.perf_counter() - started_at
+
+            driver = {
+                "rss_mb": get_rss_mb(),
+                "rss_growth_mb": get_rss_mb() - driver_rss_before,
+                "lag_ms": lag_monitor.collect(),
+            }
+            sellers_after = await get_seller_stats(urls)
+            print_report(
+                scenario, duration, recorder, driver, sellers_before, sellers_after
+            )
+    finally:
+        lag_monitor.stop()
+        for process in processes:
+            process.terminate()
+        await asyncio.gather(*(process.wait() for process in processes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="raw,tool")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--agent-latency-ms", type=float, default=20.0)
+    parser.add_argument("--agent-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seller-workers", type=int, default=1)
+    parser.add_argument(
+        "--script",
+        help="JSON file with the agent responses to cycle through, a list of "
+        "{'require_user_input': bool, 'content': str}",
+    )
+    # Internal, used to start the sellers
+    parser.add_argument("--serve", choices=SELLERS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if "buyers" in args.scenarios.split(",") and args.seller_workers > 1:
+        # The fake agent keeps the script position of a session per worker
+        parser.error("the buyers scenario needs a single seller worker")
+
+    if args.serve:
+        serve(args)
+    else:
+        asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Push notification signing and verification throughput benchmark.
+
+Signs and verifies task push notifications on a single core, once with the
+previous path (RS256, task dict re-serialized to canonical JSON on both sides)
+and once for each supported algorithm with the digest calculated over the raw
+body bytes.
+
+Usage:
+    uv run benchmarks/push_notification_benchmark.py --notifications 2000
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jwt  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from a2a_client.push_notification_auth import (  # noqa: E402
+    JWK_GENERATION_PARAMS,
+    PushNotificationReceiverAuth,
+    PushNotificationSenderAuth,
+)
+from a2a_types import (  # noqa: E402
+    Artifact,
+    Message,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+
+def create_task() -> Task:
+    order = "2 Pepperoni Pizza (IDR 140K each), 1 Margherita Pizza (IDR 100K). " * 5
+    return Task(
+        id="task",
+        sessionId="session",
+        status=TaskStatus(state=TaskState.COMPLETED),
+        artifacts=[Artifact(parts=[TextPart(text=f"Order created: {order}")])],
+        history=[
+            Message(role="user", parts=[TextPart(text=f"Please order {order}")]),
+            Message(role="agent", parts=[TextPart(text=f"Confirm {order}?")]),
+        ],
+    )
+
+
+def create_request(body: bytes, token: str) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/notify",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def create_receiver(sender: PushNotificationSenderAuth) -> PushNotificationReceiverAuth:
+    receiver = PushNotificationReceiverAuth()
+    receiver.signing_keys = {
+        key["kid"]: jwt.PyJWK.from_dict(key) for key in sender.public_keys
+    }
+    receiver.jwks_fetched_at = time.monotonic()
+    return receiver
+
+
+def canonical_sha256(data: dict) -> str:
+    body_str = json.dumps(
+        data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    )
+    return hashlib.sha256(body_str.encode()).hexdigest()
+
+
+async def benchmark_previous(task: Task, notifications: int) -> float:
+    sender = PushNotificationSenderAuth("RS256")
+    sender.generate_jwk()
+    receiver = create_receiver(sender)
+    started_at = time.perf_counter()
+    for _ in range(notifications):
+        data = task.model_dump(exclude_none=True)
+        token = jwt.encode(
+            {"iat": int(time.time()), "request_body_sha256": canonical_sha256(data)},
+            key=sender.private_key_jwk,
+            headers={"kid": sender.private_key_jwk.key_id},
+            algorithm="RS256",
+        )
+        body = json.dumps(data).encode()
+
+        request = create_request(body, token)
+        signing_key = await receiver.get_signing_key(
+            jwt.get_unverified_header(token)["kid"]
+        )
+        decoded = jwt.decode(
+            token,
+            signing_key,
+            options={"require": ["iat", "request_body_sha256"]},
+            algorithms=["RS256"],
+        )
+        assert canonical_sha256(await request.json()) == decoded["request_body_sha256"]
+    return time.perf_counter() - started_at
+
+
+async def benchmark_current(task: Task, notifications: int, algorithm: str) -> float:
+    sender = PushNotificationSenderAuth(algorithm)
+    sender.generate_jwk()
+    receiver = create_receiver(sender)
+    started_at = time.perf_counter()
+    for _ in range(notifications):
+        body = task.model_dump_json(exclude_none=True).encode()
+        token = sender._generate_jwt(body)
+        assert await receiver.verify_push_notification(create_request(body, token))
+    return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=2000)
+    args = parser.parse_args()
+
+    task = create_task()
+    elapsed = asyncio.run(benchmark_previous(task, args.notifications))
+    print(f"{'previous RS256':>16}: {args.notifications / elapsed:.1f} notifications/s")
+    for algorithm in JWK_GENERATION_PARAMS:
+        elapsed = asyncio.run(benchmark_current(task, args.notifications, algorithm))
+        print(f"{algorithm:>16}: {args.notifications / elapsed:.1f} notifications/s")
+
+
+if __name__ == "__main__":
+    main()
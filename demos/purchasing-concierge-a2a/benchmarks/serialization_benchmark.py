@@ -0,0 +1,137 @@
+"""Serialization benchmark for the A2A messages exchanged per hop.
+
+Encodes and decodes each message type, once with the previous client path
+(params dumped to a dict and validated again into the request, `json.dumps` of
+`model_dump()` to encode and `Model(**json.loads(...))` to decode) and once with
+the current one (models passed as is, `model_dump_json` and
+`model_validate_json`).
+
+Usage:
+    uv run benchmarks/serialization_benchmark.py --iterations 20000
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from a2a_types import (  # noqa: E402
+    Artifact,
+    GetTaskRequest,
+    GetTaskResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+def create_params() -> TaskSendParams:
+    return TaskSendParams(
+        id="task",
+        sessionId="session",
+        message=Message(
+            role="user",
+            parts=[TextPart(text="I want to order 2 pepperoni pizzas and a coke")],
+            metadata={"conversation_id": "session", "message_id": "message"},
+        ),
+        acceptedOutputModes=["text", "text/plain"],
+        metadata={"conversation_id": "session"},
+    )
+
+
+def create_task() -> Task:
+    order = "2 Pepperoni Pizza (IDR 140K each), 1 Margherita Pizza (IDR 100K). "
+    return Task(
+        id="task",
+        sessionId="session",
+        status=TaskStatus(
+            state=TaskState.INPUT_REQUIRED,
+            message=Message(role="agent", parts=[TextPart(text=f"Confirm {order}?")]),
+        ),
+        artifacts=[Artifact(parts=[TextPart(text=f"Order draft: {order}")])],
+        history=[
+            Message(role="user", parts=[TextPart(text=f"Please order {order}")])
+            for _ in range(10)
+        ],
+    )
+
+
+def measure(fn, iterations: int) -> float:
+    """Returns the mean duration of `fn` in microseconds."""
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+def format_us(value: float | None) -> str:
+    return f"{value:6.1f}" if value is not None else f"{'-':>6}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    params = create_params()
+    task = create_task()
+    # Message type, model instance and a callable creating it from its payload
+    messages = [
+        (
+            "SendTaskRequest",
+            SendTaskRequest(id="1", params=params),
+            lambda: SendTaskRequest(id="1", params=params.model_dump()),
+            lambda: SendTaskRequest(id="1", params=params),
+        ),
+        (
+            "GetTaskRequest",
+            GetTaskRequest(id="1", params=TaskQueryParams(id="task")),
+            lambda: GetTaskRequest(
+                id="1", params=TaskQueryParams(id="task").model_dump()
+            ),
+            lambda: GetTaskRequest(id="1", params=TaskQueryParams(id="task")),
+        ),
+        ("SendTaskResponse", SendTaskResponse(id="1", result=task), None, None),
+        ("GetTaskResponse", GetTaskResponse(id="1", result=task), None, None),
+        (
+            "TaskStatusUpdateEvent",
+            TaskStatusUpdateEvent(id="task", status=task.status, final=True),
+            None,
+            None,
+        ),
+    ]
+
+    columns = f"{'create':>6} {'enc':>6} {'dec':>6}"
+    print(f"{'':>22} {'previous':>20} {'current':>20}")
+    print(f"{'message (us)':>22} {columns} {columns}")
+    for name, model, create_previous, create_current in messages:
+        model_type = type(model)
+        previous_body = json.dumps(model.model_dump()).encode()
+        current_body = model.model_dump_json(exclude_none=True).encode()
+        previous = [
+            measure(create_previous, args.iterations) if create_previous else None,
+            measure(lambda: json.dumps(model.model_dump()).encode(), args.iterations),
+            measure(lambda: model_type(**json.loads(previous_body)), args.iterations),
+        ]
+        current = [
+            measure(create_current, args.iterations) if create_current else None,
+            measure(lambda: model.model_dump_json(exclude_none=True), args.iterations),
+            measure(
+                lambda: model_type.model_validate_json(current_body), args.iterations
+            ),
+        ]
+        print(f"{name:>22} " + " ".join(format_us(v) for v in previous + current))
+
+
+if __name__ == "__main__":
+    main()
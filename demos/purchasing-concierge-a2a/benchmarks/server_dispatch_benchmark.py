@@ -0,0 +1,170 @@
+"""Request rate benchmark for the seller A2AServer JSON-RPC dispatch.
+
+Sends `tasks/get` and `tasks/send` requests in-process through the ASGI app of an
+A2AServer, once with the previous request path (`request.json()`, full union
+validation from Python objects, isinstance dispatch and `JSONResponse`) and
+once with the current one. The task manager answers instantly so only the
+request handling overhead is measured.
+
+Usage:
+    uv run benchmarks/server_dispatch_benchmark.py --requests 5000
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(
+    0, str(Path(__file__).parent.parent / "remote_seller_agents" / "pizza_agent")
+)
+
+import httpx  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from a2a_server.server import A2AServer  # noqa: E402
+from a2a_server.task_manager import InMemoryTaskManager  # noqa: E402
+from a2a_types import (  # noqa: E402
+    A2ARequest,
+    AgentAuthentication,
+    AgentCapabilities,
+    AgentCard,
+    GetTaskRequest,
+    GetTaskResponse,
+    JSONRPCResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+API_KEY = "benchmark"
+
+
+class InstantTaskManager(InMemoryTaskManager):
+    def __init__(self):
+        super().__init__()
+        self.task = Task(
+            id="task",
+            sessionId="session",
+            status=TaskStatus(
+                state=TaskState.INPUT_REQUIRED,
+                message=Message(
+                    role="agent",
+                    parts=[TextPart(text="2 pepperoni pizzas is IDR 280K. Confirm?")],
+                ),
+            ),
+            history=[Message(role="user", parts=[TextPart(text="2 pepperoni pizzas")])],
+        )
+
+    async def on_get_task(self, request):
+        return GetTaskResponse(id=request.id, result=self.task)
+
+    async def on_send_task(self, request):
+        return SendTaskResponse(id=request.id, result=self.task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError()
+
+
+class LegacyA2AServer(A2AServer):
+    """A2AServer using the request path before the dispatch table was added."""
+
+    async def _process_request(self, request: Request):
+        is_valid, error_message = await self.verify_auth_header(request)
+        if not is_valid:
+            return JSONResponse({"error": error_message}, status_code=401)
+
+        try:
+            body = await request.json()
+            json_rpc_request = A2ARequest.validate_python(body)
+            if isinstance(json_rpc_request, GetTaskRequest):
+                result = await self.task_manager.on_get_task(json_rpc_request)
+            elif isinstance(json_rpc_request, SendTaskRequest):
+                result = await self.task_manager.on_send_task(json_rpc_request)
+            else:
+                raise ValueError(f"Unexpected request type: {type(request)}")
+
+            if isinstance(result, JSONRPCResponse):
+                return JSONResponse(result.model_dump(exclude_none=True))
+            raise ValueError(f"Unexpected result type: {type(result)}")
+        except Exception as e:
+            return self._handle_exception(e)
+
+
+def create_server(server_cls: type[A2AServer]) -> A2AServer:
+    agent_card = AgentCard(
+        name="benchmark_seller_agent",
+        url="http://localhost:10000/",
+        version="1.0.0",
+        authentication=AgentAuthentication(schemes=["Bearer"]),
+        capabilities=AgentCapabilities(),
+        skills=[],
+    )
+    return server_cls(
+        agent_card=agent_card, task_manager=InstantTaskManager(), api_key=API_KEY
+    )
+
+
+def create_payloads() -> list[bytes]:
+    get_task = GetTaskRequest(params=TaskQueryParams(id="task", historyLength=1))
+    send_task = SendTaskRequest(
+        params=TaskSendParams(
+            id="task",
+            sessionId="session",
+            message=Message(
+                role="user",
+                parts=[TextPart(text="I want to order 2 pepperoni pizzas")],
+                metadata={"conversation_id": "session", "message_id": "message"},
+            ),
+            acceptedOutputModes=["text", "text/plain"],
+        )
+    )
+    return [get_task.model_dump_json().encode(), send_task.model_dump_json().encode()]
+
+
+async def benchmark(server: A2AServer, requests: int, concurrency: int) -> float:
+    payloads = create_payloads()
+    transport = httpx.ASGITransport(app=server.app)
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json",
+    }
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+
+        async def worker(worker_index: int):
+            for i in range(worker_index, requests, concurrency):
+                response = await client.post(
+                    "/", content=payloads[i % len(payloads)], headers=headers
+                )
+                response.raise_for_status()
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    for name, server_cls in [("previous", LegacyA2AServer), ("current", A2AServer)]:
+        elapsed = asyncio.run(
+            benchmark(create_server(server_cls), args.requests, args.concurrency)
+        )
+        print(f"{name:>10}: {args.requests / elapsed:.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Concurrent task benchmark for the seller InMemoryTaskManager.
+
+Runs many independent tasks through the upsert -> update -> get cycle of a seller
+task manager and compares a single lock (the previous behavior) with striped
+per-task locks. A small latency is added to the task store to simulate a store
+which does I/O, e.g. the SQLite task store.
+
+Usage:
+    uv run benchmarks/task_manager_benchmark.py --tasks 500 --store-latency-ms 1
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+
+sys.path.insert(
+    0, str(Path(__file__).parent.parent / "remote_seller_agents" / "pizza_agent")
+)
+
+from a2a_server.task_manager import InMemoryTaskManager  # noqa: E402
+from a2a_server.task_store import InMemoryTaskStore  # noqa: E402
+from a2a_types import (  # noqa: E402
+    GetTaskRequest,
+    Message,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+
+class SlowTaskStore(InMemoryTaskStore):
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds = latency_seconds
+
+    async def get_task(self, task_id):
+        await asyncio.sleep(self.latency_seconds)
+        return await super().get_task(task_id)
+
+    async def save_task(self, task):
+        await asyncio.sleep(self.latency_seconds)
+        await super().save_task(task)
+
+
+class BenchmarkTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError()
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError()
+
+
+async def run_task(task_manager: InMemoryTaskManager, updates: int):
+    task_id = str(uuid.uuid4())
+    message = Message(role="user", parts=[TextPart(text="2 pepperoni pizzas")])
+    await task_manager.upsert_task(TaskSendParams(id=task_id, message=message))
+    for _ in range(updates):
+        await task_manager.update_store(
+            task_id, TaskStatus(state=TaskState.WORKING), None
+        )
+        await task_manager.on_get_task(
+            GetTaskRequest(params=TaskQueryParams(id=task_id, historyLength=5))
+        )
+
+
+async def benchmark(lock_stripes: int, args: argparse.Namespace) -> dict:
+    task_manager = BenchmarkTaskManager(
+        task_store=SlowTaskStore(args.store_latency_ms / 1000),
+        lock_stripes=lock_stripes,
+    )
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(run_task(task_manager, args.updates) for _ in range(args.tasks))
+    )
+    elapsed = time.perf_counter() - started_at
+    return {"elapsed": elapsed, **task_manager.get_lock_stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=4)
+    parser.add_argument("--store-latency-ms", type=float, default=1.0)
+    parser.add_argument("--lock-stripes", type=int, default=64)
+    args = parser.parse_args()
+
+    for name, lock_stripes in [
+        ("single lock", 1),
+        (f"{args.lock_stripes} lock stripes", args.lock_stripes),
+    ]:
+        result = asyncio.run(benchmark(lock_stripes, args))
+        print(
+            f"{name:>20}: {result['elapsed']:.3f}s, "
+            f"{args.tasks / result['elapsed']:.1f} tasks/s, "
+            f"{result['contentions']}/{result['acquisitions']} contended acquisitions, "
+            f"{result['wait_seconds']:.3f}s waiting for locks"
+        )
+
+
+if __name__ == "__main__":
+    main()
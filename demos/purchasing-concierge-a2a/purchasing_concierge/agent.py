@@ -1,12 +1,35 @@
+from .instruction_cache import InstructionCache
 from .purchasing_agent import PurchasingAgent
+from .seller_index import SellerIndex, create_genai_embedder
+from a2a_client.card_resolver import AgentCardCache
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+embedding_model = os.getenv("SELLER_ROUTING_EMBEDDING_MODEL")
+instruction_cache_ttl_seconds = float(
+    os.getenv("INSTRUCTION_CACHE_TTL_SECONDS", "3600")
+)
+
 root_agent = PurchasingAgent(
+    # Comma separated URLs are replicas of the same seller agent
     remote_agent_addresses=[
-        os.getenv("PIZZA_SELLER_AGENT_URL", "http://localhost:10000"),
-        os.getenv("BURGER_SELLER_AGENT_URL", "http://localhost:10001"),
-    ]
+        *os.getenv("PIZZA_SELLER_AGENT_URL", "http://localhost:10000").split(","),
+        *os.getenv("BURGER_SELLER_AGENT_URL", "http://localhost:10001").split(","),
+    ],
+    agent_card_cache=AgentCardCache(
+        os.getenv("AGENT_CARD_CACHE_DIR", ".agent_card_cache"),
+        ttl_seconds=float(os.getenv("AGENT_CARD_CACHE_TTL_SECONDS", "300")),
+    ),
+    refresh_interval_seconds=float(os.getenv("AGENT_REGISTRY_REFRESH_SECONDS", "60")),
+    seller_index=SellerIndex(
+        embedder=create_genai_embedder(embedding_model) if embedding_model else None
+    ),
+    routing_top_k=int(os.getenv("SELLER_ROUTING_TOP_K", "5")),
+    instruction_cache=(
+        InstructionCache(ttl_seconds=instruction_cache_ttl_seconds)
+        if instruction_cache_ttl_seconds > 0
+        else None
+    ),
 ).create_agent()
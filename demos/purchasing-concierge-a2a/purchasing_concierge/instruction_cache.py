@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import time
+
+from a2a_client.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_TTL_SECONDS = 60 * 60
+# Caches about to expire are replaced instead of being used by a request
+CACHE_EXPIRY_MARGIN_SECONDS = 60
+# Static parts which could not be cached are tried again after this delay
+FAILED_CACHE_RETRY_SECONDS = 60 * 10
+MAX_FAILED_KEYS = 100
+# Replaced caches are kept this long for the requests already using them
+REPLACED_CACHE_DELETE_DELAY_SECONDS = 60 * 2
+
+
+@dataclass
+class CachedInstruction:
+    key: str
+    name: str
+    expires_at: float
+
+
+class InstructionCache:
+    """Keeps the static part of the concierge requests in a Gemini context cache.
+
+    The static instruction and the tool declarations are stored once as cached
+    content, so model calls only send the conversation and the per turn
+    instruction lines. The cache is keyed by its content, a new one is created
+    when the static part changes, e.g. when the seller registry changes, and
+    the previous one is deleted once the requests using it are done. When a cache cannot be created, e.g. when the
+    static part is below the minimum cached token count of the model, requests
+    keep sending everything until the static part changes or for
+    `FAILED_CACHE_RETRY_SECONDS`, whichever comes first.
+    """
+
+    def __init__(self, client=None, ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS):
+        # Created on first use, so the agent loads without Vertex AI credentials
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+        self._cached: CachedInstruction | None = None
+        # Key to the monotonic time its creation can be tried again, oldest first
+        self._failed_keys: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        # Pending deletions of replaced caches, referenced until they are done
+        self._delete_tasks: set[asyncio.Task] = set()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    async def get(self, model: str, system_instruction: str, tools: list) -> str | None:
+        """Returns the name of the cached content, None if it is not available."""
+        key = hashlib.sha256(
+            "\n".join(
+                [
+                    model,
+                    system_instruction,
+                    *(tool.model_dump_json(exclude_none=True) for tool in tools),
+                ]
+            ).encode()
+        ).hexdigest()
+        if self._failed_keys.get(key, 0) > time.monotonic():
+            return None
+        if self._is_valid(key):
+            return self._cached.name
+
+        async with self._lock:
+            # Another request may have created it while waiting for the lock
+            if self._is_valid(key):
+                return self._cached.name
+            return await self._create(key, model, system_instruction, tools)
+
+    async def _create(
+        self, key: str, model: str, system_instruction: str, tools: list
+    ) -> str | None:
+        from google.genai import types
+
+        try:
+            cached_content = await self.client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name="purchasing_concierge_instruction",
+                    system_instruction=system_instruction,
+                    tools=tools or None,
+                    ttl=f"{int(self.ttl_seconds)}s",
+                ),
+            )
+        except Exception as e:
+            logger.warning("Failed to cache the concierge instruction: %s", e)
+            self._failed_keys.pop(key, None)
+            if len(self._failed_keys) >= MAX_FAILED_KEYS:
+                del self._failed_keys[next(iter(self._failed_keys))]
+            self._failed_keys[key] = time.monotonic() + FAILED_CACHE_RETRY_SECONDS
+            return None
+
+        previous = self._cached
+        self._cached = CachedInstruction(
+            key, cached_content.name, time.monotonic() + self.ttl_seconds
+        )
+        if (
+            previous is not None
+            and previous.expires_at - time.monotonic()
+            > REPLACED_CACHE_DELETE_DELAY_SECONDS
+        ):
+            # Otherwise it expires before the delay anyway
+            task = asyncio.create_task(
+                self._delete(previous.name, REPLACED_CACHE_DELETE_DELAY_SECONDS)
+            )
+            self._delete_tasks.add(task)
+            task.add_done_callback(self._delete_tasks.discard)
+        return cached_content.name
+
+    async def _delete(self, name: str, delay_seconds: float = 0):
+        await asyncio.sleep(delay_seconds)
+        try:
+            await self.client.aio.caches.delete(name=name)
+        except Exception as e:
+            # Left to expire with its TTL
+            logger.debug("Failed to delete cached content %s: %s", name, e)
+
+    def _is_valid(self, key: str) -> bool:
+        return (
+            self._cached is not None
+            and self._cached.key == key
+            and self._cached.expires_at - CACHE_EXPIRY_MARGIN_SECONDS > time.monotonic()
+        )
@@ -1,17 +1,23 @@
+import asyncio
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
-import httpx
 
 
 from google.adk import Agent
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+from .instruction_cache import InstructionCache
 from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
-from a2a_client.card_resolver import A2ACardResolver
+from .seller_index import SellerIndex
+from a2a_client.card_resolver import AgentCardCache, resolve_agent_cards
+from a2a_client.logging_utils import get_logger, log_payload
 from a2a_types import (
     AgentCard,
+    JSONRPCError,
     Message,
     TaskState,
     Task,
@@ -20,6 +26,17 @@ from a2a_types import (
     Part,
 )
 
+logger = get_logger(__name__)
+
+MAX_TRACKED_TASKS = 20
+MAX_CACHED_ROUTES = 128
+TERMINAL_TASK_STATES = [
+    TaskState.COMPLETED,
+    TaskState.CANCELED,
+    TaskState.FAILED,
+    TaskState.UNKNOWN,
+]
+
 
 class PurchasingAgent:
     """The purchasing agent.
@@ -32,27 +49,119 @@ class PurchasingAgent:
         self,
         remote_agent_addresses: List[str],
         task_callback: TaskUpdateCallback | None = None,
+        agent_card_cache: AgentCardCache | None = None,
+        agent_card_timeout: float = 5,
+        refresh_interval_seconds: float = 60,
+        task_deadline_seconds: float = 25,
+        seller_index: SellerIndex | None = None,
+        routing_top_k: int = 5,
+        instruction_cache: InstructionCache | None = None,
     ):
         self.task_callback = task_callback
+        self.remote_agent_addresses = remote_agent_addresses
+        self.agent_card_cache = agent_card_cache
+        self.agent_card_timeout = agent_card_timeout
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.task_deadline_seconds = task_deadline_seconds
+        self.seller_index = seller_index or SellerIndex()
+        self.routing_top_k = routing_top_k
+        self.instruction_cache = instruction_cache
+        # User request to the names of the agents routed to
+        self._routes: dict[str, list[str]] = {}
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
-        for address in remote_agent_addresses:
-            card_resolver = A2ACardResolver(address)
-            try:
-                card = card_resolver.get_agent_card()
-                # The URL accessed here should be the same as the one provided in the agent card
-                # However, in this demo we are using the URL provided in the key arguments
-                remote_connection = RemoteAgentConnections(
-                    agent_card=card, agent_url=address
+        self.agents = ""
+        # Rules and agent roster, only rebuilt when the registry changes
+        self.static_instruction = ""
+        self._refresh_task: asyncio.Task | None = None
+        # Replaced connections being closed, referenced until they are
+        self._closing_tasks: set[asyncio.Task] = set()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.refresh_remote_agents())
+        else:
+            # Created inside a running event loop, e.g. when loaded by `adk web`
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(asyncio.run, self.refresh_remote_agents()).result()
+
+    async def refresh_remote_agents(self):
+        """Fetches all remote agent cards concurrently and updates the registry.
+
+        Addresses serving the same agent card name are replicas of one agent.
+        Connections are only recreated for agents whose card or replicas
+        changed. Agents that cannot be reached keep their previous card, so a
+        transient failure does not remove them.
+        """
+        cards = await resolve_agent_cards(
+            self.remote_agent_addresses,
+            cache=self.agent_card_cache,
+            timeout=self.agent_card_timeout,
+        )
+
+        previous_cards = {
+            address: connection.card
+            for connection in self.remote_agent_connections.values()
+            for address in connection.agent_urls
+        }
+        agent_cards: dict[str, AgentCard] = {}
+        agent_urls: dict[str, list[str]] = {}
+        for address in self.remote_agent_addresses:
+            card = cards.get(address, previous_cards.get(address))
+            if card is None:
+                continue
+            agent_cards.setdefault(card.name, card)
+            agent_urls.setdefault(card.name, []).append(address)
+
+        remote_agent_connections = {}
+        for name, card in agent_cards.items():
+            previous = self.remote_agent_connections.get(name)
+            if (
+                previous is not None
+                and previous.card == card
+                and previous.agent_urls == agent_urls[name]
+            ):
+                remote_agent_connections[name] = previous
+                continue
+            # The URL accessed here should be the same as the one provided in the agent card
+            # However, in this demo we are using the URL provided in the key arguments
+            remote_agent_connections[name] = RemoteAgentConnections(
+                agent_card=card, agent_urls=agent_urls[name]
+            )
+
+        cards = {
+            name: connection.card
+            for name, connection in remote_agent_connections.items()
+        }
+        if cards != self.cards:
+            # Embedding the cards may call a remote model, keep the loop responsive
+            await asyncio.to_thread(self.seller_index.build, list(cards.values()))
+            self._routes = {}
+
+        # Swap the whole registry so concurrent tool calls see a consistent view
+        previous_connections = self.remote_agent_connections
+        self.remote_agent_connections = remote_agent_connections
+        for name, connection in previous_connections.items():
+            if remote_agent_connections.get(name) is not connection:
+                # Tool calls may still use the previous registry, their
+                # requests are given the client timeout to finish
+                task = asyncio.create_task(
+                    connection.aclose(connection.agent_client.timeout)
                 )
-                self.remote_agent_connections[card.name] = remote_connection
-                self.cards[card.name] = card
-            except httpx.ConnectError:
-                print(f"ERROR: Failed to get agent card from : {address}")
-        agent_info = []
-        for ra in self.list_remote_agents():
-            agent_info.append(json.dumps(ra))
-        self.agents = "\n".join(agent_info)
+                self._closing_tasks.add(task)
+                task.add_done_callback(self._closing_tasks.discard)
+        self.cards = cards
+        self.agents = "\n".join(json.dumps(ra) for ra in self.list_remote_agents())
+        self.static_instruction = self.build_static_instruction()
+
+    async def _refresh_remote_agents_periodically(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval_seconds)
+            try:
+                await self.refresh_remote_agents()
+            except Exception as e:
+                logger.warning("Failed to refresh remote agents: %s", e)
 
     def create_agent(self) -> Agent:
         return Agent(
@@ -66,16 +175,27 @@ class PurchasingAgent:
             ),
             tools=[
                 self.send_task,
+                self.send_tasks,
+                self.check_tasks_status,
             ],
         )
 
     def root_instruction(self, context: ReadonlyContext) -> str:
-        current_agent = self.check_active_agent(context)
+        return f"{self.static_instruction}\n{self.dynamic_instruction(context)}"
+
+    def build_static_instruction(self) -> str:
+        """Builds the part of the instruction shared by every model call."""
+        agents = self.agents
+        if self.is_routing_enabled():
+            # Added by `before_model_callback` for the current user request
+            agents = "Only the agents relevant to the user request are listed under Relevant agents."
         return f"""You are an expert purchasing delegator that can delegate the user product inquiry and purchase request to the
 appropriate seller remote agents.
 
 Execution:
 - For actionable tasks, you can use `send_task` to assign tasks to remote agents to perform.
+- When the request involves several remote agents, use `send_tasks` to send all of their tasks at once instead of calling `send_task` for each agent.
+- When the user asks about the status of previous orders, use `check_tasks_status` to get the latest status from the remote agents.
 - When the remote agent is repeatedly asking for user confirmation, assume that the remote agent doesn't have access to user's conversation context. 
     So improve the task description to include all the necessary information related to that agent
 - Never ask user permission when you want to connect with remote agents. If you need to make connection with multiple remote agents, directly
@@ -92,11 +212,14 @@ Focus on the most recent parts of the conversation primarily.
 If there is an active agent, send the request to that agent with the update task tool.
 
 Agents:
-{self.agents}
-
-Current active seller agent: {current_agent["active_agent"]}
+{agents}
 """
 
+    def dynamic_instruction(self, context: ReadonlyContext) -> str:
+        """Builds the part of the instruction which changes between turns."""
+        current_agent = self.check_active_agent(context)
+        return f"Current active seller agent: {current_agent['active_agent']}\n"
+
     def check_active_agent(self, context: ReadonlyContext):
         state = context.state
         if (
@@ -108,13 +231,98 @@ Current active seller agent: {current_agent["active_agent"]}
             return {"active_agent": f"{state['active_agent']}"}
         return {"active_agent": "None"}
 
-    def before_model_callback(self, callback_context: CallbackContext, llm_request):
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request
+    ):
+        if self._refresh_task is None or self._refresh_task.done():
+            # Started here as the agent is created before the event loop runs
+            self._refresh_task = asyncio.create_task(
+                self._refresh_remote_agents_periodically()
+            )
+
         state = callback_context.state
         if "session_active" not in state or not state["session_active"]:
             if "session_id" not in state:
                 state["session_id"] = str(uuid.uuid4())
             state["session_active"] = True
 
+        # Per turn instruction lines, on top of the static and dynamic parts
+        instructions = []
+        if self.is_routing_enabled():
+            agent_names = await self.route_agents(
+                get_user_query(llm_request), state.get("active_agent", "None")
+            )
+            relevant_agents = "\n".join(
+                json.dumps({"name": name, "description": self.cards[name].description})
+                for name in agent_names
+                if name in self.cards
+            )
+            if not relevant_agents:
+                relevant_agents = "No agent matches the user request."
+            instructions.append(f"Relevant agents:\n{relevant_agents}")
+
+        if self.instruction_cache is not None and await self.use_cached_instruction(
+            callback_context, llm_request, instructions
+        ):
+            return
+        if instructions:
+            llm_request.append_instructions(instructions)
+
+    async def use_cached_instruction(
+        self, callback_context: CallbackContext, llm_request, instructions: list[str]
+    ) -> bool:
+        """Replaces the static instruction and the tools with the cached content.
+
+        Returns whether the cached content is used, the per turn instruction
+        lines are then sent ahead of the conversation.
+        """
+        config = llm_request.config
+        if config.system_instruction != self.root_instruction(callback_context):
+            # Built from another registry version or extended by ADK
+            return False
+        cached_content = await self.instruction_cache.get(
+            llm_request.model, self.static_instruction, config.tools or []
+        )
+        if cached_content is None:
+            return False
+        # Requests using cached content cannot set a system instruction or
+        # tools, the per turn lines go in a leading content instead
+        config.cached_content = cached_content
+        config.system_instruction = None
+        config.tools = None
+        turn_instruction = "\n".join(
+            [self.dynamic_instruction(callback_context).strip(), *instructions]
+        )
+        llm_request.contents.insert(
+            0, types.Content(role="user", parts=[types.Part(text=turn_instruction)])
+        )
+        return True
+
+    def is_routing_enabled(self) -> bool:
+        """Routing is only needed once the agents do not fit in the instruction."""
+        return len(self.cards) > self.routing_top_k
+
+    async def route_agents(self, query: str, active_agent: str) -> list[str]:
+        """Returns the agents most relevant to the query, the active agent first."""
+        if query not in self._routes:
+            if self.seller_index.embedder:
+                agent_names = await asyncio.to_thread(
+                    self.seller_index.search, query, self.routing_top_k
+                )
+            else:
+                agent_names = self.seller_index.search(query, self.routing_top_k)
+            if len(self._routes) >= MAX_CACHED_ROUTES:
+                del self._routes[next(iter(self._routes))]
+            # Every model call of a turn shares the same user request
+            self._routes[query] = agent_names
+
+        agent_names = self._routes[query]
+        if active_agent in self.cards:
+            agent_names = [active_agent] + [
+                name for name in agent_names if name != active_agent
+            ]
+        return agent_names
+
     def list_remote_agents(self):
         """List the available remote agents you can use to delegate the task."""
         if not self.remote_agent_connections:
@@ -122,8 +330,7 @@ Current active seller agent: {current_agent["active_agent"]}
 
         remote_agent_info = []
         for card in self.cards.values():
-            print(f"Found agent card: {card.model_dump()}")
-            print("=" * 100)
+            log_payload(logger, "Found agent card", card, name=card.name)
             remote_agent_info.append(
                 {"name": card.name, "description": card.description}
             )
@@ -143,19 +350,108 @@ Current active seller agent: {current_agent["active_agent"]}
         Yields:
             A dictionary of JSON data.
         """
-        if agent_name not in self.remote_agent_connections:
-            raise ValueError(f"Agent {agent_name} not found")
+        client = self._get_connection(agent_name)
         state = tool_context.state
         state["active_agent"] = agent_name
+        request = self._create_task_request(task, state)
+        task = await client.send_task(request, self.task_callback)
+        self._track_task(state, agent_name, task.id)
+        # Assume completion unless a state returns that isn't complete
+        state["session_active"] = task.status.state not in TERMINAL_TASK_STATES
+        if task.status.state == TaskState.INPUT_REQUIRED:
+            # Force user input back
+            tool_context.actions.escalate = True
+        elif task.status.state == TaskState.COMPLETED:
+            # Reset active agent is task is completed
+            state["active_agent"] = "None"
+
+        return convert_task(task, tool_context)
+
+    async def send_tasks(
+        self, agent_names: list[str], tasks: list[str], tool_context: ToolContext
+    ):
+        """Sends tasks to several remote seller agents at the same time
+
+        All tasks are sent concurrently, so this is faster than calling
+        `send_task` for each agent. Agents which do not answer in time are
+        reported with the "pending" state, use `check_tasks_status` later to
+        get their result.
+
+        Args:
+            agent_names: The names of the agents to send the tasks to.
+            tasks: The task for each agent in `agent_names`, in the same order.
+                Each task is the comprehensive conversation context summary and
+                goal to be achieved regarding user inquiry and purchase request
+                relevant to that agent only.
+            tool_context: The tool context this method runs in.
+
+        Returns:
+            A list with the result of each agent, in the same order.
+        """
+        if len(agent_names) != len(tasks):
+            raise ValueError("agent_names and tasks must have the same length")
+        clients = [self._get_connection(agent_name) for agent_name in agent_names]
+        state = tool_context.state
+        requests = [self._create_task_request(task, state) for task in tasks]
+        for agent_name, request in zip(agent_names, requests):
+            # Tracked up front so tasks past the deadline can be checked later
+            self._track_task(state, agent_name, request.id)
+
+        async def send(client: RemoteAgentConnections, request: TaskSendParams):
+            return await asyncio.wait_for(
+                client.send_task(request, self.task_callback),
+                self.task_deadline_seconds,
+            )
+
+        results = await asyncio.gather(
+            *(send(client, request) for client, request in zip(clients, requests)),
+            return_exceptions=True,
+        )
+
+        responses = []
+        input_required_agents = []
+        is_session_active = False
+        for agent_name, request, result in zip(agent_names, requests, results):
+            response = {"agent_name": agent_name, "task_id": request.id}
+            if isinstance(result, asyncio.TimeoutError):
+                response["state"] = "pending"
+                is_session_active = True
+            elif isinstance(result, Exception):
+                response.update(state="error", error=str(result))
+            else:
+                response.update(
+                    state=result.status.state.value,
+                    response=convert_task(result, tool_context),
+                )
+                if result.status.state == TaskState.INPUT_REQUIRED:
+                    input_required_agents.append(agent_name)
+                is_session_active |= result.status.state not in TERMINAL_TASK_STATES
+            responses.append(response)
+
+        state["session_active"] = is_session_active
+        # Only one agent can be active, follow up with the last one awaiting input
+        state["active_agent"] = (
+            input_required_agents[-1] if input_required_agents else "None"
+        )
+        if input_required_agents:
+            # Force user input back
+            tool_context.actions.escalate = True
+        return responses
+
+    def _get_connection(self, agent_name: str) -> RemoteAgentConnections:
+        if agent_name not in self.remote_agent_connections:
+            raise ValueError(f"Agent {agent_name} not found")
         client = self.remote_agent_connections[agent_name]
         if not client:
             raise ValueError(f"Client not available for {agent_name}")
+        return client
+
+    def _create_task_request(self, task: str, state) -> TaskSendParams:
         if "task_id" in state:
             taskId = state["task_id"]
         else:
             taskId = str(uuid.uuid4())
         sessionId = state["session_id"]
-        task: Task
         messageId = ""
         metadata = {}
         if "input_message_metadata" in state:
@@ -165,7 +461,7 @@ Current active seller agent: {current_agent["active_agent"]}
         if not messageId:
             messageId = str(uuid.uuid4())
         metadata.update(**{"conversation_id": sessionId, "message_id": messageId})
-        request: TaskSendParams = TaskSendParams(
+        return TaskSendParams(
             id=taskId,
             sessionId=sessionId,
             message=Message(
@@ -177,29 +473,99 @@ Current active seller agent: {current_agent["active_agent"]}
             # pushNotification=None,
             metadata={"conversation_id": sessionId},
         )
-        task = await client.send_task(request, self.task_callback)
-        # Assume completion unless a state returns that isn't complete
-        state["session_active"] = task.status.state not in [
-            TaskState.COMPLETED,
-            TaskState.CANCELED,
-            TaskState.FAILED,
-            TaskState.UNKNOWN,
+
+    async def check_tasks_status(self, tool_context: ToolContext):
+        """Checks the latest status of the tasks previously sent to remote seller agents
+
+        The tasks of each remote agent are fetched in a single batch request.
+
+        Args:
+            tool_context: The tool context this method runs in.
+
+        Returns:
+            A dictionary mapping each agent name to the status of its tasks.
+        """
+        agent_tasks = tool_context.state.get("agent_tasks", {})
+        agent_names = [
+            agent_name
+            for agent_name, task_ids in agent_tasks.items()
+            if task_ids and agent_name in self.remote_agent_connections
         ]
-        if task.status.state == TaskState.INPUT_REQUIRED:
-            # Force user input back
-            tool_context.actions.escalate = True
-        elif task.status.state == TaskState.COMPLETED:
-            # Reset active agent is task is completed
-            state["active_agent"] = "None"
+        results = await asyncio.gather(
+            *(
+                self.remote_agent_connections[agent_name].get_tasks(
+                    agent_tasks[agent_name]
+                )
+                for agent_name in agent_names
+            ),
+            return_exceptions=True,
+        )
+
+        tasks_status = {}
+        for agent_name, tasks in zip(agent_names, results):
+            if isinstance(tasks, Exception):
+                # An unreachable agent does not hide the status of the others
+                tasks_status[agent_name] = [
+                    {"task_id": task_id, "state": "error", "error": str(tasks)}
+                    for task_id in agent_tasks[agent_name]
+                ]
+                continue
+
+            tasks_status[agent_name] = []
+            for task_id, task in zip(agent_tasks[agent_name], tasks):
+                if task is None:
+                    tasks_status[agent_name].append(
+                        {"task_id": task_id, "state": "not found"}
+                    )
+                    continue
+                if isinstance(task, JSONRPCError):
+                    tasks_status[agent_name].append(
+                        {
+                            "task_id": task_id,
+                            "state": "error",
+                            "error": f"{task.message} (code {task.code})",
+                        }
+                    )
+                    continue
+
+                tasks_status[agent_name].append(
+                    {
+                        "task_id": task_id,
+                        "state": task.status.state.value,
+                        "response": convert_task(task, tool_context),
+                    }
+                )
+        return tasks_status
+
+    def _track_task(self, state, agent_name: str, task_id: str):
+        """Remembers the latest task IDs sent to each agent for status checks."""
+        agent_tasks = dict(state.get("agent_tasks", {}))
+        task_ids = [t for t in agent_tasks.get(agent_name, []) if t != task_id]
+        agent_tasks[agent_name] = (task_ids + [task_id])[-MAX_TRACKED_TASKS:]
+        # Reassign so the session state registers the change
+        state["agent_tasks"] = agent_tasks
+
+
+def get_user_query(llm_request) -> str:
+    """Returns the text of the latest user message of the request."""
+    for content in reversed(llm_request.contents):
+        if content.role != "user" or not content.parts:
+            continue
+        texts = [part.text for part in content.parts if part.text]
+        if texts:
+            return "\n".join(texts)
+    return ""
+
 
-        response = []
-        if task.status.message:
-            # Assume the information is in the task message.
-            response.extend(convert_parts(task.status.message.parts, tool_context))
-        if task.artifacts:
-            for artifact in task.artifacts:
-                response.extend(convert_parts(artifact.parts, tool_context))
-        return response
+def convert_task(task: Task, tool_context: ToolContext):
+    response = []
+    if task.status.message:
+        # Assume the information is in the task message.
+        response.extend(convert_parts(task.status.message.parts, tool_context))
+    if task.artifacts:
+        for artifact in task.artifacts:
+            response.extend(convert_parts(artifact.parts, tool_context))
+    return response
 
 
 def convert_parts(parts: list[Part], tool_context: ToolContext):
@@ -2,10 +2,14 @@ from typing import Callable
 import uuid
 from a2a_types import (
     AgentCard,
+    JSONRPCError,
+    SendTaskResponse,
     Task,
+    TaskQueryParams,
     TaskSendParams,
     TaskStatusUpdateEvent,
     TaskArtifactUpdateEvent,
+    TaskNotFoundError,
 )
 from a2a_client.client import A2AClient
 from dotenv import load_dotenv
@@ -25,9 +29,11 @@ KNOWN_AUTH = {
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
-    def __init__(self, agent_card: AgentCard, agent_url: str):
+    def __init__(self, agent_card: AgentCard, agent_urls: list[str]):
         auth = KNOWN_AUTH.get(agent_card.name, None)
-        self.agent_client = A2AClient(agent_card, auth=auth, agent_url=agent_url)
+        # Every URL is a replica of the same agent
+        self.agent_client = A2AClient(agent_card, auth=auth, agent_url=agent_urls)
+        self.agent_urls = agent_urls
         self.card = agent_card
 
         self.conversation_name = None
@@ -37,12 +43,59 @@ class RemoteAgentConnections:
     def get_agent(self) -> AgentCard:
         return self.card
 
+    async def aclose(self, grace_period_seconds: float = 0):
+        await self.agent_client.aclose(grace_period_seconds)
+
     async def send_task(
         self,
         request: TaskSendParams,
         task_callback: TaskUpdateCallback | None,
     ) -> Task | None:
-        response = await self.agent_client.send_task(request.model_dump())
+        response = await self.agent_client.send_task(request)
+        return self._process_send_task_response(response, request, task_callback)
+
+    async def send_tasks(
+        self,
+        requests: list[TaskSendParams],
+        task_callback: TaskUpdateCallback | None,
+    ) -> list[Task | None]:
+        """Sends several tasks to the remote agent in one round trip."""
+        responses = await self.agent_client.send_tasks(requests)
+        return [
+            self._process_send_task_response(response, request, task_callback)
+            for response, request in zip(responses, requests)
+        ]
+
+    async def get_tasks(
+        self, task_ids: list[str], history_length: int | None = None
+    ) -> list[Task | JSONRPCError | None]:
+        """Gets the latest state of several tasks in one round trip.
+
+        Tasks unknown to the remote agent are returned as None, the other
+        errors of the remote agent are returned as they are.
+        """
+        responses = await self.agent_client.get_tasks(
+            [
+                TaskQueryParams(id=task_id, historyLength=history_length)
+                for task_id in task_ids
+            ]
+        )
+        results = []
+        for response in responses:
+            if response.error is None:
+                results.append(response.result)
+            elif response.error.code == TaskNotFoundError().code:
+                results.append(None)
+            else:
+                results.append(response.error)
+        return results
+
+    def _process_send_task_response(
+        self,
+        response: SendTaskResponse,
+        request: TaskSendParams,
+        task_callback: TaskUpdateCallback | None,
+    ) -> Task | None:
         merge_metadata(response.result, request)
         # For task status updates, we need to propagate metadata and provide
         # a unique message id.
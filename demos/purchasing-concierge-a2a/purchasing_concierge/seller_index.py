@@ -0,0 +1,177 @@
+from collections import Counter, defaultdict
+from typing import Callable, NamedTuple
+import math
+import re
+
+from a2a_types import AgentCard
+
+Embedder = Callable[[list[str]], list[list[float]]]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "have", "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "some",
+    "that", "the", "to", "want", "we", "with", "would", "you",
+}  # fmt: skip
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+EMBEDDING_BATCH_SIZE = 100
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Crude plural folding, e.g. "pizzas" matches "pizza"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def describe_card(card: AgentCard) -> str:
+    """Text describing the capabilities of an agent, used for routing."""
+    lines = [card.name.replace("_", " "), card.description or ""]
+    for skill in card.skills:
+        lines.append(skill.name)
+        lines.append(skill.description or "")
+        # Tags are listed twice as they are the most precise capability hints
+        lines.extend((skill.tags or []) * 2)
+        lines.extend(skill.examples or [])
+    return "\n".join(line for line in lines if line)
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class IndexSnapshot(NamedTuple):
+    postings: dict[str, dict[str, int]]
+    document_lengths: dict[str, int]
+    average_document_length: float
+    embeddings: dict[str, list[float]]
+
+
+class SellerIndex:
+    """Ranks seller agents by how well their skills match a user request.
+
+    Combines BM25 scores over an inverted keyword index of the agent cards with
+    the cosine similarity of embeddings when an `embedder` is given. Embeddings
+    of the agent cards are computed once per card description and reused when
+    the index is rebuilt.
+    """
+
+    def __init__(self, embedder: Embedder | None = None, keyword_weight: float = 0.5):
+        self.embedder = embedder
+        self.keyword_weight = keyword_weight if embedder else 1.0
+        # Replaced as a whole on rebuild, searches may run while it is rebuilt
+        self.snapshot = IndexSnapshot({}, {}, 0.0, {})
+        self._embedding_cache: dict[str, list[float]] = {}
+
+    def build(self, cards: list[AgentCard]):
+        descriptions = {card.name: describe_card(card) for card in cards}
+
+        postings = defaultdict(dict)
+        document_lengths = {}
+        for agent_name, description in descriptions.items():
+            tokens = tokenize(description)
+            document_lengths[agent_name] = len(tokens)
+            for token, count in Counter(tokens).items():
+                postings[token][agent_name] = count
+
+        embeddings = {}
+        if self.embedder:
+            missing = [
+                description
+                for description in set(descriptions.values())
+                if description not in self._embedding_cache
+            ]
+            if missing:
+                self._embedding_cache.update(zip(missing, self.embedder(missing)))
+            # Only keep embeddings of current cards so the cache cannot grow
+            self._embedding_cache = {
+                description: self._embedding_cache[description]
+                for description in descriptions.values()
+            }
+            embeddings = {
+                agent_name: self._embedding_cache[description]
+                for agent_name, description in descriptions.items()
+            }
+
+        self.snapshot = IndexSnapshot(
+            postings=dict(postings),
+            document_lengths=document_lengths,
+            average_document_length=sum(document_lengths.values())
+            / max(len(document_lengths), 1),
+            embeddings=embeddings,
+        )
+
+    @staticmethod
+    def _keyword_scores(snapshot: IndexSnapshot, query: str) -> dict[str, float]:
+        document_count = len(snapshot.document_lengths)
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            postings = snapshot.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for agent_name, frequency in postings.items():
+                length_norm = snapshot.document_lengths[agent_name] / (
+                    snapshot.average_document_length or 1
+                )
+                scores[agent_name] += (
+                    idf
+                    * frequency
+                    * (K1 + 1)
+                    / (frequency + K1 * (1 - B + B * length_norm))
+                )
+        return scores
+
+    def search(self, query: str, top_k: int) -> list[str]:
+        """Returns the names of the `top_k` best matching agents, best first.
+
+        Agents without any match are not returned.
+        """
+        snapshot = self.snapshot
+        keyword_scores = self._keyword_scores(snapshot, query)
+        max_keyword_score = max(keyword_scores.values(), default=0) or 1
+        scores = {
+            agent_name: self.keyword_weight * score / max_keyword_score
+            for agent_name, score in keyword_scores.items()
+        }
+        if snapshot.embeddings and query.strip():
+            query_embedding = self.embedder([query])[0]
+            for agent_name, embedding in snapshot.embeddings.items():
+                similarity = cosine_similarity(query_embedding, embedding)
+                if similarity > 0:
+                    scores[agent_name] = (
+                        scores.get(agent_name, 0)
+                        + (1 - self.keyword_weight) * similarity
+                    )
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return [agent_name for agent_name in ranked if scores[agent_name] > 0][:top_k]
+
+
+def create_genai_embedder(model: str) -> Embedder:
+    """Embeds texts with a Gemini embedding model, e.g. `text-embedding-005`."""
+    from google import genai
+
+    client = genai.Client()
+
+    def embed(texts: list[str]) -> list[list[float]]:
+        embeddings = []
+        for i in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            response = client.models.embed_content(
+                model=model, contents=texts[i : i + EMBEDDING_BATCH_SIZE]
+            )
+            embeddings.extend(embedding.values for embedding in response.embeddings)
+        return embeddings
+
+    return embed
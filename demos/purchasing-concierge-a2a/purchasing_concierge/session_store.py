@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import asyncio
+import time
+
+from google.adk.sessions import BaseSessionService, Session
+from a2a_client.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_IDLE_TTL_SECONDS = 60 * 60
+
+
+class SessionEntry:
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.last_used_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+
+class SessionStore:
+    """Bounded set of the concierge sessions of the chat UI users.
+
+    Each user connection gets its own ADK session on its first turn, so users
+    never share a conversation, an active agent or their tasks. Sessions idle
+    for `idle_ttl_seconds` are deleted, and once `max_sessions` is reached the
+    least recently used one is deleted first. Turns of one session run one at a
+    time, e.g. on a double submit, while turns of different sessions run
+    concurrently. Sessions with a turn in progress are never evicted.
+    """
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        app_name: str,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS,
+    ):
+        self.session_service = session_service
+        self.app_name = app_name
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        # Session ID to its entry, the least recently used first
+        self.sessions: OrderedDict[str, SessionEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @asynccontextmanager
+    async def acquire(self, user_id: str, session_id: str) -> AsyncIterator[Session]:
+        """Holds the session of the user for one turn, creating it if needed."""
+        self._evict(reserve=0 if session_id in self.sessions else 1)
+        entry = self.sessions.get(session_id)
+        if entry is None or entry.user_id != user_id:
+            if entry is not None:
+                # Session IDs are per connection, never reuse another user's one
+                self.delete(session_id)
+            entry = self.sessions[session_id] = SessionEntry(user_id)
+        self.sessions.move_to_end(session_id)
+
+        async with entry.lock:
+            session = self.session_service.get_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
+            )
+            if session is None:
+                session = self.session_service.create_session(
+                    app_name=self.app_name, user_id=user_id, session_id=session_id
+                )
+            try:
+                yield session
+            finally:
+                entry.last_used_at = time.monotonic()
+
+    def delete(self, session_id: str):
+        entry = self.sessions.pop(session_id, None)
+        if entry is None:
+            return
+        self.session_service.delete_session(
+            app_name=self.app_name, user_id=entry.user_id, session_id=session_id
+        )
+
+    def _evict(self, reserve: int = 0):
+        now = time.monotonic()
+        for session_id, entry in list(self.sessions.items()):
+            is_full = len(self.sessions) + reserve > self.max_sessions
+            is_idle = now - entry.last_used_at > self.idle_ttl_seconds
+            if not is_full and not is_idle:
+                # Entries are in use order, the next ones are more recent
+                break
+            if entry.lock.locked():
+                continue
+            logger.debug(
+                "Evicting session %s (%s)", session_id, "idle" if is_idle else "full"
+            )
+            self.delete(session_id)
@@ -1,95 +1,148 @@
 import gradio as gr
 from typing import List, Dict, Any
 from purchasing_concierge.agent import root_agent as purchasing_agent
+from purchasing_concierge.session_store import SessionStore
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.adk.events import Event
 from typing import AsyncIterator
 from google.genai import types
-from pprint import pformat
+import json
+import os
 
 APP_NAME = "purchasing_concierge_app"
-USER_ID = "default_user"
-SESSION_ID = "default_session"
+# Tool calls and responses are shown collapsed, truncated to this many characters
+TOOL_PAYLOAD_PREVIEW_CHARS = int(os.getenv("TOOL_PAYLOAD_PREVIEW_CHARS", "100"))
 SESSION_SERVICE = InMemorySessionService()
 PURCHASING_AGENT_RUNNER = Runner(
     agent=purchasing_agent,  # The agent we want to run
     app_name=APP_NAME,  # Associates runs with our app
     session_service=SESSION_SERVICE,  # Uses our session manager
 )
-SESSION_SERVICE.create_session(
-    app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+SESSION_STORE = SessionStore(
+    SESSION_SERVICE,
+    APP_NAME,
+    max_sessions=int(os.getenv("CONCIERGE_MAX_SESSIONS", "1000")),
+    idle_ttl_seconds=float(os.getenv("CONCIERGE_SESSION_IDLE_TTL_SECONDS", "3600")),
 )
+# Turns of different users run concurrently, Gradio runs one at a time by default
+CONCURRENCY_LIMIT = int(os.getenv("CONCIERGE_CONCURRENCY_LIMIT", "64"))
 
 
-async def get_response_from_agent(
-    message: str,
-    history: List[Dict[str, Any]],
-) -> str:
-    """Send the message to the backend and get a response.
+def format_tool_payload(payload: Any) -> str:
+    """Formats a tool call or response as JSON, shown in full when expanded."""
+    text = json.dumps(payload, indent=2, ensure_ascii=False, default=str)
+    return f"```json\n{text}\n```"
 
-    Args:
-        message: Text content of the message.
-        history: List of previous message dictionaries in the conversation.
 
-    Returns:
-        Text response from the backend service.
+def preview_tool_payload(payload: Any) -> str:
+    """Summarizes a tool call or response on one line for its collapsed title."""
+    text = json.dumps(payload, ensure_ascii=False, default=str)
+    if len(text) > TOOL_PAYLOAD_PREVIEW_CHARS:
+        text = f"{text[:TOOL_PAYLOAD_PREVIEW_CHARS]}…"
+    return text
+
+
+class EventRenderer:
+    """Renders the agent events of a turn into chat messages.
+
+    Messages are only ever appended, never updated. Each yield of the turn is
+    the whole list of its messages, as Gradio expects, and only differs from
+    the previous one by the messages of the latest event, so the diff Gradio
+    streams to the browser only contains those new messages.
     """
-    # try:
-    events_iterator: AsyncIterator[Event] = PURCHASING_AGENT_RUNNER.run_async(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
-    )
 
-    responses = []
-    async for event in events_iterator:  # event has type Event
-        if event.content.parts:
-            for part in event.content.parts:
-                if part.function_call:
-                    formatted_call = f"```python\n{pformat(part.function_call.model_dump(), indent=2, width=80)}\n```"
-                    responses.append(
-                        gr.ChatMessage(
-                            role="assistant",
-                            content=f"{part.function_call.name}:\n{formatted_call}",
-                            metadata={"title": "🛠️ Tool Call"},
-                        )
+    def __init__(self):
+        self.messages: list[gr.ChatMessage] = []
+
+    def render(self, event: Event) -> bool:
+        """Appends the messages of the event, returns whether there were any."""
+        message_count = len(self.messages)
+        parts = event.content.parts if event.content and event.content.parts else []
+        for part in parts:
+            if part.function_call:
+                self.messages.append(
+                    gr.ChatMessage(
+                        role="assistant",
+                        content=format_tool_payload(part.function_call.args),
+                        metadata={
+                            "title": (
+                                f"🛠️ Tool Call: {part.function_call.name} "
+                                f"{preview_tool_payload(part.function_call.args)}"
+                            ),
+                            "status": "done",
+                        },
                     )
-                elif part.function_response:
-                    formatted_response = f"```python\n{pformat(part.function_response.model_dump(), indent=2, width=80)}\n```"
-
-                    responses.append(
-                        gr.ChatMessage(
-                            role="assistant",
-                            content=formatted_response,
-                            metadata={"title": "⚡ Tool Response"},
-                        )
+                )
+            elif part.function_response:
+                self.messages.append(
+                    gr.ChatMessage(
+                        role="assistant",
+                        content=format_tool_payload(part.function_response.response),
+                        metadata={
+                            "title": (
+                                f"⚡ Tool Response: {part.function_response.name} "
+                                f"{preview_tool_payload(part.function_response.response)}"
+                            ),
+                            "status": "done",
+                        },
                     )
+                )
 
         # Key Concept: is_final_response() marks the concluding message for the turn
         if event.is_final_response():
-            if event.content and event.content.parts:
+            if parts and parts[0].text:
                 # Extract text from the first part
-                final_response_text = event.content.parts[0].text
+                final_response_text = parts[0].text
             elif event.actions and event.actions.escalate:
                 # Handle potential errors/escalations
                 final_response_text = (
                     f"Agent escalated: {event.error_message or 'No specific message.'}"
                 )
-            responses.append(
-                gr.ChatMessage(role="assistant", content=final_response_text)
-            )
-            yield responses
-            break  # Stop processing events once the final response is found
-
-        yield responses
-    # except Exception as e:
-    #     yield [
-    #         gr.ChatMessage(
-    #             role="assistant",
-    #             content=f"Error communicating with agent: {str(e)}",
-    #         )
-    #     ]
+            else:
+                final_response_text = ""
+            if final_response_text:
+                self.messages.append(
+                    gr.ChatMessage(role="assistant", content=final_response_text)
+                )
+        return len(self.messages) > message_count
+
+
+async def get_response_from_agent(
+    message: str,
+    history: List[Dict[str, Any]],
+    request: gr.Request,
+) -> AsyncIterator[List[gr.ChatMessage]]:
+    """Send the message to the backend and stream the response.
+
+    Args:
+        message: Text content of the message.
+        history: List of previous message dictionaries in the conversation.
+        request: The Gradio request, each browser connection gets its own session.
+
+    Yields:
+        All the response messages of the turn so far, each yield adds new ones.
+    """
+    # Each browser connection has its own conversation with the agent
+    user_id = request.username or request.session_hash
+    async with SESSION_STORE.acquire(user_id, request.session_hash) as session:
+        events_iterator: AsyncIterator[Event] = PURCHASING_AGENT_RUNNER.run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+        )
+
+        renderer = EventRenderer()
+        async for event in events_iterator:  # event has type Event
+            if renderer.render(event):
+                yield list(renderer.messages)
+            if event.is_final_response():
+                break  # Stop processing events once the final response is found
+
+
+def end_session(request: gr.Request):
+    """Deletes the session of a closed browser connection."""
+    SESSION_STORE.delete(request.session_hash)
 
 
 if __name__ == "__main__":
@@ -98,7 +151,9 @@ if __name__ == "__main__":
         title="Purchasing Concierge",
         description="This assistant can help you to purchase food from remote sellers.",
         type="messages",
+        concurrency_limit=CONCURRENCY_LIMIT,
     )
+    demo.unload(end_session)
 
     demo.launch(
         server_name="0.0.0.0",
@@ -0,0 +1,126 @@
+from a2a_server.push_notification_auth import PushNotificationSenderAuth
+import asyncio
+import httpx
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+
+class PushNotificationQueue:
+    """Delivers push notifications in the background, outside of the request path.
+
+    Notifications are keyed by task ID and URL. While a notification for a key
+    is waiting or being retried, a newer notification for the same key replaces
+    it, so rapid state changes of a task are coalesced and only the latest state
+    is delivered. Notifications of the same key are never delivered
+    concurrently, which keeps them in order. Failed deliveries are retried with
+    exponential backoff and every URL is limited to `max_concurrency_per_url`
+    concurrent deliveries.
+    """
+
+    def __init__(
+        self,
+        sender_auth: PushNotificationSenderAuth,
+        workers: int = 8,
+        max_concurrency_per_url: int = 2,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30,
+    ):
+        self.sender_auth = sender_auth
+        self.workers = workers
+        self.max_concurrency_per_url = max_concurrency_per_url
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        # Latest undelivered body for each (task ID, URL) key
+        self.pending: dict[tuple[str, str], bytes] = {}
+        self.in_flight: set[tuple[str, str]] = set()
+        self.url_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.url_deliveries: dict[str, int] = {}
+        self._worker_tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        self._worker_tasks = [
+            asyncio.create_task(self._run_worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self):
+        for worker_task in self._worker_tasks:
+            worker_task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def enqueue(self, task_id: str, url: str, body: bytes):
+        key = (task_id, url)
+        is_queued = key in self.pending or key in self.in_flight
+        self.pending[key] = body
+        if not is_queued:
+            self.queue.put_nowait(key)
+
+    async def _run_worker(self):
+        while True:
+            key = await self.queue.get()
+            try:
+                await self._deliver(key)
+            except Exception as e:
+                logger.error(f"Error while delivering push-notification: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, key: tuple[str, str]):
+        _, url = key
+        self.in_flight.add(key)
+        self.url_deliveries[url] = self.url_deliveries.get(url, 0) + 1
+        semaphore = self.url_semaphores.setdefault(
+            url, asyncio.Semaphore(self.max_concurrency_per_url)
+        )
+        try:
+            for attempt in range(self.max_retries + 1):
+                # Always deliver the latest state, it may have changed while waiting
+                body = self.pending.pop(key, None)
+                if body is None:
+                    return
+
+                async with semaphore:
+                    is_delivered, is_retryable = await self._send(url, body)
+                if is_delivered or not is_retryable:
+                    break
+
+                # Keep the body unless a newer one arrived in the meantime
+                self.pending.setdefault(key, body)
+                if attempt < self.max_retries:
+                    backoff = min(
+                        self.backoff_max_seconds,
+                        self.backoff_base_seconds * 2**attempt,
+                    )
+                    await asyncio.sleep(backoff * random.uniform(0.5, 1))
+            else:
+                logger.warning(f"Giving up push-notification for URL {url}")
+                if self.pending.get(key) is body:
+                    del self.pending[key]
+        finally:
+            self.in_flight.discard(key)
+            self.url_deliveries[url] -= 1
+            if not self.url_deliveries[url]:
+                del self.url_deliveries[url]
+                del self.url_semaphores[url]
+            if key in self.pending:
+                # A newer notification arrived while this one was in flight
+                self.queue.put_nowait(key)
+
+    async def _send(self, url: str, body: bytes) -> tuple[bool, bool]:
+        """Sends one notification, returns whether it was delivered and is retryable."""
+        try:
+            await self.sender_auth.deliver_push_notification(url, body)
+            logger.info(f"Push-notification sent for URL: {url}")
+            return True, False
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            logger.warning(f"Push-notification for URL {url} failed: {status_code}")
+            return False, status_code >= 500 or status_code in (408, 429)
+        except httpx.HTTPError as e:
+            logger.warning(f"Push-notification for URL {url} failed: {e}")
+            return False, True
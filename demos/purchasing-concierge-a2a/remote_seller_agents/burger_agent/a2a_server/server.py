@@ -1,5 +1,5 @@
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
 from a2a_types import (
@@ -7,25 +7,43 @@ from a2a_types import (
     JSONRPCResponse,
     InvalidRequestError,
     JSONParseError,
-    GetTaskRequest,
-    CancelTaskRequest,
-    SendTaskRequest,
-    SetTaskPushNotificationRequest,
-    GetTaskPushNotificationRequest,
+    JSONRPCError,
+    MethodNotFoundError,
     InternalError,
     AgentCard,
-    TaskResubscriptionRequest,
-    SendTaskStreamingRequest,
 )
 from pydantic import ValidationError
+from contextlib import asynccontextmanager
 import json
 from typing import AsyncIterable, Any
+import asyncio
 from a2a_server.task_manager import TaskManager
+from a2a_server.task_store import InMemoryTaskStore
+from a2a_server.task_event_log import InMemoryTaskEventBroker
+from a2a_server.idempotency import IdempotencyCache, SQLiteIdempotencyCache
+from a2a_server.logging_utils import get_logger, log_payload
 
-import logging
 import base64
+import hashlib
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+# JSON-RPC method to the name of the task manager method handling it
+METHOD_HANDLERS = {
+    "tasks/get": "on_get_task",
+    "tasks/send": "on_send_task",
+    "tasks/sendSubscribe": "on_send_task_subscribe",
+    "tasks/cancel": "on_cancel_task",
+    "tasks/pushNotification/set": "on_set_task_push_notification",
+    "tasks/pushNotification/get": "on_get_task_push_notification",
+    "tasks/resubscribe": "on_resubscribe_to_task",
+}
+# Methods answered with an event stream, these cannot be part of a batch request
+STREAMING_METHODS = {"tasks/sendSubscribe", "tasks/resubscribe"}
+
+
+class JSONRPCBytesResponse(Response):
+    media_type = "application/json"
 
 
 class A2AServer:
@@ -39,6 +57,7 @@ class A2AServer:
         api_key: str | None = None,
         auth_username: str | None = None,
         auth_password: str | None = None,
+        max_batch_size: int = 100,
     ):
         self.host = host
         self.port = port
@@ -48,7 +67,10 @@ class A2AServer:
         self.api_key = api_key
         self.auth_username = auth_username
         self.auth_password = auth_password
-        self.app = Starlette()
+        self.max_batch_size = max_batch_size
+        self._agent_card_json: str | None = None
+        self._agent_card_etag: str | None = None
+        self.app = Starlette(lifespan=self._lifespan)
         self.app.add_route(self.endpoint, self._process_request, methods=["POST"])
         self.app.add_route(
             "/.well-known/agent.json", self._get_agent_card, methods=["GET"]
@@ -74,19 +96,69 @@ class A2AServer:
         else:
             raise ValueError("Unsupported authentication scheme")
 
-    def start(self):
+    def start(self, workers: int = 1, event_poll_interval_seconds: float | None = None):
+        """Serves the A2A endpoints, from `workers` processes if more than one.
+
+        Worker processes share task state through the task store, the event
+        broker and the idempotency cache of the task manager, which must not be
+        in memory then. Workers poll the event broker for the events of the
+        other ones every `event_poll_interval_seconds`, when given.
+        """
         if self.agent_card is None:
             raise ValueError("agent_card is not defined")
 
         if self.task_manager is None:
             raise ValueError("request_handler is not defined")
 
+        if workers > 1:
+            task_store = getattr(self.task_manager, "task_store", None)
+            event_broker = getattr(self.task_manager, "event_broker", None)
+            idempotency_cache = getattr(self.task_manager, "idempotency_cache", None)
+            if (
+                isinstance(task_store, InMemoryTaskStore)
+                or isinstance(event_broker, InMemoryTaskEventBroker)
+                or (
+                    isinstance(idempotency_cache, IdempotencyCache)
+                    and not isinstance(idempotency_cache, SQLiteIdempotencyCache)
+                )
+            ):
+                raise ValueError(
+                    "Multiple workers need a shared task store, e.g. TASK_STORE_BACKEND=sqlite"
+                )
+
+            if event_poll_interval_seconds is not None and hasattr(
+                event_broker, "poll_interval_seconds"
+            ):
+                event_broker.poll_interval_seconds = event_poll_interval_seconds
+
+            from a2a_server.workers import run_workers
+
+            run_workers(self.app, self.host, self.port, workers)
+            return
+
         import uvicorn
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    @asynccontextmanager
+    async def _lifespan(self, app: Starlette):
+        await self.task_manager.start()
+        try:
+            yield
+        finally:
+            await self.task_manager.stop()
+
+    def _get_agent_card(self, request: Request) -> Response:
+        if self._agent_card_json is None:
+            self._agent_card_json = self.agent_card.model_dump_json(exclude_none=True)
+            digest = hashlib.sha256(self._agent_card_json.encode()).hexdigest()
+            self._agent_card_etag = f'"{digest[:32]}"'
+
+        # Clients revalidating a cached card get an empty response if unchanged
+        headers = {"ETag": self._agent_card_etag}
+        if request.headers.get("If-None-Match") == self._agent_card_etag:
+            return Response(status_code=304, headers=headers)
+        return JSONRPCBytesResponse(self._agent_card_json, headers=headers)
 
     def verify_bearer_token(self, token):
         """Verify the provided bearer token against the expected token."""
@@ -147,54 +219,97 @@ class A2AServer:
             return JSONResponse({"error": error_message}, status_code=401)
 
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-            print(json_rpc_request)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
-                )
-            else:
-                logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
-                raise ValueError(f"Unexpected request type: {type(request)}")
+            body = await request.body()
+            if body.lstrip()[:1] == b"[":
+                return await self._process_batch_request(body)
+
+            # The request union is discriminated on `method`, so the raw body is
+            # parsed and validated in one pass against the matching model only
+            json_rpc_request = A2ARequest.validate_json(body)
+            log_payload(
+                logger,
+                "A2A request",
+                body,
+                method=json_rpc_request.method,
+                id=json_rpc_request.id,
+            )
+
+            handler = getattr(
+                self.task_manager, METHOD_HANDLERS[json_rpc_request.method]
+            )
+            result = await handler(json_rpc_request)
 
             return self._create_response(result)
 
         except Exception as e:
             return self._handle_exception(e)
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
+    async def _process_batch_request(self, body: bytes) -> Response:
+        """Handles a JSON-RPC batch, members are executed concurrently."""
+        batch = json.loads(body)
+        if not batch:
+            return self._create_error_response(
+                InvalidRequestError(message="Batch request is empty")
+            )
+        if len(batch) > self.max_batch_size:
+            return self._create_error_response(
+                InvalidRequestError(
+                    message=f"Batch request exceeds {self.max_batch_size} requests"
+                )
+            )
+
+        responses = await asyncio.gather(
+            *(self._process_batch_member(item) for item in batch)
+        )
+        return JSONRPCBytesResponse(
+            "["
+            + ",".join(r.model_dump_json(exclude_none=True) for r in responses)
+            + "]"
+        )
+
+    async def _process_batch_member(self, item: Any) -> JSONRPCResponse:
+        request_id = item.get("id") if isinstance(item, dict) else None
+        try:
+            json_rpc_request = A2ARequest.validate_python(item)
+            if json_rpc_request.method in STREAMING_METHODS:
+                return JSONRPCResponse(
+                    id=request_id,
+                    error=InvalidRequestError(
+                        message="Streaming methods are not supported in batch requests"
+                    ),
+                )
+
+            handler = getattr(
+                self.task_manager, METHOD_HANDLERS[json_rpc_request.method]
+            )
+            return await handler(json_rpc_request)
+        except Exception as e:
+            return JSONRPCResponse(id=request_id, error=self._to_json_rpc_error(e))
+
+    def _to_json_rpc_error(self, e: Exception) -> JSONRPCError:
         if isinstance(e, json.decoder.JSONDecodeError):
-            json_rpc_error = JSONParseError()
+            return JSONParseError()
         elif isinstance(e, ValidationError):
-            json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
-        else:
-            logger.error(f"Unhandled exception: {e}")
-            json_rpc_error = InternalError()
+            error_types = {error["type"] for error in e.errors()}
+            if "json_invalid" in error_types:
+                return JSONParseError()
+            elif "union_tag_invalid" in error_types:
+                return MethodNotFoundError()
+            return InvalidRequestError(data=json.loads(e.json()))
+
+        logger.error(f"Unhandled exception: {e}")
+        return InternalError()
 
+    def _handle_exception(self, e: Exception) -> Response:
+        return self._create_error_response(self._to_json_rpc_error(e))
+
+    def _create_error_response(self, json_rpc_error: JSONRPCError) -> Response:
         response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
+        return JSONRPCBytesResponse(
+            response.model_dump_json(exclude_none=True), status_code=400
+        )
 
-    def _create_response(self, result: Any) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
@@ -203,7 +318,9 @@ class A2AServer:
 
             return EventSourceResponse(event_generator(result))
         elif isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            content = result.model_dump_json(exclude_none=True)
+            log_payload(logger, "A2A response", content, id=result.id)
+            return JSONRPCBytesResponse(content)
         else:
             logger.error(f"Unexpected result type: {type(result)}")
             raise ValueError(f"Unexpected result type: {type(result)}")
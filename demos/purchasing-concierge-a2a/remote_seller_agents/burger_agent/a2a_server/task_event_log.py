@@ -0,0 +1,288 @@
+from abc import ABC, abstractmethod
+from a2a_types import TaskStatusUpdateEvent, TaskArtifactUpdateEvent, JSONRPCError
+from a2a_server.task_store import SQLiteDatabase
+from collections import deque
+from itertools import islice
+from typing import Awaitable, Callable, Union
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_EVENTS_PER_TASK = 100
+DEFAULT_POLL_INTERVAL_SECONDS = 0.05
+
+TaskEvent = Union[TaskStatusUpdateEvent, TaskArtifactUpdateEvent, JSONRPCError]
+EventCallback = Callable[[str, TaskEvent], Awaitable[None]]
+
+EVENT_TYPES: dict[str, type[TaskEvent]] = {
+    "status": TaskStatusUpdateEvent,
+    "artifact": TaskArtifactUpdateEvent,
+    "error": JSONRPCError,
+}
+
+
+def get_event_offset(event: TaskEvent) -> int | None:
+    if isinstance(event, JSONRPCError) or not event.metadata:
+        return None
+    return event.metadata.get("offset")
+
+
+def set_event_offset(event: TaskEvent, offset: int):
+    if not isinstance(event, JSONRPCError):
+        event.metadata = {**(event.metadata or {}), "offset": offset}
+
+
+class TaskEventLog:
+    """Append-only log of the update events of a single task.
+
+    Every appended event gets the next offset, starting from 0, which is also
+    written to the `offset` key of the event metadata so clients know where to
+    resume from. Only the latest `max_events` events are kept, older offsets
+    are not replayed anymore.
+    """
+
+    def __init__(self, max_events: int | None = DEFAULT_MAX_EVENTS_PER_TASK):
+        self.events: deque[TaskEvent] = deque(maxlen=max_events)
+        self.next_offset = 0
+
+    @property
+    def first_offset(self) -> int:
+        return self.next_offset - len(self.events)
+
+    @property
+    def last_event(self) -> TaskEvent | None:
+        return self.events[-1] if self.events else None
+
+    def append(self, event: TaskEvent) -> int:
+        offset = self.next_offset
+        set_event_offset(event, offset)
+        self.events.append(event)
+        self.next_offset += 1
+        return offset
+
+    def read_from(self, offset: int) -> list[TaskEvent]:
+        """Returns the kept events from `offset` onwards."""
+        start = max(offset, self.first_offset) - self.first_offset
+        return list(islice(self.events, start, None))
+
+
+class TaskEventBroker(ABC):
+    """Keeps the event log of every task and relays events between workers.
+
+    Events published by a server process are delivered to its own subscribers
+    by the task manager. A broker shared by several worker processes also
+    calls the callback given to `start` for the events published by the other
+    workers, so SSE subscribers receive them wherever they are connected.
+    """
+
+    async def start(self, on_remote_event: EventCallback):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, task_id: str, event: TaskEvent):
+        """Appends the event to the task log and sets its offset."""
+        pass
+
+    @abstractmethod
+    async def read_from(self, task_id: str, offset: int) -> list[TaskEvent] | None:
+        """Returns the kept events from `offset` onwards, None for unknown tasks."""
+        pass
+
+    @abstractmethod
+    async def read_last(self, task_id: str) -> TaskEvent | None:
+        pass
+
+    @abstractmethod
+    async def delete(self, task_ids: list[str]):
+        pass
+
+
+class InMemoryTaskEventBroker(TaskEventBroker):
+    """Event logs of a single server process."""
+
+    def __init__(self, max_events_per_task: int | None = DEFAULT_MAX_EVENTS_PER_TASK):
+        self.max_events_per_task = max_events_per_task
+        self.task_event_logs: dict[str, TaskEventLog] = {}
+
+    async def publish(self, task_id: str, event: TaskEvent):
+        event_log = self.task_event_logs.get(task_id)
+        if event_log is None:
+            event_log = self.task_event_logs[task_id] = TaskEventLog(
+                self.max_events_per_task
+            )
+        event_log.append(event)
+
+    async def read_from(self, task_id: str, offset: int) -> list[TaskEvent] | None:
+        event_log = self.task_event_logs.get(task_id)
+        return None if event_log is None else event_log.read_from(offset)
+
+    async def read_last(self, task_id: str) -> TaskEvent | None:
+        event_log = self.task_event_logs.get(task_id)
+        return None if event_log is None else event_log.last_event
+
+    async def delete(self, task_ids: list[str]):
+        for task_id in task_ids:
+            self.task_event_logs.pop(task_id, None)
+
+
+class SQLiteTaskEventBroker(TaskEventBroker):
+    """Event logs in a SQLite database shared by the worker processes of a host.
+
+    The events table doubles as the pub/sub channel between workers, each
+    worker polls it every `poll_interval_seconds` for the events published by
+    the other ones. Polling adds up to that interval to the latency of relayed
+    events and queries the database even when idle, a notification channel,
+    e.g. Redis pub/sub or PostgreSQL LISTEN/NOTIFY, would avoid both.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_events_per_task: int | None = DEFAULT_MAX_EVENTS_PER_TASK,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    ):
+        self.db = SQLiteDatabase(
+            db_path,
+            """
+            CREATE TABLE IF NOT EXISTS task_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL,
+                event_offset INTEGER NOT NULL,
+                worker INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL,
+                UNIQUE (task_id, event_offset)
+            );
+            """,
+        )
+        self.max_events_per_task = max_events_per_task
+        self.poll_interval_seconds = poll_interval_seconds
+        self._poll_task: asyncio.Task | None = None
+
+    async def start(self, on_remote_event: EventCallback):
+        rows = await self.db.run("SELECT COALESCE(MAX(seq), 0) FROM task_events")
+        self._poll_task = asyncio.create_task(
+            self._poll_remote_events(rows[0][0], on_remote_event)
+        )
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+
+    async def publish(self, task_id: str, event: TaskEvent):
+        event_type = next(t for t, cls in EVENT_TYPES.items() if isinstance(event, cls))
+        # The offset is stored in its own column and set back into the event
+        # metadata when the event is read
+        rows = await self.db.run(
+            """
+            INSERT INTO task_events (task_id, event_offset, worker, type, data)
+            SELECT ?, COALESCE(MAX(event_offset) + 1, 0), ?, ?, ?
+            FROM task_events WHERE task_id = ?
+            RETURNING event_offset
+            """,
+            (
+                task_id,
+                os.getpid(),
+                event_type,
+                event.model_dump_json(exclude_none=True),
+                task_id,
+            ),
+        )
+        offset = rows[0][0]
+        set_event_offset(event, offset)
+        if self.max_events_per_task is not None:
+            await self.db.run(
+                "DELETE FROM task_events WHERE task_id = ? AND event_offset <= ?",
+                (task_id, offset - self.max_events_per_task),
+            )
+
+    async def read_from(self, task_id: str, offset: int) -> list[TaskEvent] | None:
+        rows = await self.db.run(
+            """
+            SELECT event_offset, type, data FROM task_events
+            WHERE task_id = ? AND event_offset >= ?
+            ORDER BY event_offset
+            """,
+            (task_id, offset),
+        )
+        if rows:
+            return [self._load_event(*row) for row in rows]
+
+        exists = await self.db.run(
+            "SELECT 1 FROM task_events WHERE task_id = ? LIMIT 1", (task_id,)
+        )
+        return [] if exists else None
+
+    async def read_last(self, task_id: str) -> TaskEvent | None:
+        rows = await self.db.run(
+            """
+            SELECT event_offset, type, data FROM task_events
+            WHERE task_id = ? ORDER BY event_offset DESC LIMIT 1
+            """,
+            (task_id,),
+        )
+        return self._load_event(*rows[0]) if rows else None
+
+    async def delete(self, task_ids: list[str]):
+        for task_id in task_ids:
+            await self.db.run("DELETE FROM task_events WHERE task_id = ?", (task_id,))
+
+    @staticmethod
+    def _load_event(offset: int, event_type: str, data: str) -> TaskEvent:
+        event = EVENT_TYPES[event_type].model_validate_json(data)
+        set_event_offset(event, offset)
+        return event
+
+    async def _poll_remote_events(self, last_seq: int, on_remote_event: EventCallback):
+        worker = os.getpid()
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                rows = await self.db.run(
+                    """
+                    SELECT seq, task_id, event_offset, type, data FROM task_events
+                    WHERE seq > ? AND worker != ? ORDER BY seq
+                    """,
+                    (last_seq, worker),
+                )
+                for seq, task_id, offset, event_type, data in rows:
+                    last_seq = seq
+                    await on_remote_event(
+                        task_id, self._load_event(offset, event_type, data)
+                    )
+            except Exception as e:
+                logger.error(f"Error while polling task events: {e}")
+
+
+def create_task_event_broker() -> TaskEventBroker:
+    """Creates the event broker matching the configured task store backend.
+
+    - TASK_STORE_BACKEND: `memory` (default) or `sqlite`
+    - TASK_STORE_SQLITE_PATH: database file used by the `sqlite` backend
+    - TASK_EVENTS_MAX_PER_TASK: number of events kept per task
+    - TASK_EVENTS_POLL_INTERVAL_SECONDS: how often the `sqlite` backend checks
+      for the events published by the other worker processes
+    """
+    backend = os.getenv("TASK_STORE_BACKEND", "memory").lower()
+    max_events_per_task = (
+        int(os.getenv("TASK_EVENTS_MAX_PER_TASK", DEFAULT_MAX_EVENTS_PER_TASK)) or None
+    )
+    poll_interval_seconds = float(
+        os.getenv("TASK_EVENTS_POLL_INTERVAL_SECONDS", DEFAULT_POLL_INTERVAL_SECONDS)
+    )
+
+    if backend == "memory":
+        return InMemoryTaskEventBroker(max_events_per_task)
+    elif backend == "sqlite":
+        db_path = os.getenv("TASK_STORE_SQLITE_PATH", "tasks.sqlite")
+        return SQLiteTaskEventBroker(
+            db_path, max_events_per_task, poll_interval_seconds
+        )
+    else:
+        raise ValueError(f"Unsupported task store backend: {backend}")
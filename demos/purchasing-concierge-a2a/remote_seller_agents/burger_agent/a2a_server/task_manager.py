@@ -26,13 +26,23 @@ from a2a_types import (
     Artifact,
     PushNotificationConfig,
     TaskStatusUpdateEvent,
+    TaskArtifactUpdateEvent,
     JSONRPCError,
     TaskPushNotificationConfig,
     InternalError,
+    InvalidParamsError,
 )
-from a2a_server.utils import new_not_implemented_error
+from a2a_server.task_event_log import (
+    TaskEvent,
+    TaskEventBroker,
+    InMemoryTaskEventBroker,
+    get_event_offset,
+)
+from a2a_server.task_store import TaskStore, InMemoryTaskStore, TERMINAL_TASK_STATES
+from contextlib import asynccontextmanager
 import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -74,38 +84,108 @@ class TaskManager(ABC):
     ) -> Union[AsyncIterable[SendTaskResponse], JSONRPCResponse]:
         pass
 
+    async def start(self):
+        """Starts the background work of the task manager, called on server startup."""
+        pass
+
+    async def stop(self):
+        """Stops the background work of the task manager, called on server shutdown."""
+        pass
+
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
-        self.tasks: dict[str, Task] = {}
-        self.push_notification_infos: dict[str, PushNotificationConfig] = {}
-        self.lock = asyncio.Lock()
+    def __init__(
+        self,
+        task_store: TaskStore | None = None,
+        sweep_interval_seconds: float = 60,
+        lock_stripes: int = 64,
+        event_broker: TaskEventBroker | None = None,
+    ):
+        self.task_store = task_store or InMemoryTaskStore()
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # Writes are serialized per task through a fixed pool of striped locks,
+        # so unrelated tasks do not contend with each other. Reads do not lock,
+        # a task is only replaced or mutated between two awaits of a writer.
+        self.task_locks = [asyncio.Lock() for _ in range(lock_stripes)]
+        self.lock_acquisitions = 0
+        self.lock_contentions = 0
+        self.lock_wait_seconds = 0.0
         self.task_sse_subscribers: dict[str, List[asyncio.Queue]] = {}
+        # Update events of every task, replayed to resubscribing clients and
+        # relayed between the worker processes sharing the broker
+        self.event_broker = event_broker or InMemoryTaskEventBroker()
         self.subscriber_lock = asyncio.Lock()
+        self._sweeper_task: asyncio.Task | None = None
+
+    async def start(self):
+        await self.event_broker.start(self.dispatch_events_for_sse)
+        self._sweeper_task = asyncio.create_task(self._sweep_expired_tasks())
+
+    async def stop(self):
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            self._sweeper_task = None
+        await self.event_broker.stop()
+
+    @asynccontextmanager
+    async def task_lock(self, task_id: str):
+        """Acquires the lock stripe of the given task and records contention."""
+        lock = self.task_locks[hash(task_id) % len(self.task_locks)]
+        self.lock_acquisitions += 1
+        if not lock.locked():
+            async with lock:
+                yield
+            return
+
+        self.lock_contentions += 1
+        wait_started_at = time.perf_counter()
+        async with lock:
+            self.lock_wait_seconds += time.perf_counter() - wait_started_at
+            yield
+
+    def get_lock_stats(self) -> dict[str, float]:
+        return {
+            "acquisitions": self.lock_acquisitions,
+            "contentions": self.lock_contentions,
+            "wait_seconds": self.lock_wait_seconds,
+        }
+
+    async def _sweep_expired_tasks(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                expired_task_ids = await self.task_store.evict_expired_tasks()
+
+                if not expired_task_ids:
+                    continue
+
+                logger.info(f"Evicted {len(expired_task_ids)} expired tasks")
+                await self.event_broker.delete(expired_task_ids)
+                async with self.subscriber_lock:
+                    for task_id in expired_task_ids:
+                        self.task_sse_subscribers.pop(task_id, None)
+            except Exception as e:
+                logger.error(f"Error while evicting expired tasks: {e}")
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
-        logger.info(f"Getting task {request.params.id}")
+        logger.debug("Getting task %s", request.params.id)
         task_query_params: TaskQueryParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_query_params.id)
-            if task is None:
-                return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+        task = await self.task_store.get_task(task_query_params.id)
+        if task is None:
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
 
-            task_result = self.append_task_history(
-                task, task_query_params.historyLength
-            )
+        task_result = self.append_task_history(task, task_query_params.historyLength)
 
         return GetTaskResponse(id=request.id, result=task_result)
 
     async def on_cancel_task(self, request: CancelTaskRequest) -> CancelTaskResponse:
-        logger.info(f"Cancelling task {request.params.id}")
+        logger.debug("Cancelling task %s", request.params.id)
         task_id_params: TaskIdParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_id_params.id)
-            if task is None:
-                return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
+        task = await self.task_store.get_task(task_id_params.id)
+        if task is None:
+            return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
 
         return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
 
@@ -122,33 +202,36 @@ class InMemoryTaskManager(TaskManager):
     async def set_push_notification_info(
         self, task_id: str, notification_config: PushNotificationConfig
     ):
-        async with self.lock:
-            task = self.tasks.get(task_id)
+        async with self.task_lock(task_id):
+            task = await self.task_store.get_task(task_id)
             if task is None:
                 raise ValueError(f"Task not found for {task_id}")
 
-            self.push_notification_infos[task_id] = notification_config
+            await self.task_store.set_push_notification_info(
+                task_id, notification_config
+            )
 
         return
 
     async def get_push_notification_info(self, task_id: str) -> PushNotificationConfig:
-        async with self.lock:
-            task = self.tasks.get(task_id)
-            if task is None:
-                raise ValueError(f"Task not found for {task_id}")
+        task = await self.task_store.get_task(task_id)
+        if task is None:
+            raise ValueError(f"Task not found for {task_id}")
 
-            return self.push_notification_infos[task_id]
+        notification_info = await self.task_store.get_push_notification_info(task_id)
+        if notification_info is None:
+            raise ValueError(f"Push notification info not found for {task_id}")
 
-        return
+        return notification_info
 
     async def has_push_notification_info(self, task_id: str) -> bool:
-        async with self.lock:
-            return task_id in self.push_notification_infos
+        notification_info = await self.task_store.get_push_notification_info(task_id)
+        return notification_info is not None
 
     async def on_set_task_push_notification(
         self, request: SetTaskPushNotificationRequest
     ) -> SetTaskPushNotificationResponse:
-        logger.info(f"Setting task push notification {request.params.id}")
+        logger.debug("Setting task push notification %s", request.params.id)
         task_notification_params: TaskPushNotificationConfig = request.params
 
         try:
@@ -172,7 +255,7 @@ class InMemoryTaskManager(TaskManager):
     async def on_get_task_push_notification(
         self, request: GetTaskPushNotificationRequest
     ) -> GetTaskPushNotificationResponse:
-        logger.info(f"Getting task push notification {request.params.id}")
+        logger.debug("Getting task push notification %s", request.params.id)
         task_params: TaskIdParams = request.params
 
         try:
@@ -194,35 +277,67 @@ class InMemoryTaskManager(TaskManager):
         )
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
-        logger.info(f"Upserting task {task_send_params.id}")
-        async with self.lock:
-            task = self.tasks.get(task_send_params.id)
-            if task is None:
-                task = Task(
+        logger.debug("Upserting task %s", task_send_params.id)
+        is_new_task = False
+
+        def upsert(task: Task | None) -> Task:
+            nonlocal is_new_task
+            is_new_task = task is None
+            if is_new_task:
+                return Task(
                     id=task_send_params.id,
                     sessionId=task_send_params.sessionId,
                     messages=[task_send_params.message],
                     status=TaskStatus(state=TaskState.SUBMITTED),
                     history=[task_send_params.message],
                 )
-                self.tasks[task_send_params.id] = task
-            else:
-                task.history.append(task_send_params.message)
+            task.history.append(task_send_params.message)
+            return task
 
+        async with self.task_lock(task_send_params.id):
+            # Read and written at once, other worker processes may update it too
+            task = await self.task_store.update_task(task_send_params.id, upsert)
+            if is_new_task:
+                await self.enqueue_events_for_sse(
+                    task.id, TaskStatusUpdateEvent(id=task.id, status=task.status)
+                )
             return task
 
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
     ) -> Union[AsyncIterable[SendTaskStreamingResponse], JSONRPCResponse]:
-        return new_not_implemented_error(request.id)
+        """Replays the task events from an offset, then streams the live ones.
+
+        The offset is given as `metadata.offset` of the request params and is
+        the offset of the first event the client has not received yet, every
+        streamed event carries its own offset in its metadata. The stream ends
+        at the next final status event, no agent work is redone.
+        """
+        task_id_params: TaskIdParams = request.params
+        logger.debug("Resubscribing to task %s", task_id_params.id)
+        offset = (task_id_params.metadata or {}).get("offset", 0)
+        if not isinstance(offset, int) or offset < 0:
+            return JSONRPCResponse(
+                id=request.id,
+                error=InvalidParamsError(message="Offset must be a non-negative int"),
+            )
+
+        try:
+            sse_event_queue = await self.setup_sse_consumer(
+                task_id_params.id, is_resubscribe=True, offset=offset
+            )
+        except ValueError:
+            return JSONRPCResponse(id=request.id, error=TaskNotFoundError())
+
+        return self.dequeue_events_for_sse(
+            request.id, task_id_params.id, sse_event_queue
+        )
 
     async def update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError:
+        def update(task: Task | None) -> Task:
+            if task is None:
                 logger.error(f"Task {task_id} not found for updating the task")
                 raise ValueError(f"Task {task_id} not found")
 
@@ -235,42 +350,122 @@ class InMemoryTaskManager(TaskManager):
                 if task.artifacts is None:
                     task.artifacts = []
                 task.artifacts.extend(artifacts)
+            return task
+
+        async with self.task_lock(task_id):
+            # Read and written at once, other worker processes may update it too
+            task = await self.task_store.update_task(task_id, update)
 
+            # Recorded under the task lock so the log keeps the update order
+            for artifact in artifacts or []:
+                await self.enqueue_events_for_sse(
+                    task_id, TaskArtifactUpdateEvent(id=task_id, artifact=artifact)
+                )
+            await self.enqueue_events_for_sse(
+                task_id,
+                TaskStatusUpdateEvent(
+                    id=task_id, status=status, final=self.is_final_state(status.state)
+                ),
+            )
             return task
 
+    @staticmethod
+    def is_final_state(state: TaskState) -> bool:
+        """Whether a task stops producing events until it gets a new message."""
+        return state in TERMINAL_TASK_STATES or state == TaskState.INPUT_REQUIRED
+
     def append_task_history(self, task: Task, historyLength: int | None):
-        new_task = task.model_copy()
+        """Returns a snapshot of the task with only the requested history length.
+
+        Fields are shared with the stored task instead of copying and
+        re-validating it, only the history list is sliced into a new list.
+        """
         if historyLength is not None and historyLength > 0:
-            new_task.history = new_task.history[-historyLength:]
+            history = task.history[-historyLength:]
         else:
-            new_task.history = []
-
-        return new_task
+            history = []
+
+        return Task.model_construct(
+            _fields_set=task.model_fields_set | {"history"},
+            id=task.id,
+            sessionId=task.sessionId,
+            status=task.status,
+            artifacts=None if task.artifacts is None else list(task.artifacts),
+            history=history,
+            metadata=task.metadata,
+        )
 
-    async def setup_sse_consumer(self, task_id: str, is_resubscribe: bool = False):
+    async def setup_sse_consumer(
+        self, task_id: str, is_resubscribe: bool = False, offset: int = 0
+    ):
+        sse_event_queue = asyncio.Queue(maxsize=0)  # <=0 is unlimited
         async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
-                if is_resubscribe:
-                    raise ValueError("Task not found for resubscription")
-                else:
-                    self.task_sse_subscribers[task_id] = []
-
-            sse_event_queue = asyncio.Queue(maxsize=0)  # <=0 is unlimited
-            self.task_sse_subscribers[task_id].append(sse_event_queue)
+            self.task_sse_subscribers.setdefault(task_id, []).append(sse_event_queue)
+        if not is_resubscribe:
             return sse_event_queue
 
+        # Read after subscribing so no event falls between the replay and the
+        # live ones, without holding the lock over the read
+        try:
+            replayed_events = await self.get_replayed_events(task_id, offset)
+        except ValueError:
+            await self._remove_subscriber(task_id, sse_event_queue)
+            raise
+        # The live events received meanwhile go after the replayed ones, the
+        # consumer drops those received twice by their offset
+        live_events = []
+        while not sse_event_queue.empty():
+            live_events.append(sse_event_queue.get_nowait())
+        for event in [*replayed_events, *live_events]:
+            sse_event_queue.put_nowait(event)
+        return sse_event_queue
+
+    async def get_replayed_events(self, task_id: str, offset: int) -> list[TaskEvent]:
+        events = await self.event_broker.read_from(task_id, offset)
+        if events is None:
+            raise ValueError("Task not found for resubscription")
+
+        first_offset = get_event_offset(events[0]) if events else None
+        if first_offset is not None and offset < first_offset:
+            logger.warning(
+                "Events %d to %d of task %s are no longer kept",
+                offset,
+                first_offset - 1,
+                task_id,
+            )
+
+        if not events:
+            last_event = await self.event_broker.read_last(task_id)
+            if isinstance(last_event, TaskStatusUpdateEvent) and last_event.final:
+                # Nothing new and nothing coming, the final event ends the stream
+                events = [last_event]
+        return events
+
     async def enqueue_events_for_sse(self, task_id, task_update_event):
+        # Published outside the lock, a shared broker writes to the database.
+        # Events of a task are still published in order under its task lock.
+        await self.event_broker.publish(task_id, task_update_event)
         async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
-                return
+            await self._put_for_subscribers(task_id, task_update_event)
 
-            current_subscribers = self.task_sse_subscribers[task_id]
-            for subscriber in current_subscribers:
-                await subscriber.put(task_update_event)
+    async def dispatch_events_for_sse(self, task_id, task_update_event):
+        """Delivers an event published by another worker to the subscribers."""
+        async with self.subscriber_lock:
+            await self._put_for_subscribers(task_id, task_update_event)
+
+    async def _put_for_subscribers(self, task_id, task_update_event):
+        if task_id not in self.task_sse_subscribers:
+            return
+
+        current_subscribers = self.task_sse_subscribers[task_id]
+        for subscriber in current_subscribers:
+            await subscriber.put(task_update_event)
 
     async def dequeue_events_for_sse(
         self, request_id, task_id, sse_event_queue: asyncio.Queue
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        # Events relayed from other workers may also be in the replayed ones
+        next_offset = 0
         try:
             while True:
                 event = await sse_event_queue.get()
@@ -278,10 +473,22 @@ class InMemoryTaskManager(TaskManager):
                     yield SendTaskStreamingResponse(id=request_id, error=event)
                     break
 
+                offset = get_event_offset(event)
+                if offset is not None:
+                    if offset < next_offset:
+                        continue
+                    next_offset = offset + 1
+
                 yield SendTaskStreamingResponse(id=request_id, result=event)
                 if isinstance(event, TaskStatusUpdateEvent) and event.final:
                     break
         finally:
-            async with self.subscriber_lock:
-                if task_id in self.task_sse_subscribers:
-                    self.task_sse_subscribers[task_id].remove(sse_event_queue)
+            await self._remove_subscriber(task_id, sse_event_queue)
+
+    async def _remove_subscriber(self, task_id, sse_event_queue: asyncio.Queue):
+        async with self.subscriber_lock:
+            subscribers = self.task_sse_subscribers.get(task_id)
+            if subscribers and sse_event_queue in subscribers:
+                subscribers.remove(sse_event_queue)
+                if not subscribers:
+                    del self.task_sse_subscribers[task_id]
@@ -0,0 +1,81 @@
+from starlette.applications import Starlette
+import logging
+import multiprocessing
+import signal
+import socket
+import time
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESTART_DELAY_SECONDS = 1.0
+
+
+def serve_worker(app: Starlette, sock: socket.socket, config_kwargs: dict):
+    server = uvicorn.Server(uvicorn.Config(app, **config_kwargs))
+    server.run(sockets=[sock])
+
+
+def run_workers(
+    app: Starlette,
+    host: str,
+    port: int,
+    workers: int,
+    restart_delay_seconds: float = DEFAULT_RESTART_DELAY_SECONDS,
+    **config_kwargs,
+):
+    """Serves the app from several worker processes sharing one listening socket.
+
+    Workers are forked, so they inherit the app and everything created before,
+    and the kernel balances the incoming connections between them. Workers which
+    exit are restarted until the manager receives SIGINT or SIGTERM. Extra
+    keyword arguments are passed to the uvicorn config of every worker.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    context = multiprocessing.get_context("fork")
+
+    def start_worker() -> multiprocessing.Process:
+        process = context.Process(
+            target=serve_worker, args=(app, sock, config_kwargs), daemon=True
+        )
+        process.start()
+        logger.info(f"Started worker {process.pid}")
+        return process
+
+    is_stopping = False
+
+    def stop(signum, frame):
+        nonlocal is_stopping
+        is_stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    processes = [start_worker() for _ in range(workers)]
+    logger.info(f"Serving on {host}:{port} with {workers} workers")
+    try:
+        while not is_stopping:
+            time.sleep(0.5)
+            for i, process in enumerate(processes):
+                if process.is_alive() or is_stopping:
+                    continue
+                logger.warning(
+                    f"Worker {process.pid} exited with code {process.exitcode}, "
+                    "restarting it"
+                )
+                time.sleep(restart_delay_seconds)
+                processes[i] = start_worker()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+        sock.close()
@@ -4,6 +4,7 @@ import uuid
 from crewai import Agent, Crew, LLM, Task, Process
 from crewai.tools import tool
 from dotenv import load_dotenv
+from catalog import Catalog, MenuItem
 import litellm
 import os
 
@@ -12,6 +13,16 @@ load_dotenv()
 litellm.vertex_project = os.getenv("GCLOUD_PROJECT_ID")
 litellm.vertex_location = os.getenv("GCLOUD_LOCATION")
 
+CATALOG = Catalog(
+    [
+        MenuItem("Classic Cheeseburger", 85, aliases=("classic burger", "classic")),
+        MenuItem("Double Cheeseburger", 110, aliases=("double burger", "double")),
+        MenuItem("Spicy Chicken Burger", 80, aliases=("chicken burger", "chicken")),
+        MenuItem("Spicy Cajun Burger", 85, aliases=("cajun burger", "cajun")),
+    ],
+    category_words={"burger"},
+)
+
 
 class ResponseFormat(BaseModel):
     """Respond to the user in this format."""
@@ -70,10 +81,7 @@ Received user query: {user_prompt}
 Session ID: {session_id}
 
 Provided below is the available burger menu and it's related price:
-- Classic Cheeseburger: IDR 85K
-- Double Cheeseburger: IDR 110K
-- Spicy Chicken Burger: IDR 80K
-- Spicy Cajun Burger: IDR 85K
+{menu}
 
 # RULES
 
@@ -90,6 +98,15 @@ Provided below is the available burger menu and it's related price:
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
 
     def invoke(self, query, sessionId) -> str:
+        # Menu and price queries are answered from the catalog without the LLM
+        answer = CATALOG.answer(query)
+        if answer is not None:
+            return {
+                "is_task_complete": True,
+                "require_user_input": False,
+                "content": answer,
+            }
+
         model = LLM(
             model="vertex_ai/gemini-2.0-flash",  # Use base model name without provider prefix
         )
@@ -124,7 +141,11 @@ Provided below is the available burger menu and it's related price:
             process=Process.sequential,
         )
 
-        inputs = {"user_prompt": query, "session_id": sessionId}
+        inputs = {
+            "user_prompt": query,
+            "session_id": sessionId,
+            "menu": CATALOG.format_menu(),
+        }
         response = crew.kickoff(inputs)
         return self.get_agent_response(response)
 
@@ -0,0 +1,229 @@
+from dataclasses import dataclass, field
+from enum import Enum
+import re
+
+TOKEN_PATTERN = re.compile(r"\d+|[a-z]+")
+
+NUMBER_WORDS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+}
+# Any of these means the user wants to act, which needs the agent and its tools
+ORDER_KEYWORDS = {
+    "order",
+    "orders",
+    "buy",
+    "purchase",
+    "confirm",
+    "confirmed",
+    "yes",
+    "checkout",
+    "want",
+    "create",
+    "place",
+    "cancel",
+}
+MENU_KEYWORDS = {"menu", "menus", "available", "offer", "sell", "options", "list"}
+PRICE_KEYWORDS = {
+    "price",
+    "prices",
+    "cost",
+    "costs",
+    "much",
+    "total",
+    "breakdown",
+    "quote",
+}
+# Words carrying no meaning on their own, anything else not understood makes
+# the query ambiguous
+FILLER_WORDS = {
+    "a",
+    "an",
+    "what",
+    "whats",
+    "s",
+    "is",
+    "are",
+    "the",
+    "on",
+    "in",
+    "of",
+    "for",
+    "and",
+    "with",
+    "your",
+    "do",
+    "does",
+    "you",
+    "i",
+    "me",
+    "my",
+    "can",
+    "could",
+    "please",
+    "pls",
+    "tell",
+    "show",
+    "give",
+    "have",
+    "how",
+    "would",
+    "be",
+    "it",
+    "x",
+    "each",
+    "today",
+}
+
+
+class Intent(str, Enum):
+    MENU = "menu"
+    PRICE = "price"
+
+
+@dataclass(frozen=True)
+class MenuItem:
+    name: str
+    # Price in thousands of IDR
+    price: int
+    # Lowercase phrases identifying the item in a query, the name is always one
+    aliases: tuple[str, ...] = ()
+
+
+@dataclass
+class Classification:
+    intent: Intent
+    # Quantity per item, in the order the items were mentioned
+    quantities: dict[MenuItem, int] = field(default_factory=dict)
+
+
+def format_price(price: int) -> str:
+    return f"IDR {price}K"
+
+
+class Catalog:
+    """Structured menu of a seller, answering menu and price queries without the LLM.
+
+    Queries are classified with keywords and only answered when every word is
+    understood, anything else, e.g. an order, an unknown item or an ambiguous
+    item name, is left to the agent.
+    """
+
+    def __init__(self, items: list[MenuItem], category_words: set[str]):
+        self.items = items
+        # Generic words like "pizza" which do not identify an item by themselves
+        self.category_words = category_words
+        self.aliases: list[tuple[tuple[str, ...], MenuItem]] = sorted(
+            (
+                (tuple(TOKEN_PATTERN.findall(alias)), item)
+                for item in items
+                for alias in {item.name.lower(), *item.aliases}
+            ),
+            key=lambda alias: len(alias[0]),
+            reverse=True,
+        )
+        self.vocabulary = category_words.union(*(alias for alias, _ in self.aliases))
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def format_menu(self) -> str:
+        return "\n".join(f"- {item.name}: {format_price(item.price)}" for item in self)
+
+    def classify(self, query: str) -> Classification | None:
+        """Returns the intent of the query, None if the agent should handle it."""
+        tokens = [
+            self._singularize(token)
+            for token in TOKEN_PATTERN.findall(query.lower().replace("'", ""))
+        ]
+        if not tokens or ORDER_KEYWORDS.intersection(tokens):
+            return None
+
+        quantities: dict[MenuItem, int] = {}
+        leftover_tokens = []
+        position = 0
+        while position < len(tokens):
+            match = self._match_alias(tokens, position)
+            if match is None:
+                leftover_tokens.append(tokens[position])
+                position += 1
+                continue
+
+            alias, item = match
+            quantity = (
+                self._parse_quantity(leftover_tokens[-1]) if leftover_tokens else None
+            )
+            if quantity is not None:
+                leftover_tokens.pop()
+            quantities[item] = quantities.get(item, 0) + (quantity or 1)
+            position += len(alias)
+
+        is_menu_query = bool(MENU_KEYWORDS.intersection(leftover_tokens))
+        is_price_query = bool(PRICE_KEYWORDS.intersection(leftover_tokens))
+        if any(
+            token not in FILLER_WORDS
+            and token not in MENU_KEYWORDS
+            and token not in PRICE_KEYWORDS
+            and token not in self.category_words
+            for token in leftover_tokens
+        ):
+            return None
+
+        if quantities and (is_price_query or is_menu_query):
+            return Classification(Intent.PRICE, quantities)
+        if not quantities and is_menu_query:
+            return Classification(Intent.MENU)
+        return None
+
+    def answer(self, query: str) -> str | None:
+        """Answers menu and price queries, None if the agent should handle it."""
+        classification = self.classify(query)
+        if classification is None:
+            return None
+        if classification.intent == Intent.MENU:
+            return f"Here is our menu:\n{self.format_menu()}"
+        return self.format_breakdown(classification.quantities)
+
+    def format_breakdown(self, quantities: dict[MenuItem, int]) -> str:
+        if len(quantities) == 1 and next(iter(quantities.values())) == 1:
+            item = next(iter(quantities))
+            return f"{item.name} is {format_price(item.price)}."
+
+        lines = [
+            f"- {quantity} x {item.name} ({format_price(item.price)} each): "
+            f"{format_price(quantity * item.price)}"
+            for item, quantity in quantities.items()
+        ]
+        total = sum(quantity * item.price for item, quantity in quantities.items())
+        return (
+            "Price breakdown:\n" + "\n".join(lines) + f"\nTotal: {format_price(total)}"
+        )
+
+    def _match_alias(
+        self, tokens: list[str], position: int
+    ) -> tuple[tuple[str, ...], MenuItem] | None:
+        for alias, item in self.aliases:
+            if tuple(tokens[position : position + len(alias)]) == alias:
+                return alias, item
+        return None
+
+    def _singularize(self, token: str) -> str:
+        if token.endswith("s") and token[:-1] in self.vocabulary:
+            return token[:-1]
+        return token
+
+    @staticmethod
+    def _parse_quantity(token: str) -> int | None:
+        if token.isdigit():
+            return int(token) or None
+        return NUMBER_WORDS.get(token)
@@ -14,8 +14,16 @@ from a2a_types import (
     InvalidParamsError,
 )
 from a2a_server.task_manager import InMemoryTaskManager
+from a2a_server.task_store import TaskStore
+from a2a_server.task_event_log import TaskEventBroker
 from agent import BurgerSellerAgent
 from a2a_server.push_notification_auth import PushNotificationSenderAuth
+from a2a_server.push_notification_queue import PushNotificationQueue
+from a2a_server.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflictError,
+    get_idempotency_key,
+)
 import a2a_server.utils as utils
 from typing import Union
 import logging
@@ -28,10 +36,27 @@ class AgentTaskManager(InMemoryTaskManager):
         self,
         agent: BurgerSellerAgent,
         notification_sender_auth: PushNotificationSenderAuth,
+        task_store: TaskStore | None = None,
+        notification_queue: PushNotificationQueue | None = None,
+        idempotency_cache: IdempotencyCache | None = None,
+        event_broker: TaskEventBroker | None = None,
     ):
-        super().__init__()
+        super().__init__(task_store=task_store, event_broker=event_broker)
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
+        self.notification_queue = notification_queue or PushNotificationQueue(
+            notification_sender_auth
+        )
+        self.idempotency_cache = idempotency_cache or IdempotencyCache()
+
+    async def start(self):
+        await super().start()
+        await self.notification_queue.start()
+
+    async def stop(self):
+        await self.notification_queue.stop()
+        await self.notification_sender_auth.aclose()
+        await super().stop()
 
     def _validate_request(
         self, request: Union[SendTaskRequest, SendTaskStreamingRequest]
@@ -66,6 +91,25 @@ class AgentTaskManager(InMemoryTaskManager):
         if validation_error:
             return SendTaskResponse(id=request.id, error=validation_error.error)
 
+        # Retries of a message attach to its execution or get its response,
+        # so the agent never runs twice and no order is created twice
+        idempotency_key = get_idempotency_key(request.params)
+        if idempotency_key is None:
+            return await self._send_task(request)
+
+        try:
+            response = await self.idempotency_cache.run(
+                idempotency_key,
+                request.params.message,
+                lambda: self._send_task(request),
+            )
+        except IdempotencyConflictError as e:
+            return SendTaskResponse(
+                id=request.id, error=InvalidParamsError(message=str(e))
+            )
+        return response.model_copy(update={"id": request.id})
+
+    async def _send_task(self, request: SendTaskRequest) -> SendTaskResponse:
         await self.upsert_task(request.params)
 
         if request.params.pushNotification:
@@ -130,13 +174,14 @@ class AgentTaskManager(InMemoryTaskManager):
 
     async def send_task_notification(self, task: Task):
         if not await self.has_push_notification_info(task.id):
-            logger.info(f"No push notification info found for task {task.id}")
+            logger.debug("No push notification info found for task %s", task.id)
             return
         push_info = await self.get_push_notification_info(task.id)
 
-        logger.info(f"Notifying for task {task.id} => {task.status.state}")
-        await self.notification_sender_auth.send_push_notification(
-            push_info.url, data=task.model_dump(exclude_none=True)
+        logger.info("Notifying for task %s => %s", task.id, task.status.state)
+        # Delivered in the background so a slow receiver never delays the response
+        self.notification_queue.enqueue(
+            task.id, push_info.url, task.model_dump_json(exclude_none=True).encode()
         )
 
     async def set_push_notification_info(
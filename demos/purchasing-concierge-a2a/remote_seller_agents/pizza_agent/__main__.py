@@ -1,6 +1,9 @@
 from a2a_server.server import A2AServer
 from a2a_types import AgentCard, AgentCapabilities, AgentSkill, AgentAuthentication
 from a2a_server.push_notification_auth import PushNotificationSenderAuth
+from a2a_server.task_store import create_task_store
+from a2a_server.task_event_log import create_task_event_broker
+from a2a_server.idempotency import create_idempotency_cache
 from task_manager import AgentTaskManager
 from agent import PizzaSellerAgent
 import click
@@ -17,7 +20,8 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", "host", default="0.0.0.0")
 @click.option("--port", "port", default=10000)
-def main(host, port):
+@click.option("--workers", "workers", default=1)
+def main(host, port, workers):
     """Starts the Pizza Seller Agent server."""
     try:
         capabilities = AgentCapabilities(pushNotifications=True)
@@ -42,13 +46,18 @@ def main(host, port):
             skills=[skill],
         )
 
-        notification_sender_auth = PushNotificationSenderAuth()
+        notification_sender_auth = PushNotificationSenderAuth(
+            algorithm=os.environ.get("PUSH_NOTIFICATION_JWT_ALGORITHM", "RS256")
+        )
         notification_sender_auth.generate_jwk()
         server = A2AServer(
             agent_card=agent_card,
             task_manager=AgentTaskManager(
                 agent=PizzaSellerAgent(),
                 notification_sender_auth=notification_sender_auth,
+                task_store=create_task_store(),
+                event_broker=create_task_event_broker(),
+                idempotency_cache=create_idempotency_cache(),
             ),
             host=host,
             port=port,
@@ -62,7 +71,7 @@ def main(host, port):
         )
 
         logger.info(f"Starting server on {host}:{port}")
-        server.start()
+        server.start(workers=workers)
     except Exception as e:
         logger.error(f"An error occurred during server startup: {e}")
         exit(1)
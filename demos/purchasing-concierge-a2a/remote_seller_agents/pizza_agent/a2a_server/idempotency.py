@@ -0,0 +1,254 @@
+from a2a_types import TaskSendParams, Message, SendTaskResponse
+from a2a_server.task_store import SQLiteDatabase
+from collections import OrderedDict
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_TTL_SECONDS = 60 * 10
+DEFAULT_MAX_CACHED_RESPONSES = 1000
+# Longest execution, after it the claim of a worker which died is released
+DEFAULT_CLAIM_TTL_SECONDS = 60 * 5
+DEFAULT_POLL_INTERVAL_SECONDS = 0.1
+
+IdempotencyKey = tuple[str, str]
+
+
+class IdempotencyConflictError(ValueError):
+    pass
+
+
+class IdempotentExecution:
+    def __init__(self, message: Message, task: asyncio.Task):
+        self.message = message
+        self.task = task
+        self.expires_at = float("inf")
+
+
+def get_idempotency_key(task_send_params: TaskSendParams) -> IdempotencyKey | None:
+    """Returns the task ID and message ID, None if the message has no ID."""
+    message_id = (task_send_params.message.metadata or {}).get("message_id")
+    if not message_id:
+        return None
+    return task_send_params.id, str(message_id)
+
+
+class IdempotencyCache:
+    """Runs each task message at most once and caches its response.
+
+    A request with the key of a running execution waits for that execution
+    instead of starting another one, a request with the key of a finished
+    execution gets the cached response for `response_ttl_seconds`. Executions
+    run in their own asyncio task so a client dropping its request does not
+    cancel the work its retry attaches to. Failed executions are not cached,
+    the next retry runs them again.
+    """
+
+    def __init__(
+        self,
+        response_ttl_seconds: float = DEFAULT_RESPONSE_TTL_SECONDS,
+        max_cached_responses: int = DEFAULT_MAX_CACHED_RESPONSES,
+    ):
+        self.response_ttl_seconds = response_ttl_seconds
+        self.max_cached_responses = max_cached_responses
+        self.executions: OrderedDict[IdempotencyKey, IdempotentExecution] = (
+            OrderedDict()
+        )
+
+    async def run(
+        self,
+        key: IdempotencyKey,
+        message: Message,
+        execute: Callable[[], Awaitable[SendTaskResponse]],
+    ) -> SendTaskResponse:
+        self._evict_expired(time.monotonic())
+
+        execution = self.executions.get(key)
+        if execution is not None:
+            if execution.message != message:
+                raise IdempotencyConflictError(
+                    f"Message {key[1]} of task {key[0]} was sent with another content"
+                )
+            logger.debug(
+                "Duplicate message %s of task %s, %s",
+                key[1],
+                key[0],
+                "cached" if execution.task.done() else "in flight",
+            )
+        else:
+            execution = IdempotentExecution(message, asyncio.create_task(execute()))
+            execution.task.add_done_callback(
+                lambda task: self._on_execution_done(key, execution)
+            )
+            self.executions[key] = execution
+
+        return await asyncio.shield(execution.task)
+
+    def _on_execution_done(self, key: IdempotencyKey, execution: IdempotentExecution):
+        if execution.task.cancelled() or execution.task.exception() is not None:
+            if self.executions.get(key) is execution:
+                del self.executions[key]
+            return
+        execution.expires_at = time.monotonic() + self.response_ttl_seconds
+
+    def _evict_expired(self, now: float):
+        # Executions are ordered by start, the oldest finished ones are evicted
+        # first when over the bound. Running ones are skipped, never evicted,
+        # as they may finish after executions started later.
+        over_bound = len(self.executions) - self.max_cached_responses
+        evicted_keys = []
+        for key, execution in self.executions.items():
+            if not execution.task.done():
+                continue
+            if execution.expires_at <= now or len(evicted_keys) < over_bound:
+                evicted_keys.append(key)
+        for key in evicted_keys:
+            del self.executions[key]
+
+
+class SQLiteIdempotencyCache(IdempotencyCache):
+    """Idempotency records in a SQLite database shared by the worker processes.
+
+    Duplicates received by the same worker attach to its execution as with the
+    in-memory cache. Across workers, the first one inserting the record of a
+    message claims it and runs it, duplicates received by the other workers
+    poll the record every `poll_interval_seconds` until the response is
+    stored, then get it until `response_ttl_seconds` after the execution. The
+    claim of a worker which died before storing the response is released
+    after `claim_ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        response_ttl_seconds: float = DEFAULT_RESPONSE_TTL_SECONDS,
+        max_cached_responses: int = DEFAULT_MAX_CACHED_RESPONSES,
+        claim_ttl_seconds: float = DEFAULT_CLAIM_TTL_SECONDS,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    ):
+        super().__init__(response_ttl_seconds, max_cached_responses)
+        self.claim_ttl_seconds = claim_ttl_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.db = SQLiteDatabase(
+            db_path,
+            """
+            CREATE TABLE IF NOT EXISTS idempotency_records (
+                task_id TEXT NOT NULL,
+                message_id TEXT NOT NULL,
+                message TEXT NOT NULL,
+                response TEXT,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (task_id, message_id)
+            );
+            CREATE INDEX IF NOT EXISTS idempotency_records_expires_at
+                ON idempotency_records (expires_at);
+            """,
+        )
+
+    async def run(
+        self,
+        key: IdempotencyKey,
+        message: Message,
+        execute: Callable[[], Awaitable[SendTaskResponse]],
+    ) -> SendTaskResponse:
+        return await super().run(
+            key, message, lambda: self._run_shared(key, message, execute)
+        )
+
+    async def _run_shared(
+        self,
+        key: IdempotencyKey,
+        message: Message,
+        execute: Callable[[], Awaitable[SendTaskResponse]],
+    ) -> SendTaskResponse:
+        message_json = message.model_dump_json(exclude_none=True)
+        while True:
+            # Wall clock time is used here because the expiry is shared across processes
+            record = await asyncio.to_thread(
+                self.db.transaction,
+                lambda conn: self._claim(conn, key, message_json, time.time()),
+            )
+            if record is None:
+                break
+            stored_message, response = record
+            if stored_message != message_json:
+                raise IdempotencyConflictError(
+                    f"Message {key[1]} of task {key[0]} was sent with another content"
+                )
+            if response is not None:
+                return SendTaskResponse.model_validate_json(response)
+            logger.debug(
+                "Message %s of task %s is in flight in another worker", key[1], key[0]
+            )
+            await asyncio.sleep(self.poll_interval_seconds)
+
+        try:
+            response = await execute()
+        except BaseException:
+            # Failed executions are not cached, the next retry runs them again
+            await self.db.run(
+                "DELETE FROM idempotency_records WHERE task_id = ? AND message_id = ?",
+                key,
+            )
+            raise
+        await self.db.run(
+            """
+            UPDATE idempotency_records SET response = ?, expires_at = ?
+            WHERE task_id = ? AND message_id = ?
+            """,
+            (
+                response.model_dump_json(exclude_none=True),
+                time.time() + self.response_ttl_seconds,
+                *key,
+            ),
+        )
+        return response
+
+    def _claim(
+        self,
+        conn: sqlite3.Connection,
+        key: IdempotencyKey,
+        message_json: str,
+        now: float,
+    ) -> tuple[str, str | None] | None:
+        """Inserts the record of the message, returns the existing one instead."""
+        # Deleting first takes the write lock, so only one worker claims a message
+        conn.execute("DELETE FROM idempotency_records WHERE expires_at <= ?", (now,))
+        rows = conn.execute(
+            """
+            SELECT message, response FROM idempotency_records
+            WHERE task_id = ? AND message_id = ?
+            """,
+            key,
+        ).fetchall()
+        if rows:
+            return rows[0]
+        conn.execute(
+            """
+            INSERT INTO idempotency_records (task_id, message_id, message, expires_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (*key, message_json, now + self.claim_ttl_seconds),
+        )
+        return None
+
+
+def create_idempotency_cache() -> IdempotencyCache:
+    """Creates the idempotency cache matching the configured task store backend.
+
+    - TASK_STORE_BACKEND: `memory` (default) or `sqlite`
+    - TASK_STORE_SQLITE_PATH: database file used by the `sqlite` backend
+    """
+    backend = os.getenv("TASK_STORE_BACKEND", "memory").lower()
+    if backend == "memory":
+        return IdempotencyCache()
+    elif backend == "sqlite":
+        db_path = os.getenv("TASK_STORE_SQLITE_PATH", "tasks.sqlite")
+        return SQLiteIdempotencyCache(db_path)
+    else:
+        raise ValueError(f"Unsupported task store backend: {backend}")
@@ -0,0 +1,74 @@
+from pydantic import BaseModel
+from typing import Any
+import json
+import logging
+import os
+import random
+
+# Payloads longer than this are cut in the logs
+PAYLOAD_LOG_LIMIT = int(os.getenv("A2A_LOG_PAYLOAD_LIMIT", "1000"))
+# Fraction of the DEBUG payload records which are emitted, higher levels are kept
+DEBUG_LOG_SAMPLE_RATE = float(os.getenv("A2A_LOG_SAMPLE_RATE", "1.0"))
+
+
+class LazyPayload:
+    """Formats a payload for logging only when the record is actually emitted.
+
+    Models are serialized to JSON and the text is truncated to `limit`
+    characters, so large tasks never end up in the logs in full.
+    """
+
+    __slots__ = ("payload", "limit")
+
+    def __init__(self, payload: Any, limit: int = PAYLOAD_LOG_LIMIT):
+        self.payload = payload
+        self.limit = limit
+
+    def __str__(self) -> str:
+        payload = self.payload
+        if isinstance(payload, BaseModel):
+            text = payload.model_dump_json(exclude_none=True)
+        elif isinstance(payload, (bytes, bytearray)):
+            text = payload.decode(errors="replace")
+        elif isinstance(payload, str):
+            text = payload
+        else:
+            text = json.dumps(payload, default=str)
+
+        if len(text) > self.limit:
+            return f"{text[: self.limit]}... ({len(text)} chars)"
+        return text
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps only a random `sample_rate` fraction of the DEBUG records."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1:
+            return True
+        return random.random() < self.sample_rate
+
+
+def get_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    if not any(isinstance(f, DebugSamplingFilter) for f in logger.filters):
+        logger.addFilter(DebugSamplingFilter(DEBUG_LOG_SAMPLE_RATE))
+    return logger
+
+
+def log_payload(logger: logging.Logger, event: str, payload: Any, **fields: Any):
+    """Logs a payload at DEBUG level as `event key=value ... payload=...`.
+
+    Nothing is formatted or serialized unless DEBUG is enabled and the record
+    passes the sampling filter.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    field_format = "".join(f" {key}=%s" for key in fields)
+    logger.debug(
+        f"%s{field_format} payload=%s", event, *fields.values(), LazyPayload(payload)
+    )
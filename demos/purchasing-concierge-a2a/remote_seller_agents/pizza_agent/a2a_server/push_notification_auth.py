@@ -11,63 +11,119 @@ import hashlib
 import httpx
 import logging
 
-from jwt import PyJWK, PyJWKClient
+from jwt import PyJWK
 
 logger = logging.getLogger(__name__)
 AUTH_HEADER_PREFIX = "Bearer "
 
+# Key generation parameters for each supported JWT signing algorithm. EdDSA and
+# ES256 sign considerably faster than RS256 with a 2048 bit key.
+JWK_GENERATION_PARAMS = {
+    "RS256": {"kty": "RSA", "size": 2048},
+    "ES256": {"kty": "EC", "crv": "P-256"},
+    "EdDSA": {"kty": "OKP", "crv": "Ed25519"},
+}
+JWKS_CACHE_TTL_SECONDS = 60 * 5
+VERIFIED_URL_TTL_SECONDS = 60 * 60
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 10
+
 
 class PushNotificationAuth:
-    def _calculate_request_body_sha256(self, data: dict[str, Any]):
+    def _calculate_request_body_sha256(self, data: bytes | dict[str, Any]):
         """Calculates the SHA256 hash of a request body.
 
-        This logic needs to be same for both the agent who signs the payload and the client verifier.
+        The hash is calculated over the exact body bytes that are sent and
+        received. Dicts are serialized once with a compact JSON encoding, the
+        resulting bytes have to be sent as the body for the hash to match.
         """
-        body_str = json.dumps(
+        if not isinstance(data, bytes):
+            data = self._serialize_request_body(data)
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _serialize_request_body(data: dict[str, Any]) -> bytes:
+        return json.dumps(
             data,
             ensure_ascii=False,
             allow_nan=False,
             indent=None,
             separators=(",", ":"),
-        )
-        return hashlib.sha256(body_str.encode()).hexdigest()
+        ).encode()
 
 
 class PushNotificationSenderAuth(PushNotificationAuth):
-    def __init__(self):
+    def __init__(self, algorithm: str = "RS256"):
+        if algorithm not in JWK_GENERATION_PARAMS:
+            raise ValueError(f"Unsupported push notification algorithm: {algorithm}")
+
+        self.algorithm = algorithm
         self.public_keys = []
         self.private_key_jwk: PyJWK = None
+        # URL to the monotonic time its ownership verification expires
+        self.verified_urls: dict[str, float] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client shared by all notifications to reuse pooled connections."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def verify_push_notification_url(self, url: str) -> bool:
+        now = time.monotonic()
+        if self.verified_urls.get(url, 0) > now:
+            return True
+
+        try:
+            validation_token = str(uuid.uuid4())
+            response = await self.client.get(
+                url, params={"validationToken": validation_token}
+            )
+            response.raise_for_status()
+            is_verified = response.text == validation_token
+
+            logger.info(f"Verified push-notification URL: {url} => {is_verified}")
+        except Exception as e:
+            logger.warning(f"Error during sending push-notification for URL {url}: {e}")
+            return False
 
-    @staticmethod
-    async def verify_push_notification_url(url: str) -> bool:
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                validation_token = str(uuid.uuid4())
-                response = await client.get(
-                    url, params={"validationToken": validation_token}
-                )
-                response.raise_for_status()
-                is_verified = response.text == validation_token
-
-                logger.info(f"Verified push-notification URL: {url} => {is_verified}")
-                return is_verified
-            except Exception as e:
-                logger.warning(
-                    f"Error during sending push-notification for URL {url}: {e}"
-                )
-
-        return False
+        if is_verified:
+            # Drop expired entries so the cache only holds URLs in active use
+            self.verified_urls = {
+                u: expires_at
+                for u, expires_at in self.verified_urls.items()
+                if expires_at > now
+            }
+            self.verified_urls[url] = now + VERIFIED_URL_TTL_SECONDS
+        return is_verified
 
     def generate_jwk(self):
-        key = jwk.JWK.generate(kty="RSA", size=2048, kid=str(uuid.uuid4()), use="sig")
-        self.public_keys.append(key.export_public(as_dict=True))
-        self.private_key_jwk = PyJWK.from_json(key.export_private())
+        key = jwk.JWK.generate(
+            kid=str(uuid.uuid4()),
+            use="sig",
+            **JWK_GENERATION_PARAMS[self.algorithm],
+        )
+        public_key = key.export_public(as_dict=True)
+        public_key["alg"] = self.algorithm
+        self.public_keys.append(public_key)
+        self.private_key_jwk = PyJWK.from_json(
+            key.export_private(), algorithm=self.algorithm
+        )
 
     def handle_jwks_endpoint(self, _request: Request):
         """Allow clients to fetch public keys."""
         return JSONResponse({"keys": self.public_keys})
 
-    def _generate_jwt(self, data: dict[str, Any]):
+    def _generate_jwt(self, data: bytes | dict[str, Any]):
         """JWT is generated by signing both the request payload SHA digest and time of token generation.
 
         Payload is signed with private key and it ensures the integrity of payload for client.
@@ -83,48 +139,91 @@ class PushNotificationSenderAuth(PushNotificationAuth):
             },
             key=self.private_key_jwk,
             headers={"kid": self.private_key_jwk.key_id},
-            algorithm="RS256",
+            algorithm=self.algorithm,
         )
 
-    async def send_push_notification(self, url: str, data: dict[str, Any]):
-        jwt_token = self._generate_jwt(data)
-        headers = {"Authorization": f"Bearer {jwt_token}"}
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.post(url, json=data, headers=headers)
-                response.raise_for_status()
-                logger.info(f"Push-notification sent for URL: {url}")
-            except Exception as e:
-                logger.warning(
-                    f"Error during sending push-notification for URL {url}: {e}"
-                )
+    async def deliver_push_notification(self, url: str, data: bytes | dict[str, Any]):
+        """Sends a single signed notification, raising `httpx.HTTPError` on failure."""
+        # Serialize once, the signed digest is calculated over the exact bytes sent
+        body = data if isinstance(data, bytes) else self._serialize_request_body(data)
+        jwt_token = self._generate_jwt(body)
+        headers = {
+            "Authorization": f"Bearer {jwt_token}",
+            "Content-Type": "application/json",
+        }
+        response = await self.client.post(url, content=body, headers=headers)
+        response.raise_for_status()
+
+    async def send_push_notification(self, url: str, data: bytes | dict[str, Any]):
+        try:
+            await self.deliver_push_notification(url, data)
+            logger.info(f"Push-notification sent for URL: {url}")
+        except Exception as e:
+            logger.warning(f"Error during sending push-notification for URL {url}: {e}")
 
 
 class PushNotificationReceiverAuth(PushNotificationAuth):
+    """Verifies push notifications against the public keys of the sender.
+
+    Public keys are cached for `JWKS_CACHE_TTL_SECONDS`. A token signed with an
+    unknown key ID triggers a refresh of the key set, rate limited to once every
+    `JWKS_MIN_REFRESH_INTERVAL_SECONDS` so invalid tokens cannot flood the sender.
+    """
+
     def __init__(self):
         self.public_keys_jwks = []
-        self.jwks_client = None
+        self.jwks_url: str | None = None
+        self.signing_keys: dict[str, PyJWK] = {}
+        self.jwks_fetched_at = 0.0
 
     async def load_jwks(self, jwks_url: str):
-        self.jwks_client = PyJWKClient(jwks_url)
+        self.jwks_url = jwks_url
+        await self._refresh_jwks()
+
+    async def _refresh_jwks(self):
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(self.jwks_url)
+            response.raise_for_status()
+            self.public_keys_jwks = response.json()["keys"]
+
+        self.signing_keys = {
+            key["kid"]: PyJWK.from_dict(key)
+            for key in self.public_keys_jwks
+            if key.get("use", "sig") == "sig" and "kid" in key
+        }
+        self.jwks_fetched_at = time.monotonic()
+
+    async def get_signing_key(self, kid: str) -> PyJWK:
+        jwks_age = time.monotonic() - self.jwks_fetched_at
+        if jwks_age > JWKS_CACHE_TTL_SECONDS or (
+            kid not in self.signing_keys
+            and jwks_age > JWKS_MIN_REFRESH_INTERVAL_SECONDS
+        ):
+            await self._refresh_jwks()
+
+        if kid not in self.signing_keys:
+            raise ValueError(f"Unable to find a signing key that matches: {kid}")
+        return self.signing_keys[kid]
 
     async def verify_push_notification(self, request: Request) -> bool:
         auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith(AUTH_HEADER_PREFIX):
-            print("Invalid authorization header")
+            logger.warning("Invalid authorization header")
             return False
 
         token = auth_header[len(AUTH_HEADER_PREFIX) :]
-        signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+        signing_key = await self.get_signing_key(
+            jwt.get_unverified_header(token).get("kid")
+        )
 
         decode_token = jwt.decode(
             token,
             signing_key,
             options={"require": ["iat", "request_body_sha256"]},
-            algorithms=["RS256"],
+            algorithms=[signing_key.algorithm_name],
         )
 
-        actual_body_sha256 = self._calculate_request_body_sha256(await request.json())
+        actual_body_sha256 = self._calculate_request_body_sha256(await request.body())
         if actual_body_sha256 != decode_token["request_body_sha256"]:
             # Payload signature does not match the digest in signed token.
             raise ValueError("Invalid request body")
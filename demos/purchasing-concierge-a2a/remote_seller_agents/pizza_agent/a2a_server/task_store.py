@@ -0,0 +1,311 @@
+from abc import ABC, abstractmethod
+from a2a_types import Task, TaskState, PushNotificationConfig
+from typing import Callable
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_TASK_STATES = {TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED}
+DEFAULT_TERMINAL_TASK_TTL_SECONDS = 60 * 10
+DEFAULT_IDLE_TASK_TTL_SECONDS = 60 * 60 * 24
+DEFAULT_MAX_HISTORY_LENGTH = 50
+
+
+class TaskStore(ABC):
+    """Storage for tasks and their push notification configs.
+
+    Terminal tasks expire `terminal_task_ttl_seconds` after their last update, any
+    other task expires after being idle for `idle_task_ttl_seconds`. Task history
+    is capped to the latest `max_history_length` messages on every save.
+    """
+
+    def __init__(
+        self,
+        terminal_task_ttl_seconds: float | None = DEFAULT_TERMINAL_TASK_TTL_SECONDS,
+        idle_task_ttl_seconds: float | None = DEFAULT_IDLE_TASK_TTL_SECONDS,
+        max_history_length: int | None = DEFAULT_MAX_HISTORY_LENGTH,
+    ):
+        self.terminal_task_ttl_seconds = terminal_task_ttl_seconds
+        self.idle_task_ttl_seconds = idle_task_ttl_seconds
+        self.max_history_length = max_history_length
+
+    @abstractmethod
+    async def get_task(self, task_id: str) -> Task | None:
+        pass
+
+    @abstractmethod
+    async def save_task(self, task: Task):
+        pass
+
+    async def update_task(
+        self, task_id: str, update: Callable[[Task | None], Task | None]
+    ) -> Task | None:
+        """Saves the task returned by `update` for the stored task.
+
+        `update` gets None when the task does not exist, nothing is saved when
+        it returns None. Here the read and the write are only atomic under the
+        task lock of the task manager, stores shared by several processes
+        override it to update the task in a single transaction.
+        """
+        task = update(await self.get_task(task_id))
+        if task is not None:
+            await self.save_task(task)
+        return task
+
+    @abstractmethod
+    async def delete_task(self, task_id: str):
+        pass
+
+    @abstractmethod
+    async def get_push_notification_info(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        pass
+
+    @abstractmethod
+    async def set_push_notification_info(
+        self, task_id: str, notification_config: PushNotificationConfig
+    ):
+        pass
+
+    @abstractmethod
+    async def evict_expired_tasks(self) -> list[str]:
+        """Deletes expired tasks and returns their IDs."""
+        pass
+
+    def truncate_history(self, task: Task):
+        if self.max_history_length is not None and task.history:
+            if len(task.history) > self.max_history_length:
+                task.history = task.history[-self.max_history_length :]
+
+    def calculate_expiry(self, task: Task, now: float) -> float:
+        if task.status.state in TERMINAL_TASK_STATES:
+            ttl_seconds = self.terminal_task_ttl_seconds
+        else:
+            ttl_seconds = self.idle_task_ttl_seconds
+
+        return float("inf") if ttl_seconds is None else now + ttl_seconds
+
+
+class InMemoryTaskStore(TaskStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tasks: dict[str, Task] = {}
+        self.push_notification_infos: dict[str, PushNotificationConfig] = {}
+        self.expires_at: dict[str, float] = {}
+
+    async def get_task(self, task_id: str) -> Task | None:
+        return self.tasks.get(task_id)
+
+    async def save_task(self, task: Task):
+        self.truncate_history(task)
+        self.tasks[task.id] = task
+        self.expires_at[task.id] = self.calculate_expiry(task, time.monotonic())
+
+    async def delete_task(self, task_id: str):
+        self.tasks.pop(task_id, None)
+        self.push_notification_infos.pop(task_id, None)
+        self.expires_at.pop(task_id, None)
+
+    async def get_push_notification_info(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        return self.push_notification_infos.get(task_id)
+
+    async def set_push_notification_info(
+        self, task_id: str, notification_config: PushNotificationConfig
+    ):
+        self.push_notification_infos[task_id] = notification_config
+
+    async def evict_expired_tasks(self) -> list[str]:
+        now = time.monotonic()
+        expired_task_ids = [
+            task_id
+            for task_id, expires_at in self.expires_at.items()
+            if expires_at <= now
+        ]
+        for task_id in expired_task_ids:
+            await self.delete_task(task_id)
+
+        return expired_task_ids
+
+
+class SQLiteDatabase:
+    """SQLite database in WAL mode, shared by the threads of a process.
+
+    Multiple processes on the same host can share the database file. Forked
+    processes, e.g. server workers, open their own connection as a SQLite
+    connection must not be used across a fork.
+    """
+
+    def __init__(self, db_path: str, schema: str):
+        self.db_path = db_path
+        self._open()
+        self.conn.executescript(schema)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._open)
+
+    def _open(self):
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
+        self.conn_lock = threading.Lock()
+
+    def transaction(self, fn):
+        """Runs `fn(conn)` in a single transaction, committed if it returns."""
+        with self.conn_lock:
+            with self.conn:
+                return fn(self.conn)
+
+    def execute(self, query: str, params: tuple = ()) -> list[tuple]:
+        return self.transaction(lambda conn: conn.execute(query, params).fetchall())
+
+    async def run(self, query: str, params: tuple = ()) -> list[tuple]:
+        return await asyncio.to_thread(self.execute, query, params)
+
+
+class SQLiteTaskStore(TaskStore):
+    """Task store persisted in a SQLite database.
+
+    The database runs in WAL mode, so multiple server processes on the same host
+    can share task state by pointing to the same file.
+    """
+
+    def __init__(self, db_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.db = SQLiteDatabase(
+            db_path,
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_expires_at ON tasks (expires_at);
+            CREATE TABLE IF NOT EXISTS push_notification_infos (
+                task_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            """,
+        )
+
+    async def _run(self, query: str, params: tuple = ()) -> list[tuple]:
+        return await self.db.run(query, params)
+
+    async def get_task(self, task_id: str) -> Task | None:
+        rows = await self._run("SELECT data FROM tasks WHERE id = ?", (task_id,))
+        return Task.model_validate_json(rows[0][0]) if rows else None
+
+    async def save_task(self, task: Task):
+        await asyncio.to_thread(
+            self.db.transaction, lambda conn: self._save(conn, task)
+        )
+
+    async def update_task(
+        self, task_id: str, update: Callable[[Task | None], Task | None]
+    ) -> Task | None:
+        return await asyncio.to_thread(
+            self.db.transaction, lambda conn: self._update(conn, task_id, update)
+        )
+
+    def _update(
+        self,
+        conn: sqlite3.Connection,
+        task_id: str,
+        update: Callable[[Task | None], Task | None],
+    ) -> Task | None:
+        # The write lock is taken before reading, so the updates of the other
+        # processes cannot interleave and be lost
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT data FROM tasks WHERE id = ?", (task_id,)
+        ).fetchall()
+        task = update(Task.model_validate_json(rows[0][0]) if rows else None)
+        if task is not None:
+            self._save(conn, task)
+        return task
+
+    def _save(self, conn: sqlite3.Connection, task: Task):
+        self.truncate_history(task)
+        # Wall clock time is used here because the expiry is shared across processes
+        expires_at = self.calculate_expiry(task, time.time())
+        conn.execute(
+            "INSERT OR REPLACE INTO tasks (id, data, expires_at) VALUES (?, ?, ?)",
+            (task.id, task.model_dump_json(exclude_none=True), expires_at),
+        )
+
+    async def delete_task(self, task_id: str):
+        await self._run("DELETE FROM tasks WHERE id = ?", (task_id,))
+        await self._run(
+            "DELETE FROM push_notification_infos WHERE task_id = ?", (task_id,)
+        )
+
+    async def get_push_notification_info(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        rows = await self._run(
+            "SELECT data FROM push_notification_infos WHERE task_id = ?", (task_id,)
+        )
+        return PushNotificationConfig.model_validate_json(rows[0][0]) if rows else None
+
+    async def set_push_notification_info(
+        self, task_id: str, notification_config: PushNotificationConfig
+    ):
+        await self._run(
+            "INSERT OR REPLACE INTO push_notification_infos (task_id, data) VALUES (?, ?)",
+            (task_id, notification_config.model_dump_json(exclude_none=True)),
+        )
+
+    async def evict_expired_tasks(self) -> list[str]:
+        rows = await self._run(
+            "DELETE FROM tasks WHERE expires_at <= ? RETURNING id", (time.time(),)
+        )
+        expired_task_ids = [row[0] for row in rows]
+        for task_id in expired_task_ids:
+            await self._run(
+                "DELETE FROM push_notification_infos WHERE task_id = ?", (task_id,)
+            )
+
+        return expired_task_ids
+
+
+def create_task_store() -> TaskStore:
+    """Creates the task store configured through environment variables.
+
+    - TASK_STORE_BACKEND: `memory` (default) or `sqlite`
+    - TASK_STORE_SQLITE_PATH: database file used by the `sqlite` backend
+    - TASK_STORE_TERMINAL_TTL_SECONDS: lifetime of completed, canceled and failed tasks
+    - TASK_STORE_IDLE_TTL_SECONDS: lifetime of tasks which are not updated anymore
+    - TASK_STORE_MAX_HISTORY_LENGTH: number of history messages kept per task
+
+    A value of 0 disables the related limit.
+    """
+    backend = os.getenv("TASK_STORE_BACKEND", "memory").lower()
+    terminal_task_ttl_seconds = float(
+        os.getenv("TASK_STORE_TERMINAL_TTL_SECONDS", DEFAULT_TERMINAL_TASK_TTL_SECONDS)
+    )
+    idle_task_ttl_seconds = float(
+        os.getenv("TASK_STORE_IDLE_TTL_SECONDS", DEFAULT_IDLE_TASK_TTL_SECONDS)
+    )
+    max_history_length = int(
+        os.getenv("TASK_STORE_MAX_HISTORY_LENGTH", DEFAULT_MAX_HISTORY_LENGTH)
+    )
+    kwargs = {
+        "terminal_task_ttl_seconds": terminal_task_ttl_seconds or None,
+        "idle_task_ttl_seconds": idle_task_ttl_seconds or None,
+        "max_history_length": max_history_length or None,
+    }
+
+    if backend == "memory":
+        return InMemoryTaskStore(**kwargs)
+    elif backend == "sqlite":
+        db_path = os.getenv("TASK_STORE_SQLITE_PATH", "tasks.sqlite")
+        logger.info(f"Using SQLite task store at {db_path}")
+        return SQLiteTaskStore(db_path, **kwargs)
+    else:
+        raise ValueError(f"Unsupported task store backend: {backend}")
@@ -1,16 +1,31 @@
 from langchain_google_vertexai import ChatVertexAI
 from langchain_core.tools import tool
+from langchain_core.messages import HumanMessage, RemoveMessage, trim_messages
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from typing import Literal
 from pydantic import BaseModel
 import uuid
 from dotenv import load_dotenv
+from checkpointer import create_checkpointer
+from catalog import Catalog, MenuItem
 import os
 
 load_dotenv()
 
-memory = MemorySaver()
+memory = create_checkpointer()
+MAX_HISTORY_MESSAGES = int(os.getenv("MAX_HISTORY_MESSAGES", 20))
+
+CATALOG = Catalog(
+    [
+        MenuItem("Margherita Pizza", 100, aliases=("margherita",)),
+        MenuItem("Pepperoni Pizza", 140, aliases=("pepperoni",)),
+        MenuItem("Hawaiian Pizza", 110, aliases=("hawaiian",)),
+        MenuItem("Veggie Pizza", 100, aliases=("veggie", "vegetarian pizza")),
+        MenuItem("BBQ Chicken Pizza", 130, aliases=("bbq chicken", "bbq")),
+    ],
+    category_words={"pizza"},
+)
 
 
 class ResponseFormat(BaseModel):
@@ -55,8 +70,43 @@ def create_pizza_order(order_items: list[OrderItem]) -> str:
     return f"Order {order.model_dump()} has been created"
 
 
+def trim_history(state: dict) -> dict:
+    """Keeps only the latest messages of the session in the graph state.
+
+    Trimming starts on a user message so tool calls are never split from their
+    tool responses. When the latest messages have no user message, e.g. a long
+    chain of tool calls in one turn, the whole turn is kept from its user
+    message.
+    """
+    messages = state["messages"]
+    if len(messages) <= MAX_HISTORY_MESSAGES:
+        return {"llm_input_messages": messages}
+
+    trimmed_messages = trim_messages(
+        messages,
+        strategy="last",
+        token_counter=len,
+        max_tokens=MAX_HISTORY_MESSAGES,
+        start_on="human",
+    )
+    if not trimmed_messages:
+        last_human_index = max(
+            (
+                index
+                for index, message in enumerate(messages)
+                if isinstance(message, HumanMessage)
+            ),
+            default=0,
+        )
+        if last_human_index == 0:
+            # Nothing older than the current turn to drop
+            return {"llm_input_messages": messages}
+        trimmed_messages = messages[last_human_index:]
+    return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *trimmed_messages]}
+
+
 class PizzaSellerAgent:
-    SYSTEM_INSTRUCTION = """
+    SYSTEM_INSTRUCTION = f"""
 # INSTRUCTIONS
 
 You are a specialized assistant for a pizza store.
@@ -67,11 +117,7 @@ Do not attempt to answer unrelated questions or use tools for other purposes.
 # CONTEXT
 
 Provided below is the available pizza menu and it's related price:
-- Margherita Pizza: IDR 100K
-- Pepperoni Pizza: IDR 140K
-- Hawaiian Pizza: IDR 110K
-- Veggie Pizza: IDR 100K
-- BBQ Chicken Pizza: IDR 130K
+{CATALOG.format_menu()}
 
 # RULES
 
@@ -99,11 +145,28 @@ Provided below is the available pizza menu and it's related price:
             tools=self.tools,
             checkpointer=memory,
             prompt=self.SYSTEM_INSTRUCTION,
+            pre_model_hook=trim_history,
             response_format=ResponseFormat,
         )
 
     def invoke(self, query, sessionId) -> str:
         config = {"configurable": {"thread_id": sessionId}}
+
+        # Menu and price queries are answered from the catalog without the LLM,
+        # the exchange is still recorded so follow-ups can refer to it
+        answer = CATALOG.answer(query)
+        if answer is not None:
+            self.graph.update_state(
+                config,
+                {"messages": [("user", query), ("ai", answer)]},
+                as_node="generate_structured_response",
+            )
+            return {
+                "is_task_complete": True,
+                "require_user_input": False,
+                "content": answer,
+            }
+
         self.graph.invoke({"messages": [("user", query)]}, config)
         return self.get_agent_response(config)
 
@@ -0,0 +1,292 @@
+from collections import OrderedDict
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60 * 60
+DEFAULT_MAX_THREADS = 1000
+DEFAULT_MAX_CHECKPOINTS_PER_THREAD = 3
+
+
+class ThreadEvictionPolicy:
+    """Tracks thread access time and decides which threads should be evicted.
+
+    Threads are kept in least-recently-used order, so both the TTL sweep and the
+    LRU eviction only need to look at the front of the ordered dict.
+    """
+
+    def __init__(self, ttl_seconds: float | None, max_threads: int | None):
+        self.ttl_seconds = ttl_seconds
+        self.max_threads = max_threads
+        self.last_access: OrderedDict[str, float] = OrderedDict()
+
+    def touch(self, thread_id: str, now: float | None = None):
+        self.last_access[thread_id] = time.monotonic() if now is None else now
+        self.last_access.move_to_end(thread_id)
+
+    def forget(self, thread_id: str):
+        self.last_access.pop(thread_id, None)
+
+    def is_expired(self, thread_id: str, now: float | None = None) -> bool:
+        if self.ttl_seconds is None or thread_id not in self.last_access:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.last_access[thread_id] > self.ttl_seconds
+
+    def collect_evictions(self, now: float | None = None) -> list[str]:
+        """Pops and returns the threads that are expired or over the LRU capacity."""
+        now = time.monotonic() if now is None else now
+        evicted = []
+        while self.last_access:
+            thread_id, last_access = next(iter(self.last_access.items()))
+            over_capacity = (
+                self.max_threads is not None
+                and len(self.last_access) > self.max_threads
+            )
+            expired = (
+                self.ttl_seconds is not None and now - last_access > self.ttl_seconds
+            )
+            if not over_capacity and not expired:
+                break
+            self.last_access.popitem(last=False)
+            evicted.append(thread_id)
+        return evicted
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer with TTL/LRU thread eviction and checkpoint pruning.
+
+    `MemorySaver` keeps every checkpoint of every thread for the life of the
+    process. This saver only keeps the latest `max_checkpoints_per_thread`
+    checkpoints of each thread, and drops whole threads once they have been idle
+    for `ttl_seconds` or when more than `max_threads` threads are stored.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        max_threads: int | None = DEFAULT_MAX_THREADS,
+        max_checkpoints_per_thread: int = DEFAULT_MAX_CHECKPOINTS_PER_THREAD,
+    ):
+        super().__init__()
+        if max_checkpoints_per_thread < 1:
+            raise ValueError("max_checkpoints_per_thread must be at least 1")
+
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.eviction_policy = ThreadEvictionPolicy(ttl_seconds, max_threads)
+        # Graph execution may write checkpoints from a background executor thread
+        self.eviction_lock = threading.RLock()
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        with self.eviction_lock:
+            if self.eviction_policy.is_expired(thread_id):
+                logger.info(f"Checkpoint thread {thread_id} expired")
+                self.delete_thread(thread_id)
+                return None
+            if thread_id not in self.storage:
+                # Avoid leaving an empty entry behind, `storage` is a defaultdict
+                return None
+            self.eviction_policy.touch(thread_id)
+            return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self.eviction_lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            self.eviction_policy.touch(thread_id)
+            self._prune_checkpoints(thread_id, checkpoint_ns)
+            for evicted_thread_id in self.eviction_policy.collect_evictions():
+                logger.info(f"Evicting checkpoint thread {evicted_thread_id}")
+                self.delete_thread(evicted_thread_id)
+            return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self.eviction_lock:
+            return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.eviction_lock:
+            self.eviction_policy.forget(thread_id)
+            super().delete_thread(thread_id)
+
+    def _prune_checkpoints(self, thread_id: str, checkpoint_ns: str):
+        """Drops all but the latest checkpoints of a thread and their orphaned blobs."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+
+        # Checkpoint IDs are time ordered (uuid6), so sorting them sorts by creation
+        checkpoint_ids = sorted(checkpoints.keys())
+        stale_ids = checkpoint_ids[: -self.max_checkpoints_per_thread]
+        for checkpoint_id in stale_ids:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        referenced_versions = set()
+        for serialized_checkpoint, _, _ in checkpoints.values():
+            checkpoint = self.serde.loads_typed(serialized_checkpoint)
+            referenced_versions.update(checkpoint["channel_versions"].items())
+
+        for key in list(self.blobs.keys()):
+            blob_thread_id, blob_ns, channel, version = key
+            if (
+                blob_thread_id == thread_id
+                and blob_ns == checkpoint_ns
+                and (channel, version) not in referenced_versions
+            ):
+                del self.blobs[key]
+
+
+def create_sqlite_checkpointer(
+    db_path: str,
+    ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+    max_threads: int | None = DEFAULT_MAX_THREADS,
+    max_checkpoints_per_thread: int = DEFAULT_MAX_CHECKPOINTS_PER_THREAD,
+) -> BaseCheckpointSaver:
+    """Creates a SQLite backed checkpointer so sessions survive server restarts.
+
+    Requires the optional `langgraph-checkpoint-sqlite` dependency.
+    """
+    import sqlite3
+
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    class BoundedSqliteSaver(SqliteSaver):
+        """SQLite checkpointer applying the same eviction rules as `BoundedMemorySaver`.
+
+        Thread access time is persisted in a side table so that eviction keeps
+        working after a restart.
+        """
+
+        def setup(self) -> None:
+            if self.is_setup:
+                return
+            super().setup()
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS thread_access (
+                    thread_id TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS thread_access_last_access "
+                "ON thread_access (last_access)"
+            )
+
+        def get_tuple(self, config):
+            thread_id = str(config["configurable"]["thread_id"])
+            with self.cursor() as cur:
+                cur.execute(
+                    "SELECT last_access FROM thread_access WHERE thread_id = ?",
+                    (thread_id,),
+                )
+                row = cur.fetchone()
+            if (
+                row is not None
+                and ttl_seconds is not None
+                and time.time() - row[0] > ttl_seconds
+            ):
+                logger.info(f"Checkpoint thread {thread_id} expired")
+                self.delete_thread(thread_id)
+                return None
+            return super().get_tuple(config)
+
+        def put(self, config, checkpoint, metadata, new_versions):
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = str(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            now = time.time()
+            with self.cursor() as cur:
+                cur.execute(
+                    "INSERT OR REPLACE INTO thread_access (thread_id, last_access) VALUES (?, ?)",
+                    (thread_id, now),
+                )
+                cur.execute(
+                    """
+                    SELECT checkpoint_id FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?
+                    """,
+                    (thread_id, checkpoint_ns, max_checkpoints_per_thread),
+                )
+                stale_ids = [(thread_id, checkpoint_ns, r[0]) for r in cur.fetchall()]
+                cur.executemany(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    stale_ids,
+                )
+                cur.executemany(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    stale_ids,
+                )
+
+                evicted = set()
+                if ttl_seconds is not None:
+                    cur.execute(
+                        "SELECT thread_id FROM thread_access WHERE last_access < ?",
+                        (now - ttl_seconds,),
+                    )
+                    evicted.update(r[0] for r in cur.fetchall())
+                if max_threads is not None:
+                    cur.execute(
+                        "SELECT thread_id FROM thread_access ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+                        (max_threads,),
+                    )
+                    evicted.update(r[0] for r in cur.fetchall())
+
+            for evicted_thread_id in evicted:
+                logger.info(f"Evicting checkpoint thread {evicted_thread_id}")
+                self.delete_thread(evicted_thread_id)
+            return next_config
+
+        def delete_thread(self, thread_id: str) -> None:
+            super().delete_thread(thread_id)
+            with self.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM thread_access WHERE thread_id = ?", (str(thread_id),)
+                )
+
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    return BoundedSqliteSaver(conn)
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """Creates the checkpointer configured through environment variables.
+
+    - CHECKPOINTER_BACKEND: `memory` (default) or `sqlite`
+    - CHECKPOINTER_SQLITE_PATH: database file used by the `sqlite` backend
+    - CHECKPOINTER_TTL_SECONDS: idle time before a session is evicted, 0 disables it
+    - CHECKPOINTER_MAX_THREADS: maximum number of stored sessions, 0 disables it
+    - CHECKPOINTER_MAX_CHECKPOINTS_PER_THREAD: checkpoints kept for each session
+    """
+    backend = os.getenv("CHECKPOINTER_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("CHECKPOINTER_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    max_threads = int(os.getenv("CHECKPOINTER_MAX_THREADS", DEFAULT_MAX_THREADS))
+    max_checkpoints_per_thread = int(
+        os.getenv(
+            "CHECKPOINTER_MAX_CHECKPOINTS_PER_THREAD",
+            DEFAULT_MAX_CHECKPOINTS_PER_THREAD,
+        )
+    )
+    kwargs = {
+        "ttl_seconds": ttl_seconds or None,
+        "max_threads": max_threads or None,
+        "max_checkpoints_per_thread": max_checkpoints_per_thread,
+    }
+
+    if backend == "memory":
+        return BoundedMemorySaver(**kwargs)
+    elif backend == "sqlite":
+        db_path = os.getenv("CHECKPOINTER_SQLITE_PATH", "checkpoints.sqlite")
+        logger.info(f"Using SQLite checkpointer at {db_path}")
+        return create_sqlite_checkpointer(db_path, **kwargs)
+    else:
+        raise ValueError(f"Unsupported checkpointer backend: {backend}")